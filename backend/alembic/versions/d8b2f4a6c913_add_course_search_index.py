@@ -0,0 +1,82 @@
+"""Add full-text search index for courses
+
+Revision ID: d8b2f4a6c913
+Revises: c3f5a8d61e27
+Create Date: 2026-10-17 16:20:41.508317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b2f4a6c913'
+down_revision: Union[str, None] = 'c3f5a8d61e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Язык курса -> конфигурация поиска PostgreSQL (как SEARCH_CONFIGS в app.models.course)
+SEARCH_CONFIG = (
+    "CASE language "
+    "WHEN 'ru' THEN 'russian'::regconfig "
+    "WHEN 'en' THEN 'english'::regconfig "
+    "WHEN 'de' THEN 'german'::regconfig "
+    "WHEN 'fr' THEN 'french'::regconfig "
+    "WHEN 'es' THEN 'spanish'::regconfig "
+    "WHEN 'it' THEN 'italian'::regconfig "
+    "WHEN 'pt' THEN 'portuguese'::regconfig "
+    "ELSE 'simple'::regconfig END"
+)
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        # Вычисляемый столбец заполняется для существующих строк при добавлении
+        op.execute(
+            "ALTER TABLE courses ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector({SEARCH_CONFIG}, coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector({SEARCH_CONFIG}, coalesce(short_description, '')), 'B') || "
+            f"setweight(to_tsvector({SEARCH_CONFIG}, coalesce(description, '')), 'C')"
+            ") STORED"
+        )
+        op.execute("CREATE INDEX ix_courses_search_vector ON courses USING GIN (search_vector)")
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE courses_fts USING fts5("
+            "title, short_description, description, content='courses', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER courses_fts_insert AFTER INSERT ON courses BEGIN "
+            "INSERT INTO courses_fts(rowid, title, short_description, description) "
+            "VALUES (new.id, new.title, new.short_description, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER courses_fts_delete AFTER DELETE ON courses BEGIN "
+            "INSERT INTO courses_fts(courses_fts, rowid, title, short_description, description) "
+            "VALUES ('delete', old.id, old.title, old.short_description, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER courses_fts_update AFTER UPDATE OF title, short_description, description ON courses BEGIN "
+            "INSERT INTO courses_fts(courses_fts, rowid, title, short_description, description) "
+            "VALUES ('delete', old.id, old.title, old.short_description, old.description); "
+            "INSERT INTO courses_fts(rowid, title, short_description, description) "
+            "VALUES (new.id, new.title, new.short_description, new.description); END"
+        )
+        # Индекс существующих курсов
+        op.execute("INSERT INTO courses_fts(courses_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_courses_search_vector")
+        op.execute("ALTER TABLE courses DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        for trigger in ('courses_fts_insert', 'courses_fts_delete', 'courses_fts_update'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS courses_fts")
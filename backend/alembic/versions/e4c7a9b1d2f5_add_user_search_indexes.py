@@ -0,0 +1,48 @@
+"""Add user search indexes (pg_trgm)
+
+Revision ID: e4c7a9b1d2f5
+Revises: d8b2f4a6c913
+Create Date: 2026-10-17 17:05:12.330958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c7a9b1d2f5'
+down_revision: Union[str, None] = 'd8b2f4a6c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Строка поиска (как USER_SEARCH_TEXT в app.models.user)
+USER_SEARCH_TEXT = "lower(email || ' ' || first_name || ' ' || last_name)"
+
+PREFIX_INDEXES = {
+    'ix_users_email_lower': 'email',
+    'ix_users_first_name_lower': 'first_name',
+    'ix_users_last_name_lower': 'last_name',
+}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        # CONCURRENTLY: таблица users не блокируется на запись во время построения
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_search_trgm "
+                f"ON users USING gin (({USER_SEARCH_TEXT}) gin_trgm_ops)"
+            )
+    else:
+        for name, column in PREFIX_INDEXES.items():
+            op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON users (lower({column}))")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_users_search_trgm")
+    else:
+        for name in PREFIX_INDEXES:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,57 @@
+"""Add course keyset pagination indexes
+
+Revision ID: f1a3c5e7b9d2
+Revises: e4c7a9b1d2f5
+Create Date: 2026-10-17 17:48:26.114402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a3c5e7b9d2'
+down_revision: Union[str, None] = 'e4c7a9b1d2f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Ключи сортировки с NULL ломают keyset пагинацию: (NULL, id) > (...) не выполняется
+NOT_NULL_COLUMNS = {
+    'price': sa.Float(),
+    'average_rating': sa.Float(),
+    'total_students': sa.Integer(),
+}
+
+INDEXES = {
+    'ix_courses_created_at_id': ['created_at', 'id'],
+    'ix_courses_price_id': ['price', 'id'],
+    'ix_courses_average_rating_id': ['average_rating', 'id'],
+    'ix_courses_total_students_id': ['total_students', 'id'],
+    'ix_courses_title_id': ['title', 'id'],
+    'ix_courses_instructor_created_at_id': ['instructor_id', 'created_at', 'id'],
+}
+
+
+def upgrade() -> None:
+    for column in NOT_NULL_COLUMNS:
+        op.execute(f"UPDATE courses SET {column} = 0 WHERE {column} IS NULL")
+
+    # SQLite не меняет столбцы без пересоздания таблицы, а пересоздание удалило бы
+    # триггеры courses_fts; там NULL не записывается приложением (default в модели)
+    if op.get_bind().dialect.name != 'sqlite':
+        for column, column_type in NOT_NULL_COLUMNS.items():
+            op.alter_column('courses', column, existing_type=column_type, nullable=False, server_default='0')
+
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'courses', columns, unique=False)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name='courses')
+
+    if op.get_bind().dialect.name != 'sqlite':
+        for column, column_type in NOT_NULL_COLUMNS.items():
+            op.alter_column('courses', column, existing_type=column_type, nullable=True, server_default=None)
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, desc
 from typing import List, Optional
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.database import (
+    get_db, get_read_db, engine, async_engine, replica_engine, async_replica_engine, slow_query_log
+)
 from app.models import (
     User, Course, Enrollment, Progress, Review,
     Comment, Quiz, QuizAttempt, Category
@@ -14,7 +16,13 @@ from app.models.course import CourseStatus
 from app.models.enrollment import EnrollmentStatus
 from app.schemas.user import UserResponse, UserList, UserShort
 from app.schemas.course import CourseResponse, CourseShort
+from app.services.catalog_snapshot import catalog_cache
+from app.services.course_counts import course_counts
+from app.services.refresh_tokens import delete_expired_refresh_tokens
+from app.services.token_revocations import apply_revocation, delete_expired_revocations, revoke_user_access
+from app.services.user_search import UserSearch
 from app.utils.dependencies import get_current_user, require_role
+from app.utils.pool_metrics import pool_status
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -30,26 +38,23 @@ def get_all_users(
         page: int = Query(1, ge=1),
         page_size: int = Query(20, ge=1, le=100),
         db: Session = Depends(get_db),
-        current_user: User = Depends(require_role([UserRole.ADMIN]))
+        current_user: User = Depends(require_role([UserRole.ADMIN], from_token=True))
 ):
     """
     Получить список всех пользователей (только для админа)
 
-    - **search**: Поиск по email, имени, фамилии
+    - **search**: Поиск по email, имени, фамилии (в PostgreSQL - подстрока
+      с допуском опечаток и ранжированием, в остальных СУБД - начало строки)
     - **role**: Фильтр по роли
     - **is_active**: Фильтр по активности
     - **is_verified**: Фильтр по верификации
     """
     query = db.query(User)
 
-    # Поиск
-    if search:
-        search_filter = (
-                User.email.ilike(f"%{search}%") |
-                User.first_name.ilike(f"%{search}%") |
-                User.last_name.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+    # Поиск (PostgreSQL: pg_trgm, остальные СУБД: по префиксу)
+    user_search = UserSearch.build(search, db.bind.dialect.name)
+    if user_search is not None:
+        query = user_search.apply(query)
 
     # Фильтры
     if role:
@@ -66,7 +71,10 @@ def get_all_users(
 
     # Пагинация
     offset = (page - 1) * page_size
-    users = query.order_by(User.created_at.desc()).offset(offset).limit(page_size).all()
+    order = [User.created_at.desc()]
+    if user_search is not None and user_search.rank is not None:
+        order.insert(0, user_search.rank)
+    users = query.order_by(*order).offset(offset).limit(page_size).all()
 
     users_data = [UserShort.model_validate(user) for user in users]
 
@@ -82,7 +90,7 @@ def get_all_users(
 def get_user_details(
         user_id: int,
         db: Session = Depends(get_db),
-        current_user: User = Depends(require_role([UserRole.ADMIN]))
+        current_user: User = Depends(require_role([UserRole.ADMIN], from_token=True))
 ):
     """Получить детальную информацию о пользователе"""
     user = db.query(User).filter(User.id == user_id).first()
@@ -125,7 +133,10 @@ def change_user_role(
 
     old_role = user.role
     user.role = new_role
+    # Токены со старой ролью больше не принимаются
+    revocation = revoke_user_access(db, user_id, "role_changed")
     db.commit()
+    apply_revocation(revocation)
 
     return {
         "message": f"Роль пользователя изменена с {old_role} на {new_role}",
@@ -163,7 +174,9 @@ def change_user_status(
         )
 
     user.is_active = is_active
+    revocation = revoke_user_access(db, user_id, "status_changed")
     db.commit()
+    apply_revocation(revocation)
 
     status_text = "активирован" if is_active else "деактивирован"
 
@@ -242,7 +255,9 @@ def delete_user(
             )
 
     db.delete(user)
+    revocation = revoke_user_access(db, user_id, "deleted")
     db.commit()
+    apply_revocation(revocation)
 
     return {
         "message": "Пользователь успешно удалён",
@@ -262,7 +277,7 @@ def get_all_courses(
         page: int = Query(1, ge=1),
         page_size: int = Query(20, ge=1, le=100),
         db: Session = Depends(get_db),
-        current_user: User = Depends(require_role([UserRole.ADMIN]))
+        current_user: User = Depends(require_role([UserRole.ADMIN], from_token=True))
 ):
     """
     Получить все курсы включая черновики (только админ)
@@ -295,7 +310,10 @@ def get_all_courses(
 
     # Пагинация
     offset = (page - 1) * page_size
-    courses = query.order_by(Course.created_at.desc()).offset(offset).limit(page_size).all()
+    courses = query.options(
+        joinedload(Course.instructor),
+        joinedload(Course.category)
+    ).order_by(Course.created_at.desc()).offset(offset).limit(page_size).all()
 
     courses_data = []
     for course in courses:
@@ -374,6 +392,8 @@ def moderate_course(
         )
 
     db.commit()
+    course_counts.clear()
+    catalog_cache.invalidate(course_id)
 
     return {
         "message": message,
@@ -387,8 +407,8 @@ def moderate_course(
 
 @router.get("/statistics")
 def get_platform_statistics(
-        db: Session = Depends(get_db),
-        current_user: User = Depends(require_role([UserRole.ADMIN]))
+        db: Session = Depends(get_read_db),
+        current_user: User = Depends(require_role([UserRole.ADMIN], from_token=True))
 ):
     """
     Получить детальную статистику платформы
@@ -543,7 +563,7 @@ def get_platform_statistics(
 def get_recent_activity(
         limit: int = Query(20, ge=1, le=100),
         db: Session = Depends(get_db),
-        current_user: User = Depends(require_role([UserRole.ADMIN]))
+        current_user: User = Depends(require_role([UserRole.ADMIN], from_token=True))
 ):
     """
     Получить последнюю активность на платформе
@@ -559,17 +579,21 @@ def get_recent_activity(
     ).limit(limit).all()
 
     # Новые курсы
-    recent_courses = db.query(Course).order_by(
+    recent_courses = db.query(Course).options(joinedload(Course.instructor)).order_by(
         Course.created_at.desc()
     ).limit(limit).all()
 
     # Новые записи
-    recent_enrollments = db.query(Enrollment).order_by(
+    recent_enrollments = db.query(Enrollment).options(
+        joinedload(Enrollment.student), joinedload(Enrollment.course)
+    ).order_by(
         Enrollment.enrolled_at.desc()
     ).limit(limit).all()
 
     # Новые отзывы
-    recent_reviews = db.query(Review).order_by(
+    recent_reviews = db.query(Review).options(
+        joinedload(Review.student), joinedload(Review.course)
+    ).order_by(
         Review.created_at.desc()
     ).limit(limit).all()
 
@@ -613,4 +637,80 @@ def get_recent_activity(
             }
             for r in recent_reviews
         ]
-    }
\ No newline at end of file
+    }
+
+# ============ DATABASE ============
+
+@router.get("/database/pool")
+def get_database_pool_stats(
+        current_user: User = Depends(require_role([UserRole.ADMIN], from_token=True))
+):
+    """
+    Состояние пулов соединений текущего worker
+
+    - **checked_out**: Занятые соединения
+    - **overflow**: Соединения сверх pool_size
+    - **wait_avg_ms / wait_max_ms**: Время ожидания свободного соединения
+    - **checkout_timeouts**: Сколько раз соединение не было получено за pool_timeout
+    """
+    pools = {
+        "sync": pool_status(engine.pool),
+        "async": pool_status(async_engine.sync_engine.pool)
+    }
+
+    if replica_engine is not None:
+        pools["replica_sync"] = pool_status(replica_engine.pool)
+        pools["replica_async"] = pool_status(async_replica_engine.sync_engine.pool)
+
+    return pools
+
+
+@router.get("/database/slow-queries")
+def get_slow_queries(
+        limit: int = Query(20, ge=1, le=100),
+        current_user: User = Depends(require_role([UserRole.ADMIN], from_token=True))
+):
+    """
+    Самые медленные запросы текущего worker (сгруппированы по форме SQL)
+
+    - **max_ms / avg_ms / count**: Длительность и количество медленных выполнений
+    - **route**: Маршрут, на котором запрос был самым медленным
+    - **parameter_types**: Типы bind параметров (без значений)
+    - **plan**: EXPLAIN (ANALYZE off), только для PostgreSQL
+    """
+    return {
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "queries": slow_query_log.top(limit)
+    }
+
+
+@router.delete("/database/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+def clear_slow_queries(
+        current_user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """Очистить журнал медленных запросов текущего worker"""
+    slow_query_log.clear()
+    return None
+
+
+@router.delete("/database/refresh-tokens/expired")
+def cleanup_expired_refresh_tokens(
+        db: Session = Depends(get_db),
+        current_user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """
+    Удалить истекшие refresh токены (пачками)
+
+    Можно вызывать по расписанию; использованные токены хранятся до истечения
+    для обнаружения повторного предъявления
+    """
+    return {"deleted": delete_expired_refresh_tokens(db)}
+
+
+@router.delete("/database/token-revocations/expired")
+def cleanup_expired_token_revocations(
+        db: Session = Depends(get_db),
+        current_user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """Удалить записи об отзыве access токенов, которые уже истекли"""
+    return {"deleted": delete_expired_revocations(db)}
@@ -1,29 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from datetime import datetime, timedelta
-from app.database import get_db
+from typing import Optional
+from app.config import settings
+from app.database import get_async_db
 from app.models.user import User
 from app.schemas.auth import (
     LoginRequest, Token, AuthResponse,
     RefreshTokenRequest, TokenPayload
 )
 from app.schemas.user import UserCreate, UserResponse
+from app.services.refresh_tokens import (
+    RefreshTokenError, issue_refresh_token, consume_refresh_token, revoke_family, revoke_user_tokens
+)
+from app.services.token_revocations import apply_revocation, revoke_user_access
 from app.utils.security import (
-    verify_password, get_password_hash,
-    create_access_token, create_refresh_token, decode_token
+    verify_password_async, get_password_hash_async, password_needs_rehash,
+    create_access_token, decode_token
 )
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_user, get_current_db_user
+from app.utils.rate_limit import MemoryRateLimitBackend, RateLimiter, client_ip
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+# Лимиты проверяются до обращения к БД и bcrypt
+rate_limiter = RateLimiter(MemoryRateLimitBackend(settings.RATE_LIMIT_MAX_KEYS), enabled=settings.RATE_LIMIT_ENABLED)
+
 
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Регистрация нового пользователя
     """
+    rate_limiter.enforce(("register_ip", settings.RATE_LIMIT_REGISTER_PER_IP, client_ip(request)))
+
     # Проверяем существует ли пользователь с таким email
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -31,7 +44,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
 
     # Создаем нового пользователя
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -45,21 +58,14 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.flush()
 
-    # Создаем токены
+    # Создаем токены (пользователь и refresh токен сохраняются одной транзакцией)
     access_token = create_access_token(
         data={"sub": new_user.id, "email": new_user.email, "role": new_user.role}
     )
-    refresh_token = create_refresh_token(
-        data={"sub": new_user.id, "email": new_user.email}
-    )
-
-    # Сохраняем refresh_token в БД
-    new_user.refresh_token = refresh_token
-    db.commit()
-    db.refresh(new_user)
+    refresh_token = issue_refresh_token(db, new_user.id, new_user.email)
+    await db.commit()
 
     return {
         "user": {
@@ -77,12 +83,17 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=AuthResponse)
-async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
+async def login(credentials: LoginRequest, request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Вход в систему
     """
+    rate_limiter.enforce(
+        ("login_ip", settings.RATE_LIMIT_LOGIN_PER_IP, client_ip(request)),
+        ("login_email", settings.RATE_LIMIT_LOGIN_PER_EMAIL, credentials.email.lower()),
+    )
+
     # Находим пользователя по email
-    user = db.query(User).filter(User.email == credentials.email).first()
+    user = await db.scalar(select(User).where(User.email == credentials.email))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -90,7 +101,7 @@ async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
         )
 
     # Проверяем пароль
-    if not verify_password(credentials.password, user.hashed_password):
+    if not await verify_password_async(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный email или пароль"
@@ -103,22 +114,19 @@ async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
             detail="Аккаунт деактивирован"
         )
 
+    # Хеш со старым cost factor пересчитываем, пока известен пароль
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash_async(credentials.password)
+
     # Обновляем время последнего входа
     user.last_login = datetime.utcnow()
-    db.commit()
 
-    # Создаем токены
+    # Создаем токены: новый вход начинает новую цепочку refresh токенов
     access_token = create_access_token(
         data={"sub": user.id, "email": user.email, "role": user.role}
     )
-    refresh_token = create_refresh_token(
-        data={"sub": user.id, "email": user.email}
-    )
-
-    # Сохраняем refresh_token в БД
-    user.refresh_token = refresh_token
-    db.commit()
-    db.refresh(user)
+    refresh_token = issue_refresh_token(db, user.id, user.email)
+    await db.commit()
 
     return {
         "user": {
@@ -139,11 +147,17 @@ async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
     refresh_data: RefreshTokenRequest,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Обновление access токена с помощью refresh токена
+
+    Токен одноразовый: взамен выдается следующий токен той же цепочки.
+    Строка users только читается
     """
+    rate_limiter.enforce(("refresh_ip", settings.RATE_LIMIT_REFRESH_PER_IP, client_ip(request)))
+
     # Декодируем токен
     payload = decode_token(refresh_data.refresh_token)
     if payload is None:
@@ -169,32 +183,37 @@ async def refresh_token(
             detail="Некорректный ID пользователя в токене"
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+    # Токены, выданные до появления таблицы refresh_tokens, не имеют jti
+    jti = payload.get("jti")
+    if not jti:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Невалидный refresh токен"
+        )
+
+    user = (await db.execute(
+        select(User.id, User.email, User.role, User.is_active).where(User.id == user_id)
+    )).first()
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Пользователь не найден или деактивирован"
         )
 
-    # Проверяем, что refresh_token совпадает с хранимым в БД
-    if user.refresh_token != refresh_data.refresh_token:
+    try:
+        family_id = await consume_refresh_token(db, user_id, jti)
+    except RefreshTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Refresh токен не совпадает или уже был обновлён"
+            detail="Refresh токен не найден или уже был обновлён"
         )
 
     # Создаем новые токены
     access_token = create_access_token(
         data={"sub": user.id, "email": user.email, "role": user.role}
     )
-    new_refresh_token = create_refresh_token(
-        data={"sub": user.id, "email": user.email}
-    )
-
-    # Сохраняем новый refresh_token в БД
-    user.refresh_token = new_refresh_token
-    db.commit()
-    db.refresh(user)
+    new_refresh_token = issue_refresh_token(db, user.id, user.email, family_id)
+    await db.commit()
 
     return {
         "access_token": access_token,
@@ -205,7 +224,7 @@ async def refresh_token(
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: User = Depends(get_current_db_user)):
     """
     Получить информацию о текущем пользователе
     """
@@ -213,13 +232,26 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def logout(
+    refresh_data: Optional[RefreshTokenRequest] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Выход из системы
 
+    - С **refresh_token** в теле отзывается только сессия этого устройства,
+      без тела - все refresh токены пользователя
+    - Access токены пользователя, выданные до выхода, отзываются на всех устройствах
+
     Note: На клиенте нужно удалить токены из localStorage
     """
-    current_user.refresh_token = None
-    db.commit()
-    db.refresh(current_user)
+    payload = decode_token(refresh_data.refresh_token) if refresh_data else None
+    if payload and payload.get("fam") and payload.get("sub") == str(current_user.id):
+        await revoke_family(db, payload["fam"])
+    else:
+        await revoke_user_tokens(db, current_user.id)
+    revocation = revoke_user_access(db, current_user.id, "logout")
+    await db.commit()
+    apply_revocation(revocation)
     return {"message": "Вы успешно вышли из системы"}
\ No newline at end of file
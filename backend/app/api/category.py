@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.models.user import User, UserRole
 from app.models.category import Category
 from app.models.course import Course
@@ -12,43 +12,55 @@ from app.schemas.category import (
     CategoryResponse
 )
 from app.utils.dependencies import require_role
+from app.utils.etag import weak_etag, etag_matches, not_modified
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 
 @router.get("/", response_model=List[CategoryResponse])
 async def get_categories(
-        db: Session = Depends(get_db)
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Получение всех категорий"""
+    """
+    Получение всех категорий (поддерживает If-None-Match)
 
-    categories = db.query(Category).order_by(Category.order, Category.name).all()
+    Список небольшой и читается одним запросом, поэтому ETag считается по его
+    строкам (id, updated_at, количество курсов); при совпадении пропускается сериализация
+    """
 
-    # Добавляем количество курсов для каждой категории
-    result = []
-    for category in categories:
-        courses_count = db.query(func.count(Course.id)).filter(
-            Course.category_id == category.id,
-            Course.is_published == True
-        ).scalar()
+    # Количество опубликованных курсов считается одним запросом для всех категорий
+    courses_count = select(
+        Course.category_id,
+        func.count(Course.id).label("courses_count")
+    ).where(Course.is_published == True).group_by(Course.category_id).subquery()
 
-        category_dict = {
-            **category.__dict__,
-            "courses_count": courses_count
-        }
-        result.append(CategoryResponse(**category_dict))
+    rows = (await db.execute(
+        select(Category, func.coalesce(courses_count.c.courses_count, 0))
+        .outerjoin(courses_count, courses_count.c.category_id == Category.id)
+        .order_by(Category.order, Category.name)
+    )).all()
 
-    return result
+    etag = weak_etag(*((category.id, category.updated_at, count) for category, count in rows))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
+    return [
+        CategoryResponse(**category.__dict__, courses_count=count)
+        for category, count in rows
+    ]
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def get_category(
         category_id: int,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Получение категории по ID"""
 
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = await db.get(Category, category_id)
 
     if not category:
         raise HTTPException(
@@ -56,10 +68,10 @@ async def get_category(
             detail="Category not found"
         )
 
-    courses_count = db.query(func.count(Course.id)).filter(
+    courses_count = await db.scalar(select(func.count(Course.id)).where(
         Course.category_id == category.id,
         Course.is_published == True
-    ).scalar()
+    ))
 
     return CategoryResponse(
         **category.__dict__,
@@ -70,11 +82,11 @@ async def get_category(
 @router.get("/slug/{slug}", response_model=CategoryResponse)
 async def get_category_by_slug(
         slug: str,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Получение категории по slug"""
 
-    category = db.query(Category).filter(Category.slug == slug).first()
+    category = await db.scalar(select(Category).where(Category.slug == slug))
 
     if not category:
         raise HTTPException(
@@ -82,10 +94,10 @@ async def get_category_by_slug(
             detail="Category not found"
         )
 
-    courses_count = db.query(func.count(Course.id)).filter(
+    courses_count = await db.scalar(select(func.count(Course.id)).where(
         Course.category_id == category.id,
         Course.is_published == True
-    ).scalar()
+    ))
 
     return CategoryResponse(
         **category.__dict__,
@@ -97,12 +109,12 @@ async def get_category_by_slug(
 async def create_category(
         category_data: CategoryCreate,
         current_user: User = Depends(require_role([UserRole.ADMIN])),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Создание новой категории (только для админов)"""
 
     # Проверка уникальности имени
-    existing = db.query(Category).filter(Category.name == category_data.name).first()
+    existing = await db.scalar(select(Category).where(Category.name == category_data.name))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -110,7 +122,7 @@ async def create_category(
         )
 
     # Проверка уникальности slug
-    existing_slug = db.query(Category).filter(Category.slug == category_data.slug).first()
+    existing_slug = await db.scalar(select(Category).where(Category.slug == category_data.slug))
     if existing_slug:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -120,8 +132,8 @@ async def create_category(
     new_category = Category(**category_data.model_dump(exclude_unset=True))
 
     db.add(new_category)
-    db.commit()
-    db.refresh(new_category)
+    await db.commit()
+    await db.refresh(new_category)
 
     return new_category
 
@@ -131,11 +143,11 @@ async def update_category(
         category_id: int,
         category_data: CategoryUpdate,
         current_user: User = Depends(require_role([UserRole.ADMIN])),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Обновление категории (только для админов)"""
 
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = await db.get(Category, category_id)
 
     if not category:
         raise HTTPException(
@@ -147,10 +159,10 @@ async def update_category(
 
     # Проверка уникальности имени
     if "name" in update_data:
-        existing = db.query(Category).filter(
+        existing = await db.scalar(select(Category).where(
             Category.name == update_data["name"],
             Category.id != category_id
-        ).first()
+        ))
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -159,10 +171,10 @@ async def update_category(
 
     # Проверка уникальности slug
     if "slug" in update_data:
-        existing_slug = db.query(Category).filter(
+        existing_slug = await db.scalar(select(Category).where(
             Category.slug == update_data["slug"],
             Category.id != category_id
-        ).first()
+        ))
         if existing_slug:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -172,13 +184,13 @@ async def update_category(
     for field, value in update_data.items():
         setattr(category, field, value)
 
-    db.commit()
-    db.refresh(category)
+    await db.commit()
+    await db.refresh(category)
 
-    courses_count = db.query(func.count(Course.id)).filter(
+    courses_count = await db.scalar(select(func.count(Course.id)).where(
         Course.category_id == category.id,
         Course.is_published == True
-    ).scalar()
+    ))
 
     return CategoryResponse(**category.__dict__, courses_count=courses_count)
 
@@ -187,11 +199,11 @@ async def update_category(
 async def delete_category(
         category_id: int,
         current_user: User = Depends(require_role([UserRole.ADMIN])),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Удаление категории (только для админов)"""
 
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = await db.get(Category, category_id)
 
     if not category:
         raise HTTPException(
@@ -200,9 +212,9 @@ async def delete_category(
         )
 
     # Проверка, есть ли курсы в этой категории
-    courses_count = db.query(func.count(Course.id)).filter(
+    courses_count = await db.scalar(select(func.count(Course.id)).where(
         Course.category_id == category_id
-    ).scalar()
+    ))
 
     if courses_count > 0:
         raise HTTPException(
@@ -210,7 +222,7 @@ async def delete_category(
             detail=f"Cannot delete category with {courses_count} courses. Move courses first."
         )
 
-    db.delete(category)
-    db.commit()
+    await db.delete(category)
+    await db.commit()
 
     return None
\ No newline at end of file
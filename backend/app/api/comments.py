@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased, joinedload
 from typing import List
 from datetime import datetime
 
@@ -9,14 +10,31 @@ from app.schemas.comment import (
     CommentCreate,
     CommentUpdate,
     CommentResponse,
-    CommentWithReplies,
     LessonCommentsResponse,
     UserBrief
 )
 from app.utils.dependencies import get_current_user
+from app.utils.serialization import FastJSONResponse, fields_of, project
 
 router = APIRouter(prefix="/comments", tags=["Comments"])
 
+# Поля комментария без вложенных user/replies - они добавляются при проекции
+COMMENT_FIELDS = tuple(
+    name for name in fields_of(CommentResponse) if name not in ("user", "replies_count")
+)
+USER_BRIEF_FIELDS = fields_of(UserBrief)
+
+
+def comment_row(comment: Comment, replies_count: int = 0, **values) -> dict:
+    """Комментарий в формате CommentResponse без построения pydantic объектов"""
+    return project(
+        comment,
+        COMMENT_FIELDS,
+        user=project(comment.user, USER_BRIEF_FIELDS, role=comment.user.role.value),
+        replies_count=replies_count,
+        **values
+    )
+
 
 @router.post("/", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
 def create_comment(
@@ -124,84 +142,40 @@ def get_lesson_comments(
             detail="У вас нет доступа к этому уроку"
         )
 
-    # Получаем только корневые комментарии (без parent_id)
-    root_comments = db.query(Comment).options(
-        joinedload(Comment.user),
-        joinedload(Comment.replies).joinedload(Comment.user)
+    # Все комментарии урока одним запросом, иерархия собирается в памяти
+    comments = db.query(Comment).options(
+        joinedload(Comment.user)
     ).filter(
         Comment.lesson_id == lesson_id,
-        Comment.parent_id.is_(None),
         Comment.is_deleted == False
-    ).order_by(Comment.created_at.desc()).all()
+    ).order_by(Comment.created_at.asc(), Comment.id.asc()).all()
 
     # Общее количество комментариев (включая ответы)
-    total_comments = db.query(Comment).filter(
-        Comment.lesson_id == lesson_id,
-        Comment.is_deleted == False
-    ).count()
+    total_comments = len(comments)
 
-    # Формируем ответ
+    replies_by_parent = {}
+    for comment in comments:
+        if comment.parent_id is not None:
+            replies_by_parent.setdefault(comment.parent_id, []).append(comment)
+
+    # Корневые комментарии (без parent_id) - сначала новые
+    root_comments = [comment for comment in reversed(comments) if comment.parent_id is None]
+
+    # Формируем ответ (строки уже в формате LessonCommentsResponse)
     comments_list = []
     for comment in root_comments:
-        # Получаем ответы
-        replies = db.query(Comment).options(
-            joinedload(Comment.user)
-        ).filter(
-            Comment.parent_id == comment.id,
-            Comment.is_deleted == False
-        ).order_by(Comment.created_at.asc()).all()
-
-        replies_data = [
-            CommentResponse(
-                id=reply.id,
-                content=reply.content,
-                user_id=reply.user_id,
-                lesson_id=reply.lesson_id,
-                parent_id=reply.parent_id,
-                is_edited=reply.is_edited,
-                is_deleted=reply.is_deleted,
-                created_at=reply.created_at,
-                updated_at=reply.updated_at,
-                user=UserBrief(
-                    id=reply.user.id,
-                    first_name=reply.user.first_name,
-                    last_name=reply.user.last_name,
-                    avatar_url=reply.user.avatar_url,
-                    role=reply.user.role.value
-                ),
-                replies_count=0
-            )
-            for reply in replies
-        ]
-
-        comment_data = CommentWithReplies(
-            id=comment.id,
-            content=comment.content,
-            user_id=comment.user_id,
-            lesson_id=comment.lesson_id,
-            parent_id=comment.parent_id,
-            is_edited=comment.is_edited,
-            is_deleted=comment.is_deleted,
-            created_at=comment.created_at,
-            updated_at=comment.updated_at,
-            user=UserBrief(
-                id=comment.user.id,
-                first_name=comment.user.first_name,
-                last_name=comment.user.last_name,
-                avatar_url=comment.user.avatar_url,
-                role=comment.user.role.value
-            ),
+        replies = replies_by_parent.get(comment.id, [])
+        comments_list.append(comment_row(
+            comment,
             replies_count=len(replies),
-            replies=replies_data
-        )
-
-        comments_list.append(comment_data)
+            replies=[comment_row(reply) for reply in replies]
+        ))
 
-    return LessonCommentsResponse(
-        lesson_id=lesson_id,
-        total_comments=total_comments,
-        comments=comments_list
-    )
+    return FastJSONResponse({
+        "lesson_id": lesson_id,
+        "total_comments": total_comments,
+        "comments": comments_list
+    })
 
 
 @router.patch("/{comment_id}", response_model=CommentResponse)
@@ -313,16 +287,19 @@ def get_my_comments(
     - **limit**: Количество комментариев (по умолчанию 20)
     - **offset**: Смещение для пагинации
     """
-    comments = db.query(Comment).options(
-        joinedload(Comment.user),
-        joinedload(Comment.lesson)
-    ).filter(
+    # Количество ответов считается в том же запросе, что и комментарии
+    Reply = aliased(Comment)
+    replies_count = db.query(func.count(Reply.id)).filter(
+        Reply.parent_id == Comment.id
+    ).correlate(Comment).scalar_subquery()
+
+    comments = db.query(Comment, replies_count).filter(
         Comment.user_id == current_user.id,
         Comment.is_deleted == False
     ).order_by(Comment.created_at.desc()).limit(limit).offset(offset).all()
 
     result = []
-    for comment in comments:
+    for comment, comment_replies in comments:
         result.append(CommentResponse(
             id=comment.id,
             content=comment.content,
@@ -340,7 +317,7 @@ def get_my_comments(
                 avatar_url=current_user.avatar_url,
                 role=current_user.role.value
             ),
-            replies_count=len(comment.replies) if comment.replies else 0
+            replies_count=comment_replies
         ))
 
     return result
\ No newline at end of file
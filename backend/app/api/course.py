@@ -1,20 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, and_
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy import func, and_, select
 from typing import Optional, List
 from datetime import datetime
 import re
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.models.user import User, UserRole
 from app.models.course import Course, CourseStatus, CourseLevel
 from app.models.category import Category
 from app.models.enrollment import Enrollment
+from app.services.catalog_snapshot import catalog_cache
+from app.services.course_counts import count_courses, course_counts
+from app.services.course_search import CourseSearch
 from app.schemas.course import (
     CourseCreate, CourseUpdate, CourseResponse,
     CourseList, CourseShort, CourseFilter, CoursePublish
 )
 from app.utils.dependencies import get_current_user, require_role
+from app.utils.etag import weak_etag, etag_matches, not_modified
+from app.utils.pagination import InvalidCursor, decode_cursor, keyset_condition, next_cursor
+from app.utils.serialization import FastJSONResponse, fields_of, project
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 
@@ -27,7 +34,175 @@ def generate_slug(title: str) -> str:
     return slug
 
 
-def build_course_response(course: Course, db: Session) -> dict:
+def course_with_relations():
+    """Запрос курса с преподавателем и категорией (lazy load недоступен в async)"""
+    return select(Course).options(
+        joinedload(Course.instructor),
+        joinedload(Course.category)
+    ).execution_options(populate_existing=True)
+
+
+async def get_course_or_404(db: AsyncSession, course_id: int) -> Course:
+    """Получение курса с связями или 404"""
+    course = await db.scalar(course_with_relations().where(Course.id == course_id))
+
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+
+    return course
+
+
+def course_version_query():
+    """
+    Версия курса для ETag: updated_at курса, преподавателя и категории и счетчики
+
+    Выбираются только эти столбцы, поэтому условный запрос (If-None-Match)
+    проверяется без загрузки описаний курса
+    """
+    Instructor = aliased(User)
+    return select(
+        Course.id, Course.updated_at, Course.total_students, Course.total_reviews,
+        Course.average_rating, Course.total_lessons, Course.is_published, Course.instructor_id,
+        Instructor.updated_at, Category.updated_at
+    ).join(Instructor, Instructor.id == Course.instructor_id).outerjoin(
+        Category, Category.id == Course.category_id
+    )
+
+
+def course_etag(course: Course) -> str:
+    """ETag загруженного курса (те же части, что в course_version_query)"""
+    return weak_etag(
+        course.id, course.updated_at, course.total_students, course.total_reviews,
+        course.average_rating, course.total_lessons, course.is_published, course.instructor_id,
+        course.instructor.updated_at, course.category.updated_at if course.category else None
+    )
+
+
+def can_view_course(is_published: bool, instructor_id: int, current_user: Optional[User]) -> bool:
+    """Неопубликованный курс видят только его преподаватель и админ"""
+    return is_published or (
+            current_user is not None and
+            (current_user.id == instructor_id or current_user.role == UserRole.ADMIN)
+    )
+
+
+async def course_not_modified(
+        db: AsyncSession, condition, if_none_match: Optional[str], current_user: Optional[User]
+) -> Optional[Response]:
+    """Ответ 304, если версия курса совпадает с If-None-Match клиента"""
+    if not if_none_match:
+        return None
+
+    version = (await db.execute(course_version_query().where(condition))).first()
+    if version is None or not can_view_course(version.is_published, version.instructor_id, current_user):
+        return None
+
+    etag = weak_etag(*version)
+    return not_modified(etag) if etag_matches(if_none_match, etag) else None
+
+
+async def slug_exists(db: AsyncSession, slug: str, exclude_id: Optional[int] = None) -> bool:
+    """Проверка занятости slug"""
+    query = select(Course.id).where(Course.slug == slug)
+    if exclude_id is not None:
+        query = query.where(Course.id != exclude_id)
+    return await db.scalar(query.limit(1)) is not None
+
+
+COURSE_SHORT_FIELDS = fields_of(CourseShort)
+
+# Столбцы сортировки списков курсов (у каждого есть индекс (столбец, id))
+COURSE_SORT_COLUMNS = {
+    "created_at": Course.created_at,
+    "price": Course.price,
+    "rating": Course.average_rating,
+    "students": Course.total_students,
+    "title": Course.title
+}
+
+
+def parse_cursor(cursor: str, keyset: Optional[str], sort_column):
+    """(значение ключа, id) из курсора клиента или 400 (keyset None - сортировка без курсоров)"""
+    if keyset is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor pagination is not available for relevance sorting"
+        )
+    try:
+        return decode_cursor(cursor, keyset, sort_column)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+
+def cursor_condition(cursor: str, keyset: Optional[str], sort_column, descending: bool, dialect: str):
+    """Условие keyset пагинации из курсора клиента"""
+    value, last_id = parse_cursor(cursor, keyset, sort_column)
+    return keyset_condition(sort_column, Course.id, value, last_id, descending, dialect)
+
+
+def course_page(rows: list, total: int, page: int, page_size: int, cursor: Optional[str],
+                total_is_estimate: bool = False) -> FastJSONResponse:
+    """Ответ CourseList (rows - до page_size + 1 строк course_short_query)"""
+    # Строки уже в формате CourseShort: ответ сериализуется один раз, без response_model
+    return FastJSONResponse({
+        "courses": [build_course_short_row(row) for row in rows[:page_size]],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": (total + page_size - 1) // page_size,
+        "next_cursor": cursor,
+        "total_is_estimate": total_is_estimate
+    })
+
+
+def build_course_short(course: Course) -> dict:
+    """Построение краткой информации о курсе для списков (поля CourseShort)"""
+    return project(
+        course,
+        COURSE_SHORT_FIELDS,
+        instructor_name=f"{course.instructor.first_name} {course.instructor.last_name}",
+        category_name=course.category.name if course.category else None,
+        is_free=course.is_free
+    )
+
+
+def course_short_query():
+    """
+    Строки списка курсов одним запросом: только столбцы CourseShort,
+    имя преподавателя и название категории (без ORM объектов и описаний)
+
+    created_at выбирается для курсора keyset пагинации
+    """
+    return select(
+        Course.id, Course.title, Course.short_description, Course.thumbnail_url, Course.level,
+        Course.price, Course.discount_price, Course.average_rating, Course.total_students,
+        Course.total_lessons, Course.duration_hours, Course.created_at,
+        User.first_name.label("instructor_first_name"), User.last_name.label("instructor_last_name"),
+        Category.name.label("category_name")
+    ).join(User, User.id == Course.instructor_id).outerjoin(Category, Category.id == Course.category_id)
+
+
+def catalog_rows_query():
+    """Опубликованные курсы для снимка каталога (столбцы CatalogRow)"""
+    return course_short_query().add_columns(Course.category_id, Course.instructor_id).where(
+        Course.is_published == True, Course.status == CourseStatus.PUBLISHED
+    )
+
+
+def build_course_short_row(row) -> dict:
+    """Построение CourseShort из строки course_short_query"""
+    return project(
+        row,
+        COURSE_SHORT_FIELDS,
+        instructor_name=f"{row.instructor_first_name} {row.instructor_last_name}",
+        is_free=row.price == 0.0
+    )
+
+
+def build_course_response(course: Course) -> dict:
     """Построение ответа с информацией о курсе"""
     instructor_name = f"{course.instructor.first_name} {course.instructor.last_name}"
     category_name = course.category.name if course.category else None
@@ -46,13 +221,13 @@ def build_course_response(course: Course, db: Session) -> dict:
 async def create_course(
         course_data: CourseCreate,
         current_user: User = Depends(require_role([UserRole.INSTRUCTOR, UserRole.ADMIN])),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Создание нового курса (только для преподавателей и админов)"""
 
     # Проверка существования категории
     if course_data.category_id:
-        category = db.query(Category).filter(Category.id == course_data.category_id).first()
+        category = await db.get(Category, course_data.category_id)
         if not category:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -65,7 +240,7 @@ async def create_course(
     counter = 1
 
     # Проверка уникальности slug
-    while db.query(Course).filter(Course.slug == slug).first():
+    while await slug_exists(db, slug):
         slug = f"{base_slug}-{counter}"
         counter += 1
 
@@ -79,10 +254,11 @@ async def create_course(
     )
 
     db.add(new_course)
-    db.commit()
-    db.refresh(new_course)
+    await db.commit()
+    course_counts.clear()
+    catalog_cache.invalidate(new_course.id)
 
-    return build_course_response(new_course, db)
+    return build_course_response(await get_course_or_404(db, new_course.id))
 
 
 @router.get("/", response_model=CourseList)
@@ -96,152 +272,156 @@ async def get_courses(
         min_rating: Optional[float] = Query(None, ge=0, le=5),
         instructor_id: Optional[int] = None,
         status: Optional[CourseStatus] = None,
-        sort_by: str = Query("created_at", description="Sort by: created_at, price, rating, students"),
+        sort_by: Optional[str] = Query(
+            None, description="Sort by: relevance (default with search), created_at, price, rating, students"
+        ),
         sort_order: str = Query("desc", description="Sort order: asc, desc"),
         page: int = Query(1, ge=1),
         page_size: int = Query(10, ge=1, le=100),
-        db: Session = Depends(get_db),
+        cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы (вместо page)"),
+        db: AsyncSession = Depends(get_async_read_db),
         current_user: Optional[User] = Depends(get_current_user)
 ):
     """Получение списка курсов с фильтрацией и пагинацией"""
 
-    # Базовый запрос
-    query = db.query(Course)
+    # Условия фильтрации (общие для выборки и подсчета)
+    filters = []
 
     # Фильтрация по статусу (обычные пользователи видят только опубликованные)
-    if not current_user or current_user.role == UserRole.STUDENT:
-        query = query.filter(Course.is_published == True, Course.status == CourseStatus.PUBLISHED)
+    published_only = not current_user or current_user.role == UserRole.STUDENT
+    if published_only:
+        filters += [Course.is_published == True, Course.status == CourseStatus.PUBLISHED]
     elif status:
-        query = query.filter(Course.status == status)
-
-    # Поиск
-    if search:
-        search_filter = or_(
-            Course.title.ilike(f"%{search}%"),
-            Course.description.ilike(f"%{search}%"),
-            Course.short_description.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+        filters.append(Course.status == status)
+    visibility_filters = len(filters)
+
+    # Полнотекстовый поиск (PostgreSQL: tsvector, SQLite: FTS5)
+    course_search = CourseSearch.build(search, db.bind.dialect.name)
 
     # Фильтры
     if category_id:
-        query = query.filter(Course.category_id == category_id)
+        filters.append(Course.category_id == category_id)
 
     if level:
-        query = query.filter(Course.level == level)
+        filters.append(Course.level == level)
 
     if is_free is not None:
         if is_free:
-            query = query.filter(Course.price == 0)
+            filters.append(Course.price == 0)
         else:
-            query = query.filter(Course.price > 0)
+            filters.append(Course.price > 0)
 
     if min_price is not None:
-        query = query.filter(Course.price >= min_price)
+        filters.append(Course.price >= min_price)
 
     if max_price is not None:
-        query = query.filter(Course.price <= max_price)
+        filters.append(Course.price <= max_price)
 
     if min_rating is not None:
-        query = query.filter(Course.average_rating >= min_rating)
+        filters.append(Course.average_rating >= min_rating)
 
     if instructor_id:
-        query = query.filter(Course.instructor_id == instructor_id)
-
-    # Сортировка
-    sort_column = {
-        "created_at": Course.created_at,
-        "price": Course.price,
-        "rating": Course.average_rating,
-        "students": Course.total_students,
-        "title": Course.title
-    }.get(sort_by, Course.created_at)
-
-    if sort_order == "desc":
-        query = query.order_by(sort_column.desc())
+        filters.append(Course.instructor_id == instructor_id)
+
+    # Сортировка (ID - второй ключ: порядок строк с равным значением стабилен)
+    sort_key = sort_by if sort_by in COURSE_SORT_COLUMNS else "created_at"
+    sort_column = COURSE_SORT_COLUMNS[sort_key]
+    descending = sort_order == "desc"
+    order = [sort_column.desc(), Course.id.desc()] if descending else [sort_column.asc(), Course.id.asc()]
+    keyset = f"{sort_key}:{'desc' if descending else 'asc'}"
+
+    # С поиском по умолчанию - по релевантности (при равной - новые выше); курсоры не выдаются
+    if course_search is not None and course_search.rank is not None and sort_by in (None, "relevance"):
+        order = [course_search.rank, Course.created_at.desc(), Course.id.desc()]
+        keyset = None
+
+    # Опубликованный каталог без поиска - из снимка в памяти worker'а, если его порядок совпадает с порядком БД
+    snapshot = await catalog_cache.get(catalog_rows_query) if published_only and course_search is None else None
+    if snapshot is not None and snapshot.supports(sort_key):
+        courses, total = snapshot.query(
+            sort_key, descending, page_size + 1,
+            offset=0 if cursor else (page - 1) * page_size,
+            after=parse_cursor(cursor, keyset, sort_column) if cursor else None,
+            category_id=category_id, level=level, instructor_id=instructor_id, is_free=is_free,
+            min_price=min_price, max_price=max_price, min_rating=min_rating
+        )
+        return course_page(courses, total, page, page_size, next_cursor(keyset, sort_column, courses, page_size))
+
+    count_query = select(func.count(Course.id)).select_from(Course).where(*filters)
+    courses_query = course_short_query().where(*filters)
+    if course_search is not None:
+        count_query = course_search.apply(count_query)
+        courses_query = course_search.apply(courses_query)
+
+    # Подсчет общего количества: кэш по фильтрам, без фильтров - возможна оценка планировщика
+    count_key = (
+        published_only, None if published_only else status, tuple(course_search.terms) if course_search else None,
+        category_id, level, min_price, max_price, is_free, min_rating, instructor_id
+    )
+    unfiltered = course_search is None and len(filters) == visibility_filters
+    total, total_is_estimate = await count_courses(
+        db, count_key, count_query, select(Course.id).where(*filters) if unfiltered else None
+    )
+
+    courses_query = courses_query.order_by(*order)
+    if cursor:
+        courses_query = courses_query.where(
+            cursor_condition(cursor, keyset, sort_column, descending, db.bind.dialect.name)
+        )
     else:
-        query = query.order_by(sort_column.asc())
-
-    # Подсчет общего количества
-    total = query.count()
-
-    # Пагинация
-    offset = (page - 1) * page_size
-    courses = query.offset(offset).limit(page_size).all()
-
-    # Формирование ответа
-    courses_data = []
-    for course in courses:
-        instructor_name = f"{course.instructor.first_name} {course.instructor.last_name}"
-        category_name = course.category.name if course.category else None
-
-        courses_data.append(CourseShort(
-            id=course.id,
-            title=course.title,
-            short_description=course.short_description,
-            thumbnail_url=course.thumbnail_url,
-            level=course.level,
-            price=course.price,
-            discount_price=course.discount_price,
-            average_rating=course.average_rating,
-            total_students=course.total_students,
-            total_lessons=course.total_lessons,
-            duration_hours=course.duration_hours,
-            instructor_name=instructor_name,
-            category_name=category_name,
-            is_free=course.is_free
-        ))
-
-    total_pages = (total + page_size - 1) // page_size
-
-    return CourseList(
-        courses=courses_data,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
+        courses_query = courses_query.offset((page - 1) * page_size)
+
+    # Лишняя строка показывает, есть ли следующая страница
+    courses = (await db.execute(courses_query.limit(page_size + 1))).all()
+
+    return course_page(
+        courses, total, page, page_size, keyset and next_cursor(keyset, sort_column, courses, page_size),
+        total_is_estimate
     )
 
 
 @router.get("/{course_id}", response_model=CourseResponse)
 async def get_course(
         course_id: int,
-        db: Session = Depends(get_db),
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        db: AsyncSession = Depends(get_async_db),
         current_user: Optional[User] = Depends(get_current_user)
 ):
-    """Получение детальной информации о курсе"""
+    """Получение детальной информации о курсе (поддерживает If-None-Match)"""
 
-    course = db.query(Course).filter(Course.id == course_id).first()
+    cached = await course_not_modified(db, Course.id == course_id, if_none_match, current_user)
+    if cached is not None:
+        return cached
 
-    if not course:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Course not found"
-        )
+    course = await get_course_or_404(db, course_id)
 
     # Проверка доступа к неопубликованным курсам
-    if not course.is_published:
-        if not current_user or (
-                current_user.id != course.instructor_id and
-                current_user.role != UserRole.ADMIN
-        ):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied"
-            )
+    if not can_view_course(course.is_published, course.instructor_id, current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
 
-    return build_course_response(course, db)
+    response.headers["ETag"] = course_etag(course)
+    return build_course_response(course)
 
 
 @router.get("/slug/{slug}", response_model=CourseResponse)
 async def get_course_by_slug(
         slug: str,
-        db: Session = Depends(get_db),
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        db: AsyncSession = Depends(get_async_db),
         current_user: Optional[User] = Depends(get_current_user)
 ):
-    """Получение курса по slug"""
+    """Получение курса по slug (поддерживает If-None-Match)"""
+
+    cached = await course_not_modified(db, Course.slug == slug, if_none_match, current_user)
+    if cached is not None:
+        return cached
 
-    course = db.query(Course).filter(Course.slug == slug).first()
+    course = await db.scalar(course_with_relations().where(Course.slug == slug))
 
     if not course:
         raise HTTPException(
@@ -250,17 +430,14 @@ async def get_course_by_slug(
         )
 
     # Проверка доступа
-    if not course.is_published:
-        if not current_user or (
-                current_user.id != course.instructor_id and
-                current_user.role != UserRole.ADMIN
-        ):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied"
-            )
+    if not can_view_course(course.is_published, course.instructor_id, current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
 
-    return build_course_response(course, db)
+    response.headers["ETag"] = course_etag(course)
+    return build_course_response(course)
 
 
 @router.put("/{course_id}", response_model=CourseResponse)
@@ -268,17 +445,11 @@ async def update_course(
         course_id: int,
         course_data: CourseUpdate,
         current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Обновление курса"""
 
-    course = db.query(Course).filter(Course.id == course_id).first()
-
-    if not course:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Course not found"
-        )
+    course = await get_course_or_404(db, course_id)
 
     # Проверка прав доступа
     if course.instructor_id != current_user.id and current_user.role != UserRole.ADMIN:
@@ -297,10 +468,7 @@ async def update_course(
             # Проверка уникальности
             counter = 1
             slug = new_slug
-            while db.query(Course).filter(
-                    Course.slug == slug,
-                    Course.id != course_id
-            ).first():
+            while await slug_exists(db, slug, exclude_id=course_id):
                 slug = f"{new_slug}-{counter}"
                 counter += 1
             update_data["slug"] = slug
@@ -310,10 +478,11 @@ async def update_course(
 
     course.updated_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(course)
+    await db.commit()
+    course_counts.clear()
+    catalog_cache.invalidate(course_id)
 
-    return build_course_response(course, db)
+    return build_course_response(await get_course_or_404(db, course_id))
 
 
 @router.patch("/{course_id}/publish", response_model=CourseResponse)
@@ -321,17 +490,11 @@ async def publish_course(
         course_id: int,
         publish_data: CoursePublish,
         current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Публикация/снятие с публикации курса"""
 
-    course = db.query(Course).filter(Course.id == course_id).first()
-
-    if not course:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Course not found"
-        )
+    course = await get_course_or_404(db, course_id)
 
     # Проверка прав
     if course.instructor_id != current_user.id and current_user.role != UserRole.ADMIN:
@@ -349,21 +512,22 @@ async def publish_course(
     else:
         course.status = CourseStatus.DRAFT
 
-    db.commit()
-    db.refresh(course)
+    await db.commit()
+    course_counts.clear()
+    catalog_cache.invalidate(course_id)
 
-    return build_course_response(course, db)
+    return build_course_response(await get_course_or_404(db, course_id))
 
 
 @router.delete("/{course_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_course(
         course_id: int,
         current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Удаление курса"""
 
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
 
     if not course:
         raise HTTPException(
@@ -379,9 +543,9 @@ async def delete_course(
         )
 
     # Проверка, есть ли студенты на курсе
-    enrollments_count = db.query(Enrollment).filter(
-        Enrollment.course_id == course_id
-    ).count()
+    enrollments_count = await db.scalar(
+        select(func.count(Enrollment.id)).where(Enrollment.course_id == course_id)
+    )
 
     if enrollments_count > 0:
         raise HTTPException(
@@ -389,8 +553,10 @@ async def delete_course(
             detail="Cannot delete course with enrolled students. Archive it instead."
         )
 
-    db.delete(course)
-    db.commit()
+    await db.delete(course)
+    await db.commit()
+    course_counts.clear()
+    catalog_cache.invalidate(course_id)
 
     return None
 
@@ -399,45 +565,24 @@ async def delete_course(
 async def get_my_courses(
         page: int = Query(1, ge=1),
         page_size: int = Query(10, ge=1, le=100),
-        current_user: User = Depends(require_role([UserRole.INSTRUCTOR, UserRole.ADMIN])),
-        db: Session = Depends(get_db)
+        cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы (вместо page)"),
+        current_user: User = Depends(require_role([UserRole.INSTRUCTOR, UserRole.ADMIN], from_token=True)),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Получение курсов текущего преподавателя"""
 
-    query = db.query(Course).filter(Course.instructor_id == current_user.id)
-
-    total = query.count()
-    offset = (page - 1) * page_size
-    courses = query.order_by(Course.created_at.desc()).offset(offset).limit(page_size).all()
-
-    courses_data = []
-    for course in courses:
-        instructor_name = f"{course.instructor.first_name} {course.instructor.last_name}"
-        category_name = course.category.name if course.category else None
-
-        courses_data.append(CourseShort(
-            id=course.id,
-            title=course.title,
-            short_description=course.short_description,
-            thumbnail_url=course.thumbnail_url,
-            level=course.level,
-            price=course.price,
-            discount_price=course.discount_price,
-            average_rating=course.average_rating,
-            total_students=course.total_students,
-            total_lessons=course.total_lessons,
-            duration_hours=course.duration_hours,
-            instructor_name=instructor_name,
-            category_name=category_name,
-            is_free=course.is_free
-        ))
-
-    total_pages = (total + page_size - 1) // page_size
-
-    return CourseList(
-        courses=courses_data,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
-    )
\ No newline at end of file
+    condition = Course.instructor_id == current_user.id
+    keyset = "created_at:desc"
+
+    total = await db.scalar(select(func.count(Course.id)).where(condition))
+
+    courses_query = course_short_query().where(condition).order_by(Course.created_at.desc(), Course.id.desc())
+    if cursor:
+        courses_query = courses_query.where(
+            cursor_condition(cursor, keyset, Course.created_at, True, db.bind.dialect.name)
+        )
+    else:
+        courses_query = courses_query.offset((page - 1) * page_size)
+    courses = (await db.execute(courses_query.limit(page_size + 1))).all()
+
+    return course_page(courses, total, page, page_size, next_cursor(keyset, Course.created_at, courses, page_size))
@@ -1,10 +1,12 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import func, select
 from datetime import datetime
 
-from app.database import get_db
-from app.models.user import User
+from app.database import get_async_db
+from app.models.user import User, UserRole
 from app.models.course import Course
 from app.models.enrollment import Enrollment, EnrollmentStatus
 from app.models.lesson import Lesson
@@ -16,7 +18,8 @@ from app.schemas.enrollment import (
     EnrollmentWithCourse,
     StudentListResponse
 )
-from app.utils.dependencies import get_current_user, require_instructor, require_admin
+from app.utils.dependencies import get_current_user, require_role, require_admin
+from app.utils.metrics import ENROLLMENTS
 
 router = APIRouter(prefix="/enrollments", tags=["Enrollments"])
 
@@ -24,14 +27,14 @@ router = APIRouter(prefix="/enrollments", tags=["Enrollments"])
 @router.post("/", response_model=EnrollmentResponse, status_code=status.HTTP_201_CREATED)
 async def enroll_in_course(
         enrollment_data: EnrollmentCreate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     """
     Записаться на курс (для студентов)
     """
     # Проверяем существование курса
-    course = db.query(Course).filter(Course.id == enrollment_data.course_id).first()
+    course = await db.get(Course, enrollment_data.course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -46,10 +49,10 @@ async def enroll_in_course(
         )
 
     # Проверяем, не записан ли уже пользователь
-    existing_enrollment = db.query(Enrollment).filter(
+    existing_enrollment = await db.scalar(select(Enrollment).where(
         Enrollment.student_id == current_user.id,
         Enrollment.course_id == enrollment_data.course_id
-    ).first()
+    ))
 
     if existing_enrollment:
         raise HTTPException(
@@ -70,8 +73,10 @@ async def enroll_in_course(
     # Увеличиваем счетчик студентов курса
     course.total_students += 1
 
-    db.commit()
-    db.refresh(enrollment)
+    await db.commit()
+    await db.refresh(enrollment)
+
+    ENROLLMENTS.inc()
 
     return enrollment
 
@@ -79,26 +84,31 @@ async def enroll_in_course(
 @router.get("/my-courses", response_model=List[EnrollmentWithCourse])
 async def get_my_enrollments(
         status_filter: Optional[EnrollmentStatus] = Query(None, description="Фильтр по статусу"),
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     """
     Получить список курсов, на которые записан текущий пользователь
     """
-    query = db.query(Enrollment).filter(Enrollment.student_id == current_user.id)
+    query = select(Enrollment).options(
+        joinedload(Enrollment.course).joinedload(Course.instructor)
+    ).where(Enrollment.student_id == current_user.id)
 
     if status_filter:
-        query = query.filter(Enrollment.status == status_filter)
+        query = query.where(Enrollment.status == status_filter)
 
-    enrollments = query.order_by(Enrollment.enrolled_at.desc()).all()
+    enrollments = (await db.scalars(query.order_by(Enrollment.enrolled_at.desc()))).all()
 
     # Добавляем информацию о курсе
     result = []
     for enrollment in enrollments:
-        course = db.query(Course).filter(Course.id == enrollment.course_id).first()
+        course = enrollment.course
         result.append({
             **enrollment.__dict__,
-            "course": course
+            "course": {
+                **course.__dict__,
+                "instructor_name": course.instructor.full_name
+            }
         })
 
     return result
@@ -107,13 +117,13 @@ async def get_my_enrollments(
 @router.get("/{enrollment_id}", response_model=EnrollmentDetail)
 async def get_enrollment(
         enrollment_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     """
     Получить информацию о конкретной записи
     """
-    enrollment = db.query(Enrollment).filter(Enrollment.id == enrollment_id).first()
+    enrollment = await db.get(Enrollment, enrollment_id)
 
     if not enrollment:
         raise HTTPException(
@@ -137,14 +147,14 @@ async def get_course_students(
         status_filter: Optional[EnrollmentStatus] = Query(None),
         skip: int = Query(0, ge=0),
         limit: int = Query(100, ge=1, le=100),
-        db: Session = Depends(get_db),
-        current_user: User = Depends(require_instructor)
+        db: AsyncSession = Depends(get_async_db),
+        current_user: User = Depends(require_role([UserRole.INSTRUCTOR, UserRole.ADMIN], from_token=True))
 ):
     """
     Получить список студентов курса (только для преподавателей/админов)
     """
     # Проверяем курс
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -159,17 +169,21 @@ async def get_course_students(
         )
 
     # Получаем студентов
-    query = db.query(Enrollment).filter(Enrollment.course_id == course_id)
+    query = select(Enrollment).options(
+        joinedload(Enrollment.student)
+    ).where(Enrollment.course_id == course_id)
 
     if status_filter:
-        query = query.filter(Enrollment.status == status_filter)
+        query = query.where(Enrollment.status == status_filter)
 
-    enrollments = query.order_by(Enrollment.enrolled_at.desc()).offset(skip).limit(limit).all()
+    enrollments = (await db.scalars(
+        query.order_by(Enrollment.enrolled_at.desc()).offset(skip).limit(limit)
+    )).all()
 
     # Добавляем информацию о студентах
     result = []
     for enrollment in enrollments:
-        student = db.query(User).filter(User.id == enrollment.student_id).first()
+        student = enrollment.student
         result.append({
             "enrollment_id": enrollment.id,
             "student_id": student.id,
@@ -189,13 +203,13 @@ async def get_course_students(
 @router.delete("/{enrollment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def cancel_enrollment(
         enrollment_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     """
     Отменить запись на курс
     """
-    enrollment = db.query(Enrollment).filter(Enrollment.id == enrollment_id).first()
+    enrollment = await db.get(Enrollment, enrollment_id)
 
     if not enrollment:
         raise HTTPException(
@@ -214,11 +228,11 @@ async def cancel_enrollment(
     enrollment.status = EnrollmentStatus.DROPPED
 
     # Уменьшаем счетчик студентов
-    course = db.query(Course).filter(Course.id == enrollment.course_id).first()
+    course = await db.get(Course, enrollment.course_id)
     if course:
         course.total_students = max(0, course.total_students - 1)
 
-    db.commit()
+    await db.commit()
 
     return None
 
@@ -226,13 +240,13 @@ async def cancel_enrollment(
 @router.post("/{enrollment_id}/complete")
 async def complete_course(
         enrollment_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     """
     Отметить курс как завершенный (автоматически при 100% прогрессе)
     """
-    enrollment = db.query(Enrollment).filter(Enrollment.id == enrollment_id).first()
+    enrollment = await db.get(Enrollment, enrollment_id)
 
     if not enrollment:
         raise HTTPException(
@@ -256,7 +270,7 @@ async def complete_course(
     enrollment.status = EnrollmentStatus.COMPLETED
     enrollment.completed_at = datetime.utcnow()
 
-    db.commit()
+    await db.commit()
 
     return {
         "message": "Курс успешно завершен!",
@@ -267,16 +281,16 @@ async def complete_course(
 @router.get("/check/{course_id}")
 async def check_enrollment(
         course_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     """
     Проверить, записан ли пользователь на курс
     """
-    enrollment = db.query(Enrollment).filter(
+    enrollment = await db.scalar(select(Enrollment).where(
         Enrollment.student_id == current_user.id,
         Enrollment.course_id == course_id
-    ).first()
+    ))
 
     if not enrollment:
         return {
@@ -295,14 +309,14 @@ async def check_enrollment(
 @router.get("/course/{course_id}/statistics")
 async def get_course_statistics(
         course_id: int,
-        db: Session = Depends(get_db),
-        current_user: User = Depends(require_instructor)
+        db: AsyncSession = Depends(get_async_db),
+        current_user: User = Depends(require_role([UserRole.INSTRUCTOR, UserRole.ADMIN], from_token=True))
 ):
     """
     Получить статистику курса (только для преподавателей/админов)
     """
     # Проверяем курс
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -317,21 +331,24 @@ async def get_course_statistics(
         )
 
     # Собираем статистику
-    total_enrollments = db.query(Enrollment).filter(Enrollment.course_id == course_id).count()
+    total_enrollments = await db.scalar(
+        select(func.count(Enrollment.id)).where(Enrollment.course_id == course_id)
+    )
 
-    active_students = db.query(Enrollment).filter(
+    active_students = await db.scalar(select(func.count(Enrollment.id)).where(
         Enrollment.course_id == course_id,
         Enrollment.status == EnrollmentStatus.ACTIVE
-    ).count()
+    ))
 
-    completed_students = db.query(Enrollment).filter(
+    completed_students = await db.scalar(select(func.count(Enrollment.id)).where(
         Enrollment.course_id == course_id,
         Enrollment.status == EnrollmentStatus.COMPLETED
-    ).count()
+    ))
 
     # Средний прогресс
-    enrollments = db.query(Enrollment).filter(Enrollment.course_id == course_id).all()
-    avg_progress = sum(e.progress_percentage for e in enrollments) / len(enrollments) if enrollments else 0
+    avg_progress = await db.scalar(
+        select(func.avg(Enrollment.progress_percentage)).where(Enrollment.course_id == course_id)
+    ) or 0
 
     return {
         "course_id": course_id,
@@ -1,15 +1,18 @@
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, update
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.models.lesson import Lesson
 from app.models.course import Course
 from app.models.enrollment import Enrollment
 from app.schemas.lessons import LessonCreate, LessonUpdate, LessonResponse, LessonDetail
 from app.utils.dependencies import get_current_user, require_instructor as check_instructor_or_admin
+from app.utils.etag import weak_etag, etag_matches, not_modified
+from app.utils.metrics import LESSON_COMPLETIONS
 
 router = APIRouter(prefix="/lessons", tags=["Lessons"])
 
@@ -17,14 +20,14 @@ router = APIRouter(prefix="/lessons", tags=["Lessons"])
 @router.post("/", response_model=LessonResponse, status_code=status.HTTP_201_CREATED)
 async def create_lesson(
         lesson_data: LessonCreate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(check_instructor_or_admin)
 ):
     """
     Создать новый урок (только преподаватели и админы)
     """
     # Проверяем, существует ли курс
-    course = db.query(Course).filter(Course.id == lesson_data.course_id).first()
+    course = await db.get(Course, lesson_data.course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -40,7 +43,9 @@ async def create_lesson(
 
     # Если order не указан, ставим последним
     if lesson_data.order is None:
-        max_order = db.query(Lesson).filter(Lesson.course_id == lesson_data.course_id).count()
+        max_order = await db.scalar(
+            select(func.count(Lesson.id)).where(Lesson.course_id == lesson_data.course_id)
+        )
         lesson_data.order = max_order + 1
 
     # Создаем урок
@@ -48,24 +53,54 @@ async def create_lesson(
     db.add(lesson)
 
     # Обновляем счетчик уроков в курсе
-    course.total_lessons = db.query(Lesson).filter(Lesson.course_id == course.id).count() + 1
+    course.total_lessons = await db.scalar(
+        select(func.count(Lesson.id)).where(Lesson.course_id == course.id)
+    ) + 1
 
-    db.commit()
-    db.refresh(lesson)
+    await db.commit()
+    await db.refresh(lesson)
 
     return lesson
 
 
+async def has_lesson_access(db: AsyncSession, is_free_preview: bool, course_id: int, current_user: User) -> bool:
+    """Бесплатный урок доступен всем, остальные - записанным студентам, преподавателям и админам"""
+    if is_free_preview:
+        return True
+
+    # Проверяем, записан ли пользователь на курс
+    enrollment = await db.scalar(select(Enrollment.id).where(
+        Enrollment.student_id == current_user.id,
+        Enrollment.course_id == course_id
+    ))
+    return enrollment is not None or current_user.role in ["admin", "instructor"]
+
+
 @router.get("/{lesson_id}", response_model=LessonDetail)
 async def get_lesson(
         lesson_id: int,
-        db: Session = Depends(get_db),
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        db: AsyncSession = Depends(get_async_db),
         current_user: Optional[User] = Depends(get_current_user)
 ):
     """
-    Получить информацию об уроке
+    Получить информацию об уроке (поддерживает If-None-Match)
     """
-    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    # Условный запрос проверяется по версии урока, без загрузки контента
+    if if_none_match:
+        version = (await db.execute(select(
+            Lesson.id, Lesson.updated_at, Lesson.version, Lesson.is_free_preview, Lesson.course_id
+        ).where(Lesson.id == lesson_id))).first()
+
+        if version is not None:
+            etag = weak_etag(version.id, version.updated_at, version.version)
+            if etag_matches(if_none_match, etag) and await has_lesson_access(
+                    db, version.is_free_preview, version.course_id, current_user
+            ):
+                return not_modified(etag)
+
+    lesson = await db.get(Lesson, lesson_id)
 
     if not lesson:
         raise HTTPException(
@@ -73,34 +108,45 @@ async def get_lesson(
             detail="Урок не найден"
         )
 
-    # Проверяем доступ к уроку
-    if not lesson.is_free_preview:
-        # Проверяем, записан ли пользователь на курс
-        enrollment = db.query(Enrollment).filter(
-            Enrollment.student_id == current_user.id,
-            Enrollment.course_id == lesson.course_id
-        ).first()
-
-        # Если не записан и не инструктор/админ - запрещаем доступ
-        if not enrollment and current_user.role not in ["admin", "instructor"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="У вас нет доступа к этому уроку. Запишитесь на курс."
-            )
+    # Если не записан и не инструктор/админ - запрещаем доступ
+    if not await has_lesson_access(db, lesson.is_free_preview, lesson.course_id, current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="У вас нет доступа к этому уроку. Запишитесь на курс."
+        )
 
+    response.headers["ETag"] = weak_etag(lesson.id, lesson.updated_at, lesson.version)
     return lesson
 
 
 @router.get("/course/{course_id}", response_model=List[LessonResponse])
 async def get_course_lessons(
         course_id: int,
-        db: Session = Depends(get_db)
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Получить все уроки курса (в порядке следования)
+    Получить все уроки курса (в порядке следования, поддерживает If-None-Match)
     """
+    published = (Lesson.course_id == course_id, Lesson.is_published == True)
+
+    # Версия списка: количество опубликованных уроков, последнее изменение и сумма версий
+    if if_none_match:
+        version = (await db.execute(select(
+            Course.id,
+            select(func.count(Lesson.id)).where(*published).scalar_subquery(),
+            select(func.max(Lesson.updated_at)).where(*published).scalar_subquery(),
+            select(func.sum(Lesson.version)).where(*published).scalar_subquery()
+        ).where(Course.id == course_id))).first()
+
+        if version is not None:
+            etag = weak_etag(*version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
     # Проверяем существование курса
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -108,11 +154,12 @@ async def get_course_lessons(
         )
 
     # Получаем все уроки курса, отсортированные по order
-    lessons = db.query(Lesson).filter(
-        Lesson.course_id == course_id,
-        Lesson.is_published == True
-    ).order_by(Lesson.order).all()
+    lessons = (await db.scalars(select(Lesson).where(*published).order_by(Lesson.order))).all()
 
+    response.headers["ETag"] = weak_etag(
+        course_id, len(lessons), max((lesson.updated_at for lesson in lessons), default=None),
+        sum(lesson.version for lesson in lessons) if lessons else None
+    )
     return lessons
 
 
@@ -120,13 +167,13 @@ async def get_course_lessons(
 async def update_lesson(
         lesson_id: int,
         lesson_data: LessonUpdate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(check_instructor_or_admin)
 ):
     """
     Обновить урок (только владелец курса или админ)
     """
-    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    lesson = await db.get(Lesson, lesson_id)
 
     if not lesson:
         raise HTTPException(
@@ -135,7 +182,7 @@ async def update_lesson(
         )
 
     # Проверяем права доступа
-    course = db.query(Course).filter(Course.id == lesson.course_id).first()
+    course = await db.get(Course, lesson.course_id)
     if course.instructor_id != current_user.id and current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -146,9 +193,10 @@ async def update_lesson(
     update_data = lesson_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(lesson, field, value)
+    lesson.version += 1
 
-    db.commit()
-    db.refresh(lesson)
+    await db.commit()
+    await db.refresh(lesson)
 
     return lesson
 
@@ -156,13 +204,13 @@ async def update_lesson(
 @router.delete("/{lesson_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_lesson(
         lesson_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(check_instructor_or_admin)
 ):
     """
     Удалить урок (только владелец курса или админ)
     """
-    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    lesson = await db.get(Lesson, lesson_id)
 
     if not lesson:
         raise HTTPException(
@@ -171,7 +219,7 @@ async def delete_lesson(
         )
 
     # Проверяем права доступа
-    course = db.query(Course).filter(Course.id == lesson.course_id).first()
+    course = await db.get(Course, lesson.course_id)
     if course.instructor_id != current_user.id and current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -180,12 +228,15 @@ async def delete_lesson(
 
     course_id = lesson.course_id
 
-    db.delete(lesson)
+    await db.delete(lesson)
+    await db.flush()
 
     # Обновляем счетчик уроков
-    course.total_lessons = db.query(Lesson).filter(Lesson.course_id == course_id).count()
+    course.total_lessons = await db.scalar(
+        select(func.count(Lesson.id)).where(Lesson.course_id == course_id)
+    )
 
-    db.commit()
+    await db.commit()
 
     return None
 
@@ -194,13 +245,13 @@ async def delete_lesson(
 async def reorder_lesson(
         lesson_id: int,
         new_order: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(check_instructor_or_admin)
 ):
     """
     Изменить порядок урока в курсе
     """
-    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    lesson = await db.get(Lesson, lesson_id)
 
     if not lesson:
         raise HTTPException(
@@ -209,7 +260,7 @@ async def reorder_lesson(
         )
 
     # Проверяем права доступа
-    course = db.query(Course).filter(Course.id == lesson.course_id).first()
+    course = await db.get(Course, lesson.course_id)
     if course.instructor_id != current_user.id and current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -225,23 +276,24 @@ async def reorder_lesson(
     # Обновляем порядок других уроков
     if new_order < old_order:
         # Сдвигаем вниз уроки между new_order и old_order
-        db.query(Lesson).filter(
+        await db.execute(update(Lesson).where(
             Lesson.course_id == lesson.course_id,
             Lesson.order >= new_order,
             Lesson.order < old_order
-        ).update({Lesson.order: Lesson.order + 1})
+        ).values({Lesson.order: Lesson.order + 1, Lesson.version: Lesson.version + 1}))
     else:
         # Сдвигаем вверх уроки между old_order и new_order
-        db.query(Lesson).filter(
+        await db.execute(update(Lesson).where(
             Lesson.course_id == lesson.course_id,
             Lesson.order > old_order,
             Lesson.order <= new_order
-        ).update({Lesson.order: Lesson.order - 1})
+        ).values({Lesson.order: Lesson.order - 1, Lesson.version: Lesson.version + 1}))
 
     # Устанавливаем новый порядок для текущего урока
     lesson.order = new_order
+    lesson.version += 1
 
-    db.commit()
+    await db.commit()
 
     return {"message": "Порядок урока успешно изменен"}
 
@@ -251,13 +303,13 @@ async def reorder_lesson(
 @router.get("/course/{course_id}/preview", response_model=List[LessonResponse])
 async def get_preview_lessons(
         course_id: int,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Получить бесплатные уроки для предпросмотра курса
     (доступно без авторизации)
     """
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -265,11 +317,11 @@ async def get_preview_lessons(
         )
 
     # Получаем только бесплатные уроки
-    lessons = db.query(Lesson).filter(
+    lessons = (await db.scalars(select(Lesson).where(
         Lesson.course_id == course_id,
         Lesson.is_free_preview == True,
         Lesson.is_published == True
-    ).order_by(Lesson.order).all()
+    ).order_by(Lesson.order))).all()
 
     return lessons
 
@@ -278,7 +330,7 @@ async def get_preview_lessons(
 async def mark_lesson_complete(
         lesson_id: int,
         completion_data: dict,  # {"completion_percentage": 100, "time_spent": 300}
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     """
@@ -286,7 +338,7 @@ async def mark_lesson_complete(
     """
     from app.models.progress import Progress
 
-    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    lesson = await db.get(Lesson, lesson_id)
     if not lesson:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -294,10 +346,10 @@ async def mark_lesson_complete(
         )
 
     # Проверяем, записан ли пользователь на курс
-    enrollment = db.query(Enrollment).filter(
+    enrollment = await db.scalar(select(Enrollment).where(
         Enrollment.student_id == current_user.id,
         Enrollment.course_id == lesson.course_id
-    ).first()
+    ))
 
     if not enrollment:
         raise HTTPException(
@@ -306,10 +358,10 @@ async def mark_lesson_complete(
         )
 
     # Ищем или создаем запись о прогрессе
-    progress = db.query(Progress).filter(
+    progress = await db.scalar(select(Progress).where(
         Progress.student_id == current_user.id,
         Progress.lesson_id == lesson_id
-    ).first()
+    ))
 
     if not progress:
         progress = Progress(
@@ -318,6 +370,8 @@ async def mark_lesson_complete(
         )
         db.add(progress)
 
+    was_completed = bool(progress.is_completed)
+
     # Обновляем прогресс
     progress.completion_percentage = completion_data.get("completion_percentage", 100)
     progress.time_spent += completion_data.get("time_spent", 0)
@@ -328,18 +382,18 @@ async def mark_lesson_complete(
             progress.completed_at = datetime.utcnow()
 
     # Пересчитываем прогресс по курсу
-    total_lessons = db.query(Lesson).filter(
+    total_lessons = await db.scalar(select(func.count(Lesson.id)).where(
         Lesson.course_id == lesson.course_id,
         Lesson.is_published == True
-    ).count()
+    ))
 
-    completed_lessons = db.query(Progress).filter(
+    completed_lessons = await db.scalar(select(func.count(Progress.id)).where(
         Progress.student_id == current_user.id,
         Progress.is_completed == True,
         Progress.lesson_id.in_(
-            db.query(Lesson.id).filter(Lesson.course_id == lesson.course_id)
+            select(Lesson.id).where(Lesson.course_id == lesson.course_id)
         )
-    ).count()
+    ))
 
     # Обновляем enrollment
     enrollment.completed_lessons = completed_lessons
@@ -352,8 +406,11 @@ async def mark_lesson_complete(
         if not enrollment.completed_at:
             enrollment.completed_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(progress)
+    await db.commit()
+    await db.refresh(progress)
+
+    if progress.is_completed and not was_completed:
+        LESSON_COMPLETIONS.inc()
 
     return {
         "message": "Прогресс обновлен",
@@ -373,7 +430,7 @@ async def mark_lesson_complete(
 @router.get("/course/{course_id}/with-progress", response_model=List[dict])
 async def get_lessons_with_progress(
         course_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     """
@@ -382,10 +439,10 @@ async def get_lessons_with_progress(
     from app.models.progress import Progress
 
     # Проверяем доступ к курсу
-    enrollment = db.query(Enrollment).filter(
+    enrollment = await db.scalar(select(Enrollment).where(
         Enrollment.student_id == current_user.id,
         Enrollment.course_id == course_id
-    ).first()
+    ))
 
     if not enrollment and current_user.role not in ["admin", "instructor"]:
         raise HTTPException(
@@ -394,18 +451,24 @@ async def get_lessons_with_progress(
         )
 
     # Получаем уроки
-    lessons = db.query(Lesson).filter(
+    lessons = (await db.scalars(select(Lesson).where(
         Lesson.course_id == course_id,
         Lesson.is_published == True
-    ).order_by(Lesson.order).all()
+    ).order_by(Lesson.order))).all()
+
+    # Прогресс по всем урокам курса одним запросом
+    progress_by_lesson = {
+        progress.lesson_id: progress
+        for progress in (await db.scalars(select(Progress).where(
+            Progress.student_id == current_user.id,
+            Progress.lesson_id.in_([lesson.id for lesson in lessons])
+        ))).all()
+    } if lessons else {}
 
     # Добавляем информацию о прогрессе
     result = []
     for lesson in lessons:
-        progress = db.query(Progress).filter(
-            Progress.student_id == current_user.id,
-            Progress.lesson_id == lesson.id
-        ).first()
+        progress = progress_by_lesson.get(lesson.id)
 
         lesson_data = {
             "id": lesson.id,
@@ -430,7 +493,7 @@ async def get_lessons_with_progress(
 @router.post("/bulk-create")
 async def bulk_create_lessons(
         lessons_data: List[LessonCreate],
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(check_instructor_or_admin)
 ):
     """
@@ -453,7 +516,7 @@ async def bulk_create_lessons(
     course_id = list(course_ids)[0]
 
     # Проверяем курс и права
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -474,9 +537,11 @@ async def bulk_create_lessons(
         created_lessons.append(lesson)
 
     # Обновляем счетчик уроков
-    course.total_lessons = db.query(Lesson).filter(Lesson.course_id == course_id).count() + len(created_lessons)
+    course.total_lessons = await db.scalar(
+        select(func.count(Lesson.id)).where(Lesson.course_id == course_id)
+    ) + len(created_lessons)
 
-    db.commit()
+    await db.commit()
 
     return {
         "message": f"Создано уроков: {len(created_lessons)}",
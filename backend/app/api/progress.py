@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import case, func
 from typing import List
 from datetime import datetime
 
@@ -15,6 +15,7 @@ from app.schemas.progress import (
     StudentStatistics
 )
 from app.utils.dependencies import get_current_user
+from app.utils.metrics import LESSON_COMPLETIONS
 from app.models.user import User
 
 # Создаем роутер
@@ -108,6 +109,8 @@ def update_lesson_progress(
             detail="Запись прогресса не найдена. Сначала начните урок."
         )
 
+    was_completed = progress.is_completed
+
     # Обновляем поля
     if progress_data.is_completed is not None:
         progress.is_completed = progress_data.is_completed
@@ -125,6 +128,9 @@ def update_lesson_progress(
     db.commit()
     db.refresh(progress)
 
+    if progress.is_completed and not was_completed:
+        LESSON_COMPLETIONS.inc()
+
     # Обновляем прогресс в enrollment
     _update_enrollment_progress(db, current_user.id, lesson_id)
 
@@ -155,6 +161,8 @@ def complete_lesson(
             detail="Запись прогресса не найдена. Сначала начните урок."
         )
 
+    was_completed = progress.is_completed
+
     progress.is_completed = True
     progress.completion_percentage = 100.0
     progress.completed_at = datetime.utcnow()
@@ -163,6 +171,9 @@ def complete_lesson(
     db.commit()
     db.refresh(progress)
 
+    if not was_completed:
+        LESSON_COMPLETIONS.inc()
+
     # Обновляем прогресс в enrollment
     _update_enrollment_progress(db, current_user.id, lesson_id)
 
@@ -199,12 +210,18 @@ def get_course_progress(
         Lesson.is_published == True
     ).order_by(Lesson.order).all()
 
+    # Прогресс по всем урокам курса одним запросом
+    progress_by_lesson = {
+        progress.lesson_id: progress
+        for progress in db.query(Progress).filter(
+            Progress.student_id == current_user.id,
+            Progress.lesson_id.in_([lesson.id for lesson in lessons])
+        ).all()
+    } if lessons else {}
+
     result = []
     for lesson in lessons:
-        progress = db.query(Progress).filter(
-            Progress.student_id == current_user.id,
-            Progress.lesson_id == lesson.id
-        ).first()
+        progress = progress_by_lesson.get(lesson.id)
 
         result.append(LessonProgressResponse(
             lesson_id=lesson.id,
@@ -230,30 +247,44 @@ def get_my_courses_progress(
     - Возвращает сводку по каждому курсу
     - Включает статистику: уроки, прогресс, время
     """
-    enrollments = db.query(Enrollment).filter(
+    enrollments = db.query(Enrollment).options(
+        joinedload(Enrollment.course)
+    ).filter(
         Enrollment.student_id == current_user.id
     ).all()
 
+    if not enrollments:
+        return []
+
+    course_ids = [enrollment.course_id for enrollment in enrollments]
+
+    # Статистика по всем курсам считается группировкой, а не запросами на каждый курс
+    lessons_by_course = dict(db.query(Lesson.course_id, func.count(Lesson.id)).filter(
+        Lesson.course_id.in_(course_ids),
+        Lesson.is_published == True
+    ).group_by(Lesson.course_id).all())
+
+    progress_by_course = {
+        course_id: (completed, time_spent)
+        for course_id, completed, time_spent in db.query(
+            Lesson.course_id,
+            func.sum(case((Progress.is_completed == True, 1), else_=0)),
+            func.sum(Progress.time_spent)
+        ).join(Lesson).filter(
+            Progress.student_id == current_user.id,
+            Lesson.course_id.in_(course_ids)
+        ).group_by(Lesson.course_id).all()
+    }
+
     result = []
     for enrollment in enrollments:
         course = enrollment.course
 
         # Считаем статистику
-        total_lessons = db.query(Lesson).filter(
-            Lesson.course_id == course.id,
-            Lesson.is_published == True
-        ).count()
-
-        completed_lessons = db.query(Progress).join(Lesson).filter(
-            Progress.student_id == current_user.id,
-            Lesson.course_id == course.id,
-            Progress.is_completed == True
-        ).count()
-
-        total_time = db.query(func.sum(Progress.time_spent)).join(Lesson).filter(
-            Progress.student_id == current_user.id,
-            Lesson.course_id == course.id
-        ).scalar() or 0
+        total_lessons = lessons_by_course.get(course.id, 0)
+        completed_lessons, total_time = progress_by_course.get(course.id, (0, 0))
+        completed_lessons = completed_lessons or 0
+        total_time = total_time or 0
 
         progress_percentage = (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
 
@@ -5,7 +5,7 @@ from typing import List
 from datetime import datetime
 import random
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import (
     Quiz, QuizQuestion, QuizAnswer, QuizAttempt,
     Lesson, Course, Enrollment, EnrollmentStatus, User, UserRole
@@ -17,6 +17,7 @@ from app.schemas.quiz import (
     QuestionResult, StudentAnswer, QuizStatistics
 )
 from app.utils.dependencies import get_current_user
+from app.utils.metrics import QUIZ_SUBMISSIONS
 
 router = APIRouter(prefix="/quizzes", tags=["Quizzes"])
 
@@ -299,17 +300,18 @@ def get_lesson_quizzes(
     if not enrollment and not is_instructor:
         raise HTTPException(status_code=403, detail="Доступ запрещен")
 
-    quizzes = db.query(Quiz).filter(
+    # Количество вопросов считается в том же запросе, что и квизы
+    total_questions = db.query(func.count(QuizQuestion.id)).filter(
+        QuizQuestion.quiz_id == Quiz.id
+    ).correlate(Quiz).scalar_subquery()
+
+    quizzes = db.query(Quiz, total_questions).filter(
         Quiz.lesson_id == lesson_id,
         Quiz.is_published == True
     ).all()
 
     result = []
-    for quiz in quizzes:
-        total_questions = db.query(QuizQuestion).filter(
-            QuizQuestion.quiz_id == quiz.id
-        ).count()
-
+    for quiz, total_questions in quizzes:
         result.append(QuizListItem(
             id=quiz.id,
             title=quiz.title,
@@ -531,6 +533,8 @@ def submit_quiz(
     db.commit()
     db.refresh(attempt)
 
+    QUIZ_SUBMISSIONS.inc(passed=is_passed)
+
     # Возвращаем результат
     result = QuizAttemptResult(
         id=attempt.id,
@@ -640,7 +644,7 @@ def get_attempt_details(
 @router.get("/{quiz_id}/statistics", response_model=QuizStatistics)
 def get_quiz_statistics(
         quiz_id: int,
-        db: Session = Depends(get_db),
+        db: Session = Depends(get_read_db),
         current_user: User = Depends(get_current_user)
 ):
     """
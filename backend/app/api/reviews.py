@@ -1,9 +1,10 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import func, desc, select
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.models.user import User
 from app.models.course import Course
 from app.models.review import Review
@@ -23,14 +24,14 @@ router = APIRouter(prefix="/reviews", tags=["Reviews"])
 @router.post("/", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
 async def create_review(
         review_data: ReviewCreate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     """
     Создать отзыв о курсе (только для студентов, прошедших курс)
     """
     # Проверяем существование курса
-    course = db.query(Course).filter(Course.id == review_data.course_id).first()
+    course = await db.get(Course, review_data.course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -38,10 +39,10 @@ async def create_review(
         )
 
     # Проверяем, что пользователь записан на курс
-    enrollment = db.query(Enrollment).filter(
+    enrollment = await db.scalar(select(Enrollment).where(
         Enrollment.student_id == current_user.id,
         Enrollment.course_id == review_data.course_id
-    ).first()
+    ))
 
     if not enrollment:
         raise HTTPException(
@@ -50,10 +51,10 @@ async def create_review(
         )
 
     # Проверяем, не оставлял ли уже отзыв
-    existing_review = db.query(Review).filter(
+    existing_review = await db.scalar(select(Review).where(
         Review.student_id == current_user.id,
         Review.course_id == review_data.course_id
-    ).first()
+    ))
 
     if existing_review:
         raise HTTPException(
@@ -71,12 +72,13 @@ async def create_review(
     )
 
     db.add(review)
+    await db.flush()
 
     # Обновляем статистику курса
-    update_course_rating(db, review_data.course_id)
+    await update_course_rating(db, review_data.course_id)
 
-    db.commit()
-    db.refresh(review)
+    await db.commit()
+    await db.refresh(review)
 
     return review
 
@@ -88,13 +90,13 @@ async def get_course_reviews(
         sort_by: str = Query("recent", description="Сортировка: recent, rating_high, rating_low"),
         skip: int = Query(0, ge=0),
         limit: int = Query(20, ge=1, le=100),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Получить все отзывы курса
     """
     # Проверяем курс
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -102,11 +104,13 @@ async def get_course_reviews(
         )
 
     # Базовый запрос
-    query = db.query(Review).filter(Review.course_id == course_id)
+    query = select(Review).options(
+        joinedload(Review.student)
+    ).where(Review.course_id == course_id)
 
     # Фильтр по рейтингу
     if rating_filter:
-        query = query.filter(Review.rating == rating_filter)
+        query = query.where(Review.rating == rating_filter)
 
     # Сортировка
     if sort_by == "recent":
@@ -117,12 +121,12 @@ async def get_course_reviews(
         query = query.order_by(Review.rating, desc(Review.created_at))
 
     # Пагинация
-    reviews = query.offset(skip).limit(limit).all()
+    reviews = (await db.scalars(query.offset(skip).limit(limit))).all()
 
     # Добавляем информацию о пользователях
     result = []
     for review in reviews:
-        student = db.query(User).filter(User.id == review.student_id).first()
+        student = review.student
         result.append({
             **review.__dict__,
             "student_name": student.full_name,
@@ -135,12 +139,14 @@ async def get_course_reviews(
 @router.get("/{review_id}", response_model=ReviewWithUser)
 async def get_review(
         review_id: int,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Получить отзыв по ID
     """
-    review = db.query(Review).filter(Review.id == review_id).first()
+    review = await db.scalar(
+        select(Review).options(joinedload(Review.student)).where(Review.id == review_id)
+    )
 
     if not review:
         raise HTTPException(
@@ -148,7 +154,7 @@ async def get_review(
             detail="Отзыв не найден"
         )
 
-    student = db.query(User).filter(User.id == review.student_id).first()
+    student = review.student
 
     return {
         **review.__dict__,
@@ -161,13 +167,13 @@ async def get_review(
 async def update_review(
         review_id: int,
         review_data: ReviewUpdate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     """
     Обновить свой отзыв
     """
-    review = db.query(Review).filter(Review.id == review_id).first()
+    review = await db.get(Review, review_id)
 
     if not review:
         raise HTTPException(
@@ -186,12 +192,13 @@ async def update_review(
     update_data = review_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(review, field, value)
+    await db.flush()
 
     # Обновляем статистику курса
-    update_course_rating(db, review.course_id)
+    await update_course_rating(db, review.course_id)
 
-    db.commit()
-    db.refresh(review)
+    await db.commit()
+    await db.refresh(review)
 
     return review
 
@@ -199,13 +206,13 @@ async def update_review(
 @router.delete("/{review_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_review(
         review_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     """
     Удалить отзыв (свой или админ)
     """
-    review = db.query(Review).filter(Review.id == review_id).first()
+    review = await db.get(Review, review_id)
 
     if not review:
         raise HTTPException(
@@ -221,27 +228,28 @@ async def delete_review(
         )
 
     course_id = review.course_id
-    db.delete(review)
+    await db.delete(review)
+    await db.flush()
 
     # Обновляем статистику курса
-    update_course_rating(db, course_id)
+    await update_course_rating(db, course_id)
 
-    db.commit()
+    await db.commit()
 
     return None
 
 
 @router.get("/user/my-reviews", response_model=List[ReviewResponse])
 async def get_my_reviews(
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     """
     Получить все отзывы текущего пользователя
     """
-    reviews = db.query(Review).filter(
+    reviews = (await db.scalars(select(Review).where(
         Review.student_id == current_user.id
-    ).order_by(desc(Review.created_at)).all()
+    ).order_by(desc(Review.created_at)))).all()
 
     return reviews
 
@@ -249,13 +257,13 @@ async def get_my_reviews(
 @router.get("/course/{course_id}/stats", response_model=ReviewStats)
 async def get_course_review_stats(
         course_id: int,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Получить статистику отзывов курса
     """
     # Проверяем курс
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -263,7 +271,9 @@ async def get_course_review_stats(
         )
 
     # Общее количество отзывов
-    total_reviews = db.query(Review).filter(Review.course_id == course_id).count()
+    total_reviews = await db.scalar(
+        select(func.count(Review.id)).where(Review.course_id == course_id)
+    )
 
     if total_reviews == 0:
         return {
@@ -276,17 +286,17 @@ async def get_course_review_stats(
         }
 
     # Средний рейтинг
-    avg_rating = db.query(func.avg(Review.rating)).filter(
+    avg_rating = await db.scalar(select(func.avg(Review.rating)).where(
         Review.course_id == course_id
-    ).scalar()
+    ))
 
     # Распределение по звездам
     rating_dist = {}
     for rating in range(1, 6):
-        count = db.query(Review).filter(
+        count = await db.scalar(select(func.count(Review.id)).where(
             Review.course_id == course_id,
             Review.rating == rating
-        ).count()
+        ))
         rating_dist[str(rating)] = count
 
     return {
@@ -300,16 +310,16 @@ async def get_course_review_stats(
 @router.get("/course/{course_id}/my-review")
 async def get_my_course_review(
         course_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ):
     """
     Проверить, оставил ли пользователь отзыв на курс
     """
-    review = db.query(Review).filter(
+    review = await db.scalar(select(Review).where(
         Review.student_id == current_user.id,
         Review.course_id == course_id
-    ).first()
+    ))
 
     if not review:
         return {
@@ -323,23 +333,25 @@ async def get_my_course_review(
     }
 
 
-def update_course_rating(db: Session, course_id: int):
+async def update_course_rating(db: AsyncSession, course_id: int):
     """
     Обновить средний рейтинг и количество отзывов курса
+
+    Изменения отзыва должны быть уже сброшены в БД (flush)
     """
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
     if not course:
         return
 
     # Подсчитываем средний рейтинг
-    avg_rating = db.query(func.avg(Review.rating)).filter(
+    avg_rating = await db.scalar(select(func.avg(Review.rating)).where(
         Review.course_id == course_id
-    ).scalar()
+    ))
 
     # Подсчитываем количество отзывов
-    total_reviews = db.query(Review).filter(
+    total_reviews = await db.scalar(select(func.count(Review.id)).where(
         Review.course_id == course_id
-    ).count()
+    ))
 
     course.average_rating = round(avg_rating, 2) if avg_rating else 0.0
     course.total_reviews = total_reviews
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func
 from typing import List, Optional
 from datetime import datetime
@@ -14,7 +14,7 @@ from app.schemas.user import (
     UserShort,
     UserList
 )
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_db_user, get_token_user, principal_cache
 from app.utils.security import verify_password, get_password_hash
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -24,7 +24,7 @@ router = APIRouter(prefix="/users", tags=["Users"])
 def update_my_profile(
         user_data: UserUpdate,
         db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        current_user: User = Depends(get_current_db_user)
 ):
     """
     Обновить профиль текущего пользователя
@@ -43,6 +43,7 @@ def update_my_profile(
 
     db.commit()
     db.refresh(current_user)
+    principal_cache.invalidate(current_user.id)
 
     return current_user
 
@@ -51,7 +52,7 @@ def update_my_profile(
 def change_password(
         password_data: UserPasswordChange,
         db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        current_user: User = Depends(get_current_db_user)
 ):
     """
     Изменить пароль текущего пользователя
@@ -106,7 +107,7 @@ def get_user_profile(
 @router.get("/me/dashboard")
 def get_my_dashboard(
         db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        current_user: User = Depends(get_token_user)
 ):
     """
     Получить дашборд текущего пользователя
@@ -161,7 +162,9 @@ def _get_student_dashboard(db: Session, user: User):
     ).scalar() or 0.0
 
     # Последние активные курсы
-    recent_courses = db.query(Enrollment).filter(
+    recent_courses = db.query(Enrollment).options(
+        joinedload(Enrollment.course)
+    ).filter(
         Enrollment.student_id == user.id,
         Enrollment.status == EnrollmentStatus.ACTIVE
     ).order_by(Enrollment.last_accessed_at.desc()).limit(5).all()
@@ -351,7 +354,9 @@ def get_user_courses(
 
     if user.role == UserRole.STUDENT:
         # Получаем записи студента
-        enrollments = db.query(Enrollment).filter(
+        enrollments = db.query(Enrollment).options(
+            joinedload(Enrollment.course)
+        ).filter(
             Enrollment.student_id == user_id
         ).all()
 
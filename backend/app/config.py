@@ -12,6 +12,20 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
     TEST_DATABASE_URL: str = ""
+    # URL для асинхронного драйвера (если пусто - выводится из DATABASE_URL)
+    ASYNC_DATABASE_URL: str = ""
+
+    # Пул соединений (отдельно для синхронного и асинхронного engine)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # Секунды ожидания свободного соединения
+    DB_POOL_RECYCLE: int = -1  # Пересоздание соединений старше N секунд (-1 = выключено)
+
+    # Реплика для чтения (если пусто - все запросы идут на основную БД)
+    DATABASE_REPLICA_URL: str = ""
+    ASYNC_DATABASE_REPLICA_URL: str = ""
+    # Сколько секунд после записи пользователь читает с основной БД (read-your-writes)
+    REPLICA_READ_AFTER_WRITE_SECONDS: float = 5.0
 
     # JWT
     SECRET_KEY: str
@@ -19,6 +33,71 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Пароли: cost factor bcrypt (хеши с другим cost пересчитываются при входе)
+    # и число потоков для хеширования (ограничивает CPU, занятый bcrypt)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Ограничение частоты login/register/refresh (token bucket в памяти worker)
+    # Формат "количество/период", период: s, m, h или секунды
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_LOGIN_PER_IP: str = "20/m"
+    RATE_LIMIT_LOGIN_PER_EMAIL: str = "5/m"
+    RATE_LIMIT_REGISTER_PER_IP: str = "10/h"
+    RATE_LIMIT_REFRESH_PER_IP: str = "60/m"
+    RATE_LIMIT_MAX_KEYS: int = 100000
+
+    # Кэш аутентифицированных пользователей в get_current_user (0 = выключен)
+    # В других worker'ах смена роли/статуса вступает в силу не позже чем через TTL
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    # Endpoints с проверкой роли по токену (require_role(..., from_token=True)) доверяют
+    # claims токенов не старше N секунд; более старые проверяются по БД (0 = всегда по БД)
+    TOKEN_CLAIMS_MAX_AGE_SECONDS: int = 300
+    # Отзыв access токенов: период подгрузки из БД в память worker (0 = без фоновой синхронизации)
+    # и ожидаемое число отозванных пользователей (размер фильтра Блума)
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 5.0
+    TOKEN_REVOCATION_CAPACITY: int = 100000
+
+    # Кэш количества курсов в каталоге по фильтрам (0 = выключен); изменения курсов
+    # в других worker'ах отражаются в total не позже чем через TTL
+    COURSE_COUNT_CACHE_TTL_SECONDS: float = 10.0
+    COURSE_COUNT_CACHE_SIZE: int = 1000
+    # Оценка total по статистике планировщика для каталога без фильтров (только PostgreSQL);
+    # оценки меньше COURSE_COUNT_ESTIMATE_MIN заменяются точным COUNT
+    COURSE_COUNT_ESTIMATE: bool = False
+    COURSE_COUNT_ESTIMATE_MIN: int = 10000
+    # Снимок опубликованного каталога в памяти worker (0 = выключен): изменения курсов
+    # в этом worker применяются сразу, полная пересборка - раз в N секунд
+    CATALOG_SNAPSHOT_TTL_SECONDS: float = 30.0
+
+    # Наблюдаемость SQL: заголовок Server-Timing и бюджет запросов на HTTP запрос
+    SERVER_TIMING: bool = True
+    SQL_QUERY_BUDGET: int = 30  # Больше запросов - предупреждение о N+1 в лог (0 = выключено)
+
+    # Журнал медленных запросов (GET /api/admin/admin/database/slow-queries)
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0  # 0 = выключено
+    SLOW_QUERY_LOG_SIZE: int = 100  # Количество хранимых форм запросов
+    SLOW_QUERY_EXPLAIN: bool = True  # План EXPLAIN (только PostgreSQL)
+
+    # Эндпоинт /metrics в формате Prometheus
+    METRICS_ENABLED: bool = True
+
+    # Сжатие ответов (gzip, brotli - если установлен пакет brotli)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # Ответы меньше порога (байт) не сжимаются
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    # Уже сжатые форматы (префиксы Content-Type) и потоковые ответы
+    COMPRESSION_EXCLUDED_TYPES: str = (
+        "image/,video/,audio/,font/woff,application/zip,application/gzip,"
+        "application/x-gzip,application/pdf,application/octet-stream,text/event-stream"
+    )
+
+    # Роутеры приложения: имена или группы через запятую (пусто = все)
+    # Например, ENABLED_ROUTERS=catalog для read-only worker каталога
+    ENABLED_ROUTERS: str = ""
+
     # CORS
     BACKEND_CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
 
@@ -50,6 +129,16 @@ class Settings(BaseSettings):
         """Преобразует строку CORS origins в список"""
         return [origin.strip() for origin in self.BACKEND_CORS_ORIGINS.split(",")]
 
+    @property
+    def enabled_routers(self) -> List[str]:
+        """Преобразует строку роутеров в список"""
+        return [name.strip() for name in self.ENABLED_ROUTERS.split(",") if name.strip()]
+
+    @property
+    def compression_excluded_types(self) -> List[str]:
+        """Преобразует строку исключенных Content-Type в список"""
+        return [value.strip() for value in self.COMPRESSION_EXCLUDED_TYPES.split(",") if value.strip()]
+
     @property
     def allowed_file_extensions(self) -> List[str]:
         """Преобразует строку расширений в список"""
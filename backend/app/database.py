@@ -1,14 +1,64 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from app.config import settings
+from app.utils.pool_metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool
+from app.utils.metrics import register_pool
+from app.utils.query_stats import track_queries
+from app.utils.slow_queries import SlowQueryLog, track_slow_queries
+from app.utils.request_context import current_request, RecentWrites
+
+
+def pool_options(url: str, poolclass) -> dict:
+    """
+    Параметры пула соединений из настроек
+
+    SQLite в памяти работает только с пулом по умолчанию - для него параметры не передаются
+    """
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        return {}
+
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+# Журнал медленных запросов (общий для всех engine процесса)
+slow_query_log = SlowQueryLog(
+    settings.SLOW_QUERY_THRESHOLD_MS,
+    size=settings.SLOW_QUERY_LOG_SIZE,
+    explain=settings.SLOW_QUERY_EXPLAIN
+)
+
+
+def instrument_engine(name: str, sync_engine):
+    """
+    Подключает к engine подсчет запросов, метрики пула и журнал медленных запросов
+
+    Для AsyncEngine передается engine.sync_engine
+    """
+    track_queries(sync_engine)
+    register_pool(name, sync_engine.pool)
+    if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+        track_slow_queries(sync_engine, slow_query_log)
+
 
 # Создаем engine для подключения к БД
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,  # Проверка соединения перед использованием
-    echo=settings.DEBUG  # Логирование SQL запросов в режиме DEBUG
+    echo=settings.DEBUG,  # Логирование SQL запросов в режиме DEBUG
+    **pool_options(settings.DATABASE_URL, InstrumentedQueuePool)
 )
 
+instrument_engine("sync", engine)
+
 # Создаем фабрику сессий
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -16,6 +66,126 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# Асинхронные драйверы для синхронных URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def make_async_url(url: str) -> str:
+    """
+    Преобразует URL синхронного подключения в URL асинхронного драйвера
+
+    Пример: postgresql://user@host/db -> postgresql+asyncpg://user@host/db
+    """
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+# Асинхронный engine для async def endpoints (не блокирует event loop)
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or make_async_url(settings.DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    echo=settings.DEBUG,
+    **pool_options(ASYNC_DATABASE_URL, InstrumentedAsyncQueuePool)
+)
+instrument_engine("async", async_engine.sync_engine)
+
+# Фабрика асинхронных сессий
+# expire_on_commit=False: после commit атрибуты не перечитываются неявно (в async это запрещено)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+# Реплика для чтения (опционально)
+# Без DATABASE_REPLICA_URL фабрики реплики совпадают с основными
+replica_engine = None
+async_replica_engine = None
+ReplicaSessionLocal = SessionLocal
+AsyncReplicaSessionLocal = AsyncSessionLocal
+
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+        **pool_options(settings.DATABASE_REPLICA_URL, InstrumentedQueuePool)
+    )
+    instrument_engine("replica_sync", replica_engine)
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+    ASYNC_DATABASE_REPLICA_URL = (
+        settings.ASYNC_DATABASE_REPLICA_URL or make_async_url(settings.DATABASE_REPLICA_URL)
+    )
+    async_replica_engine = create_async_engine(
+        ASYNC_DATABASE_REPLICA_URL,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+        **pool_options(ASYNC_DATABASE_REPLICA_URL, InstrumentedAsyncQueuePool)
+    )
+    instrument_engine("replica_async", async_replica_engine.sync_engine)
+    AsyncReplicaSessionLocal = async_sessionmaker(
+        bind=async_replica_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+# Пользователи, недавно писавшие в основную БД (в пределах worker)
+recent_writes = RecentWrites(settings.REPLICA_READ_AFTER_WRITE_SECONDS)
+
+
+def _mark_write():
+    """Отмечает запрос и пользователя как писавших в БД (для read-your-writes)"""
+    state = current_request.get()
+    if state is None:
+        return
+
+    state.wrote = True
+    if state.user_id is not None:
+        recent_writes.mark(state.user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    _mark_write()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_dml(orm_execute_state):
+    # update()/delete()/insert() через execute() минуют flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        _mark_write()
+
+
+def use_replica() -> bool:
+    """
+    Можно ли читать текущий запрос с реплики
+
+    Нельзя, если реплика не настроена или пользователь писал в БД недавно:
+    по cookie (между worker'ами) или по отметке в памяти worker
+    """
+    if ReplicaSessionLocal is SessionLocal:
+        return False
+
+    state = current_request.get()
+    if state is None:
+        return True
+    if state.primary_until > time.time():
+        return False
+    if state.user_id is not None and recent_writes.is_recent(state.user_id):
+        return False
+    return True
+
+
 # Dependency для получения сессии БД
 def get_db():
     """
@@ -33,6 +203,41 @@ def get_db():
         db.close()
 
 
+# Dependency для получения асинхронной сессии БД
+async def get_async_db():
+    """
+    Генератор асинхронной сессии БД для async def endpoints
+
+    Использование:
+        @app.get("/items")
+        async def read_items(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Item))
+            ...
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependency для read-only endpoints
+def get_read_db():
+    """
+    Сессия БД только для чтения: реплика, если она настроена
+    и пользователь не писал в БД в течение REPLICA_READ_AFTER_WRITE_SECONDS
+    """
+    db = ReplicaSessionLocal() if use_replica() else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    """Асинхронный вариант get_read_db"""
+    session_factory = AsyncReplicaSessionLocal if use_replica() else AsyncSessionLocal
+    async with session_factory() as db:
+        yield db
+
+
 # Функция для создания всех таблиц
 def create_tables():
     """
@@ -1,71 +1,188 @@
-from fastapi import FastAPI
+import importlib
+from contextlib import asynccontextmanager
+from typing import Iterable, List, Optional
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.auth import router as auth_router
-from app.api.course import router as courses_router
-from app.api.category import router as categories_router
-from app.api.lessons import router as lessons_router
-from app.api.enrollments import router as enrollments_router
-from app.api.reviews import router as reviews_router
-from app.api.progress import router as progress_router
-from app.api.comments import router as comments_router
-from app.api.quiz import router as quiz_router
-from app.api.users import router as users_router
-from app.api.admin import router as admin_router
-from app.database import engine, Base
-from app.config import settings
-
-# Создание таблиц в БД
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(
-    title=settings.APP_NAME,
-    version="1.0.0",
-    description="API для платформы онлайн-курсов по предпринимательству"
-)
-
-# CORS настройки
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Подключение роутеров
-app.include_router(auth_router, prefix="/api", tags=["Authentication"])
-app.include_router(courses_router, prefix="/api", tags=["Courses"])
-app.include_router(categories_router, prefix="/api", tags=["Categories"])
-
-app.include_router(lessons_router, prefix="/api", tags=["Lessons"])
-
-app.include_router(enrollments_router, prefix="/api", tags=["Enrollments"])
-
-app.include_router(reviews_router, prefix="/api", tags=["Reviews"])
-
-app.include_router(progress_router, prefix="/api", tags=["Progress"])
-
-app.include_router(comments_router, prefix="/api", tags=["Comments"])
-
-app.include_router(quiz_router, prefix="/api", tags=["Quiz"])
-
-app.include_router(users_router, prefix="/api", tags=["Users"])
-
-app.include_router(admin_router, prefix="/api/admin", tags=["Admin"])
-
-@app.get("/")
-async def root():
-    return {
-        "message": "Welcome to Entrepreneurship Learning Platform API",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "redoc": "/redoc"
-    }
-
-
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
+from app.config import settings, Settings
+from app.utils import metrics
+from app.utils.compression import CompressionMiddleware
+from app.utils.query_stats import QueryStatsMiddleware
+from app.utils.request_context import RequestContextMiddleware
+from app.utils.serialization import FastJSONResponse
+
+# Роутеры приложения: имя -> (модуль, префикс, теги)
+# Модули импортируются только при подключении роутера
+ROUTERS = {
+    "auth": ("app.api.auth", "/api", ["Authentication"]),
+    "courses": ("app.api.course", "/api", ["Courses"]),
+    "categories": ("app.api.category", "/api", ["Categories"]),
+    "lessons": ("app.api.lessons", "/api", ["Lessons"]),
+    "enrollments": ("app.api.enrollments", "/api", ["Enrollments"]),
+    "reviews": ("app.api.reviews", "/api", ["Reviews"]),
+    "progress": ("app.api.progress", "/api", ["Progress"]),
+    "comments": ("app.api.comments", "/api", ["Comments"]),
+    "quiz": ("app.api.quiz", "/api", ["Quiz"]),
+    "users": ("app.api.users", "/api", ["Users"]),
+    "admin": ("app.api.admin", "/api/admin", ["Admin"]),
+}
+
+# Группы роутеров для отдельных worker'ов
+ROUTER_GROUPS = {
+    "catalog": ["courses", "categories", "lessons", "reviews"],
+}
+
+
+def resolve_routers(names: Optional[Iterable[str]]) -> List[str]:
+    """
+    Список роутеров по именам и группам (пусто = все роутеры)
+
+    Raises:
+        ValueError: Неизвестное имя роутера или группы
+    """
+    names = list(names or [])
+    if not names:
+        return list(ROUTERS)
+
+    resolved = []
+    for name in names:
+        if name in ROUTER_GROUPS:
+            members = ROUTER_GROUPS[name]
+        elif name in ROUTERS:
+            members = [name]
+        else:
+            raise ValueError(f"Неизвестный роутер: {name}")
+
+        resolved.extend(member for member in members if member not in resolved)
+
+    return resolved
+
+
+def build_lifespan(app_settings: Settings):
+    """Фоновые задачи worker'а: синхронизация отзыва access токенов из БД"""
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        revocation_sync = None
+        if app_settings.TOKEN_REVOCATION_SYNC_SECONDS > 0:
+            # Импорт здесь: модуль подключает БД и модели
+            from app.database import SessionLocal
+            from app.services.token_revocations import RevocationSync
+            from app.utils.dependencies import revoked_tokens
+
+            revocation_sync = RevocationSync(revoked_tokens, SessionLocal, app_settings.TOKEN_REVOCATION_SYNC_SECONDS)
+            revocation_sync.start()
+        try:
+            yield
+        finally:
+            if revocation_sync is not None:
+                revocation_sync.stop()
+
+    return lifespan
+
+
+def create_app(app_settings: Settings = settings, routers: Optional[Iterable[str]] = None) -> FastAPI:
+    """
+    Создает приложение FastAPI
+
+    Схема БД не создается: таблицами управляет Alembic (alembic upgrade head)
+
+    Args:
+        app_settings: Настройки приложения
+        routers: Имена роутеров или групп; по умолчанию app_settings.enabled_routers,
+            а если и они не заданы - все роутеры
+    """
+    app = FastAPI(
+        title=app_settings.APP_NAME,
+        version="1.0.0",
+        description="API для платформы онлайн-курсов по предпринимательству",
+        default_response_class=FastJSONResponse,
+        lifespan=build_lifespan(app_settings)
+    )
+
+    # CORS настройки
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Сжатие ответов по Accept-Encoding; внутри метрик и Server-Timing,
+    # поэтому время сжатия попадает в длительность запроса
+    if app_settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            min_size=app_settings.COMPRESSION_MIN_SIZE,
+            gzip_level=app_settings.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=app_settings.COMPRESSION_BROTLI_QUALITY,
+            excluded_types=app_settings.compression_excluded_types
+        )
+
+    # Количество и длительность HTTP запросов для /metrics
+    if app_settings.METRICS_ENABLED:
+        app.add_middleware(metrics.MetricsMiddleware)
+
+    # Число и время SQL запросов: Server-Timing и предупреждение о N+1
+    app.add_middleware(
+        QueryStatsMiddleware,
+        query_budget=app_settings.SQL_QUERY_BUDGET,
+        server_timing_header=app_settings.SERVER_TIMING
+    )
+
+    # Состояние запроса (пользователь, были ли записи в БД) для маршрутизации чтения на реплику
+    # Подключается последним - внешний middleware, его состояние видят все остальные
+    app.add_middleware(
+        RequestContextMiddleware,
+        window=app_settings.REPLICA_READ_AFTER_WRITE_SECONDS if app_settings.DATABASE_REPLICA_URL else 0.0
+    )
+
+    # Подключение роутеров
+    if routers is None:
+        routers = app_settings.enabled_routers
+
+    for name in resolve_routers(routers):
+        module_name, prefix, tags = ROUTERS[name]
+        module = importlib.import_module(module_name)
+        app.include_router(module.router, prefix=prefix, tags=tags)
+
+    @app.get("/")
+    async def root():
+        return {
+            "message": "Welcome to Entrepreneurship Learning Platform API",
+            "version": "1.0.0",
+            "docs": "/docs",
+            "redoc": "/redoc"
+        }
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    if app_settings.METRICS_ENABLED:
+        @app.get("/metrics", include_in_schema=False)
+        async def prometheus_metrics():
+            """Метрики процесса в текстовом формате Prometheus"""
+            return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+    return app
+
+
+_app: Optional[FastAPI] = None
+
+
+def __getattr__(name: str):
+    """
+    Приложение по умолчанию (app.main:app) создается при первом обращении,
+    чтобы импорт create_app не подключал все роутеры
+    """
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
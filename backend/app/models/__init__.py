@@ -7,6 +7,8 @@ from app.models.progress import Progress
 from app.models.review import Review
 from app.models.comment import Comment
 from app.models.quiz import Quiz, QuizQuestion, QuizAnswer, QuizAttempt, QuizType
+from app.models.refresh_token import RefreshToken
+from app.models.token_revocation import TokenRevocation
 
 __all__ = [
     "User",
@@ -27,4 +29,6 @@ __all__ = [
     "QuizAnswer",
     "QuizAttempt",
     "QuizType",
+    "RefreshToken",
+    "TokenRevocation",
 ]
\ No newline at end of file
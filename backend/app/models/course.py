@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Enum, func
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Enum, Index, func, DDL, event
 from sqlalchemy.orm import relationship
 import enum
 from app.database import Base
@@ -21,6 +21,16 @@ class CourseStatus(str, enum.Enum):
 class Course(Base):
     __tablename__ = "courses"
 
+    # Keyset пагинация: range scan по (ключ сортировки, id)
+    __table_args__ = (
+        Index("ix_courses_created_at_id", "created_at", "id"),
+        Index("ix_courses_price_id", "price", "id"),
+        Index("ix_courses_average_rating_id", "average_rating", "id"),
+        Index("ix_courses_total_students_id", "total_students", "id"),
+        Index("ix_courses_title_id", "title", "id"),
+        Index("ix_courses_instructor_created_at_id", "instructor_id", "created_at", "id"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
 
     # Основная информация
@@ -39,7 +49,8 @@ class Course(Base):
     duration_hours = Column(Float, default=0.0)  # Общая длительность в часах
 
     # Цена
-    price = Column(Float, default=0.0)  # 0 = бесплатный курс
+    # Ключи сортировки каталога (keyset пагинация) - NOT NULL: сравнение кортежей с NULL не выбирает строк
+    price = Column(Float, nullable=False, default=0.0, server_default="0")  # 0 = бесплатный курс
     discount_price = Column(Float, nullable=True)
     currency = Column(String(3), default="USD")
 
@@ -59,8 +70,8 @@ class Course(Base):
     target_audience = Column(Text, nullable=True)
 
     # Статистика
-    total_students = Column(Integer, default=0)
-    average_rating = Column(Float, default=0.0)
+    total_students = Column(Integer, nullable=False, default=0, server_default="0")
+    average_rating = Column(Float, nullable=False, default=0.0, server_default="0")
     total_reviews = Column(Integer, default=0)
     total_lessons = Column(Integer, default=0)
 
@@ -86,4 +97,57 @@ class Course(Base):
     @property
     def effective_price(self):
         """Возвращает цену со скидкой, если есть"""
-        return self.discount_price if self.discount_price else self.price
\ No newline at end of file
+        return self.discount_price if self.discount_price else self.price
+
+
+# Конфигурации полнотекстового поиска PostgreSQL по полю language
+SEARCH_CONFIGS = {
+    "ru": "russian",
+    "en": "english",
+    "de": "german",
+    "fr": "french",
+    "es": "spanish",
+    "it": "italian",
+    "pt": "portuguese",
+}
+
+_search_config = "CASE language {} ELSE 'simple'::regconfig END".format(
+    " ".join(f"WHEN '{code}' THEN '{config}'::regconfig" for code, config in SEARCH_CONFIGS.items())
+)
+
+# Индекс поиска по курсам (столбец и таблица вне ORM, обслуживаются самой СУБД):
+# - PostgreSQL: вычисляемый tsvector с весами (название > краткое описание > описание) и GIN индекс
+# - SQLite: FTS5 таблица с внешним содержимым и триггерами синхронизации
+COURSE_SEARCH_DDL = {
+    "postgresql": [
+        "ALTER TABLE courses ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        f"setweight(to_tsvector({_search_config}, coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector({_search_config}, coalesce(short_description, '')), 'B') || "
+        f"setweight(to_tsvector({_search_config}, coalesce(description, '')), 'C')"
+        ") STORED",
+        "CREATE INDEX ix_courses_search_vector ON courses USING GIN (search_vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE courses_fts USING fts5("
+        "title, short_description, description, content='courses', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER courses_fts_insert AFTER INSERT ON courses BEGIN "
+        "INSERT INTO courses_fts(rowid, title, short_description, description) "
+        "VALUES (new.id, new.title, new.short_description, new.description); END",
+        "CREATE TRIGGER courses_fts_delete AFTER DELETE ON courses BEGIN "
+        "INSERT INTO courses_fts(courses_fts, rowid, title, short_description, description) "
+        "VALUES ('delete', old.id, old.title, old.short_description, old.description); END",
+        # Только текстовые поля: обновления счетчиков курса индекс не трогают
+        "CREATE TRIGGER courses_fts_update AFTER UPDATE OF title, short_description, description ON courses BEGIN "
+        "INSERT INTO courses_fts(courses_fts, rowid, title, short_description, description) "
+        "VALUES ('delete', old.id, old.title, old.short_description, old.description); "
+        "INSERT INTO courses_fts(rowid, title, short_description, description) "
+        "VALUES (new.id, new.title, new.short_description, new.description); END",
+    ],
+}
+
+for _dialect, _statements in COURSE_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Course.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+
+event.listen(Course.__table__, "before_drop", DDL("DROP TABLE IF EXISTS courses_fts").execute_if(dialect="sqlite"))
\ No newline at end of file
@@ -47,6 +47,10 @@ class Lesson(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    # Версия для ETag: увеличивается при каждом изменении урока
+    # (updated_at в SQLite хранится с точностью до секунды)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
     # Relationships
     course = relationship("Course", back_populates="lessons")
     progress_records = relationship("Progress", back_populates="lesson")
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from app.database import Base
+
+
+class RefreshToken(Base):
+    """
+    Выданный refresh токен (одна строка на токен, несколько устройств на пользователя)
+
+    Хранится только хеш jti; токены одной цепочки ротации объединены family_id.
+    Использованные токены помечаются revoked_at и живут до expires_at, чтобы
+    повторное предъявление (кража) отзывало всю цепочку
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    jti_hash = Column(String(64), unique=True, index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<RefreshToken User:{self.user_id} Family:{self.family_id}>"
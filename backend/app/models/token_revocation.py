@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, func
+from app.database import Base
+
+
+class TokenRevocation(Base):
+    """
+    Отзыв access токенов пользователя, выданных до revoked_at
+
+    Worker'ы периодически подгружают новые записи в память
+    (app.services.token_revocations); после expires_at запись не нужна
+    """
+    __tablename__ = "token_revocations"
+
+    id = Column(Integer, primary_key=True)
+    # Без внешнего ключа: запись об отзыве переживает удаление пользователя
+    user_id = Column(Integer, nullable=False, index=True)
+    reason = Column(String(32), nullable=False)
+
+    revoked_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    # Время БД: курсор синхронизации не зависит от часов worker'ов
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<TokenRevocation User:{self.user_id} ({self.reason})>"
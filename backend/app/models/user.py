@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, func
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, func, DDL, event
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -35,7 +35,6 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     last_login = Column(DateTime, nullable=True)
-    refresh_token = Column(String, nullable=True)
 
     # Relationships
     # Курсы, созданные этим пользователем (если instructor)
@@ -57,4 +56,33 @@ class User(Base):
 
     @property
     def full_name(self):
-        return f"{self.first_name} {self.last_name}"
\ No newline at end of file
+        return f"{self.first_name} {self.last_name}"
+
+
+# Строка поиска пользователя в админке (индексируется целиком в PostgreSQL)
+USER_SEARCH_TEXT = "lower(email || ' ' || first_name || ' ' || last_name)"
+
+# Индексы поиска пользователей:
+# - PostgreSQL: GIN pg_trgm по строке поиска (подстрока и нечеткое совпадение)
+# - остальные СУБД: индексы lower() столбцов для поиска по префиксу
+USER_SEARCH_DDL = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        f"CREATE INDEX ix_users_search_trgm ON users USING gin (({USER_SEARCH_TEXT}) gin_trgm_ops)",
+    ],
+    "default": [
+        "CREATE INDEX ix_users_email_lower ON users (lower(email))",
+        "CREATE INDEX ix_users_first_name_lower ON users (lower(first_name))",
+        "CREATE INDEX ix_users_last_name_lower ON users (lower(last_name))",
+    ],
+}
+
+
+def _not_postgresql(ddl, target, bind, **kw) -> bool:
+    return bind.dialect.name != "postgresql"
+
+
+for _statement in USER_SEARCH_DDL["postgresql"]:
+    event.listen(User.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in USER_SEARCH_DDL["default"]:
+    event.listen(User.__table__, "after_create", DDL(_statement).execute_if(callable_=_not_postgresql))
\ No newline at end of file
@@ -53,6 +53,14 @@ class CourseUpdate(BaseModel):
     preview_video_url: Optional[str] = None
     status: Optional[CourseStatus] = None
 
+    @field_validator('price')
+    @classmethod
+    def validate_price(cls, v):
+        # Поле можно не передавать, но не обнулить: price - NOT NULL
+        if v is None:
+            raise ValueError('Price cannot be null')
+        return v
+
 
 # Схема для публикации курса
 class CoursePublish(BaseModel):
@@ -110,6 +118,10 @@ class CourseList(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    # Курсор следующей страницы (параметр cursor); None - страница последняя
+    next_cursor: Optional[str] = None
+    # total - оценка планировщика PostgreSQL, а не точный COUNT (COURSE_COUNT_ESTIMATE)
+    total_is_estimate: bool = False
 
 
 # Схема для фильтрации курсов
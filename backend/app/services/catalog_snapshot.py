@@ -0,0 +1,519 @@
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.course import Course, CourseLevel
+from app.utils.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogRow(NamedTuple):
+    """Строка каталога: столбцы course_short_query и ключи фильтров"""
+    id: int
+    title: str
+    short_description: Optional[str]
+    thumbnail_url: Optional[str]
+    level: CourseLevel
+    price: Optional[float]
+    discount_price: Optional[float]
+    average_rating: Optional[float]
+    total_students: Optional[int]
+    total_lessons: Optional[int]
+    duration_hours: Optional[float]
+    created_at: datetime
+    instructor_first_name: str
+    instructor_last_name: str
+    category_name: Optional[str]
+    category_id: Optional[int]
+    instructor_id: int
+
+    @classmethod
+    def from_row(cls, row) -> "CatalogRow":
+        # Столбцы catalog_rows_query идут в порядке полей; NULL остается None -
+        # фильтры снимка повторяют семантику NULL в SQL
+        return cls._make(row)
+
+
+# Ключ сортировки API -> атрибут CatalogRow
+SORT_ATTRIBUTES = {
+    "created_at": "created_at",
+    "price": "price",
+    "rating": "average_rating",
+    "students": "total_students",
+    "title": "title",
+}
+
+INFINITY = float("inf")
+
+# СУБД, где строки по умолчанию сравниваются побайтно (BINARY): порядок
+# совпадает с порядком str в Python. В остальных порядок title задает
+# collation БД, и такая сортировка снимком не обслуживается
+BINARY_COLLATION_DIALECTS = {"sqlite"}
+
+# Атрибуты фильтров на равенство (битовая карта на значение)
+FILTER_ATTRIBUTES = ("category_id", "level", "instructor_id")
+
+# Ключи фильтров-диапазонов: битовые карты корзин значений
+RANGE_KEYS = ("price", "rating")
+RANGE_BUCKETS = 64
+
+# Доля изменившихся курсов, после которой replace пересобирает снимок целиком
+REBUILD_FRACTION = 1 / 64
+
+# Номера установленных битов для каждого байта
+BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+def _bitmap(positions: Iterable[int], size: int) -> int:
+    """Битовая карта позиций: биты ставятся в bytearray, int создается один раз"""
+    data = bytearray((size >> 3) + 1)
+    for position in positions:
+        data[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(data, "little")
+
+
+def _positions(mask: int, size: int) -> List[int]:
+    """Позиции установленных битов по возрастанию"""
+    result = []
+    for index, byte in enumerate(mask.to_bytes((size >> 3) + 1, "little")):
+        if byte:
+            base = index << 3
+            result.extend(base + bit for bit in BYTE_BITS[byte])
+    return result
+
+
+class CatalogSnapshot:
+    """
+    Неизменяемый снимок опубликованных курсов
+
+    - rows: строки по позициям (None - удаленная строка, позиции не сдвигаются)
+    - orders: для каждого ключа сортировки список (значение, id, позиция)
+      по возрастанию - страница и курсор находятся bisect'ом; строки с NULL
+      в ключе в список не входят
+    - битовые карты (int, бит = позиция): значения category_id, level,
+      instructor_id, бесплатные курсы, NULL по ключам сортировки; фильтры
+      пересекаются побитовым AND, total - количество битов
+    - цена и рейтинг: границы корзин (квантили при построении) и карта
+      каждой корзины; диапазон - OR целых корзин и точный расчет двух крайних
+
+    Изменения создают новый снимок (replace), читатели работают со старым
+    """
+
+    __slots__ = ("rows", "positions", "orders", "bitmaps", "bounds", "buckets", "nulls", "free", "alive",
+                 "binary_collation", "built_at")
+
+    def __init__(self, rows: List[Optional[CatalogRow]], positions: Dict[int, int], orders: Dict[str, list],
+                 bitmaps: Dict[str, Dict[object, int]], bounds: Dict[str, list], buckets: Dict[str, List[int]],
+                 nulls: Dict[str, int], free: int, alive: int, binary_collation: bool, built_at: float):
+        self.rows = rows
+        self.positions = positions
+        self.orders = orders
+        self.bitmaps = bitmaps
+        self.bounds = bounds
+        self.buckets = buckets
+        self.nulls = nulls
+        self.free = free
+        self.alive = alive
+        self.binary_collation = binary_collation
+        self.built_at = built_at
+
+    @classmethod
+    def build(cls, rows: Iterable[CatalogRow], binary_collation: bool = True) -> "CatalogSnapshot":
+        """
+        Снимок из строк CatalogRow
+
+        Позиции собираются по значениям за один проход, каждая битовая карта
+        создается один раз. binary_collation - строки в БД сравниваются
+        побайтно (см. BINARY_COLLATION_DIALECTS)
+        """
+        # Позиции по возрастанию id: устойчивая сортировка по значению сохраняет порядок id при равенстве
+        table = sorted(rows, key=attrgetter("id"))
+        size = len(table)
+        ids = [row.id for row in table]
+
+        groups: Dict[str, Dict[object, List[int]]] = {}
+        for attribute in FILTER_ATTRIBUTES:
+            group = groups[attribute] = {}
+            for position, value in enumerate(map(attrgetter(attribute), table)):
+                group.setdefault(value, []).append(position)
+
+        # Сортируются позиции по одному значению (без сравнения кортежей), кортежи собираются после
+        orders, nulls = {}, {}
+        for key, attribute in SORT_ATTRIBUTES.items():
+            values = list(map(attrgetter(attribute), table))
+            positions = range(size)
+            nulls[key] = []
+            if None in values:
+                nulls[key] = [position for position, value in enumerate(values) if value is None]
+                positions = [position for position, value in enumerate(values) if value is not None]
+            ordered = sorted(positions, key=values.__getitem__)
+            orders[key] = list(zip(map(values.__getitem__, ordered), map(ids.__getitem__, ordered), ordered))
+            if key == "price":
+                free = [position for position, value in enumerate(values) if value == 0]
+
+        bounds, buckets = {}, {}
+        for key in RANGE_KEYS:
+            order = orders[key]
+            step = max(1, -(-len(order) // RANGE_BUCKETS))
+            # Первая корзина открыта снизу: значения новых строк всегда попадают в какую-то корзину
+            bounds[key] = [-INFINITY] + sorted({order[index][0] for index in range(step, len(order), step)})
+            edges = [bisect_left(order, (bound,)) for bound in bounds[key][1:]]
+            buckets[key] = [
+                _bitmap((position for _, _, position in order[start:end]), size)
+                for start, end in zip([0] + edges, edges + [len(order)])
+            ]
+
+        return cls(
+            table,
+            {row.id: position for position, row in enumerate(table)},
+            orders,
+            {attribute: {value: _bitmap(positions, size) for value, positions in group.items()}
+             for attribute, group in groups.items()},
+            bounds,
+            buckets,
+            {key: _bitmap(positions, size) for key, positions in nulls.items()},
+            _bitmap(free, size),
+            (1 << size) - 1,
+            binary_collation,
+            time.monotonic()
+        )
+
+    def replace(self, course_ids: Iterable[int], rows: Iterable[CatalogRow]) -> "CatalogSnapshot":
+        """
+        Новый снимок: курсы course_ids удаляются, rows добавляются
+
+        Измененный курс передается в обоих аргументах, снятый с публикации - только в course_ids.
+        Несколько курсов правятся на месте (bisect/insort в копиях списков), при большом
+        количестве изменений снимок строится заново
+        """
+        rows = list(rows)
+        removed = [self.positions[course_id] for course_id in set(course_ids) | {row.id for row in rows}
+                   if course_id in self.positions]
+
+        if len(removed) + len(rows) > max(1, len(self.positions) * REBUILD_FRACTION):
+            removed_ids = {self.rows[position].id for position in removed}
+            live = [row for row in self.rows if row is not None and row.id not in removed_ids]
+            snapshot = CatalogSnapshot.build(live + rows, self.binary_collation)
+            # Время построения - от загрузки из БД: пересборка по ttl не откладывается
+            snapshot.built_at = self.built_at
+            return snapshot
+
+        table = self.rows + rows
+        positions = dict(self.positions)
+        orders = {key: list(order) for key, order in self.orders.items()}
+        bitmaps = {attribute: dict(values) for attribute, values in self.bitmaps.items()}
+        buckets = {key: list(values) for key, values in self.buckets.items()}
+        nulls = dict(self.nulls)
+        free, alive = self.free, self.alive
+
+        for position in removed:
+            old = table[position]
+            table[position] = None
+            del positions[old.id]
+            clear = ~(1 << position)
+            for attribute in FILTER_ATTRIBUTES:
+                value = getattr(old, attribute)
+                bitmaps[attribute][value] &= clear
+                if not bitmaps[attribute][value]:
+                    del bitmaps[attribute][value]
+            for key, attribute in SORT_ATTRIBUTES.items():
+                value = getattr(old, attribute)
+                if value is None:
+                    nulls[key] &= clear
+                    continue
+                order = orders[key]
+                del order[bisect_left(order, (value, old.id, position))]
+                if key in buckets:
+                    bucket = bisect_right(self.bounds[key], value) - 1
+                    buckets[key][bucket] &= clear
+            free &= clear
+            alive &= clear
+
+        start = len(self.rows)
+        for offset, row in enumerate(rows):
+            position = start + offset
+            positions[row.id] = position
+            bit = 1 << position
+            for attribute in FILTER_ATTRIBUTES:
+                value = getattr(row, attribute)
+                bitmaps[attribute][value] = bitmaps[attribute].get(value, 0) | bit
+            for key, attribute in SORT_ATTRIBUTES.items():
+                value = getattr(row, attribute)
+                if value is None:
+                    nulls[key] |= bit
+                    continue
+                insort(orders[key], (value, row.id, position))
+                if key in buckets:
+                    bucket = bisect_right(self.bounds[key], value) - 1
+                    buckets[key][bucket] |= bit
+            if row.price == 0:
+                free |= bit
+            alive |= bit
+
+        return CatalogSnapshot(table, positions, orders, bitmaps, self.bounds, buckets, nulls, free, alive,
+                               self.binary_collation, self.built_at)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def supports(self, sort_key: str) -> bool:
+        """
+        Совпадет ли порядок снимка с порядком БД
+
+        Нет, если в ключе есть NULL (их место в порядке зависит от СУБД)
+        или title сортируется по collation БД
+        """
+        if sort_key == "title" and not self.binary_collation:
+            return False
+        return not self.nulls[sort_key]
+
+    def _range(self, key: str, low: float, high: float) -> int:
+        """Битовая карта строк со значением ключа в [low, high] (NULL не входит)"""
+        order, bounds, buckets = self.orders[key], self.bounds[key], self.buckets[key]
+        first = bisect_left(order, (low,))
+        last = bisect_right(order, (high, INFINITY))
+        if first >= last:
+            return 0
+
+        low_bucket = bisect_right(bounds, low) - 1
+        high_bucket = bisect_right(bounds, high) - 1
+        mask = 0
+        for bucket in range(low_bucket + 1, high_bucket):
+            mask |= buckets[bucket]
+
+        # Крайние корзины: биты строк внутри диапазона или карта корзины без строк
+        # вне его - что из этого короче
+        size = len(self.rows)
+        for bucket in {low_bucket, high_bucket}:
+            start = bisect_left(order, (bounds[bucket],))
+            end = bisect_left(order, (bounds[bucket + 1],)) if bucket + 1 < len(bounds) else len(order)
+            inside_start, inside_end = max(start, first), min(end, last)
+            inside = max(0, inside_end - inside_start)
+            if inside <= end - start - inside:
+                mask |= _bitmap((position for _, _, position in order[inside_start:inside_end]), size)
+            else:
+                outside = order[start:inside_start] + order[max(inside_end, inside_start):end]
+                mask |= buckets[bucket] & ~_bitmap((position for _, _, position in outside), size)
+        return mask
+
+    def query(self, sort_key: str, descending: bool, limit: int, offset: int = 0,
+              after: Optional[Tuple[object, int]] = None, category_id: Optional[int] = None,
+              level: Optional[CourseLevel] = None, instructor_id: Optional[int] = None,
+              is_free: Optional[bool] = None, min_price: Optional[float] = None,
+              max_price: Optional[float] = None, min_rating: Optional[float] = None
+              ) -> Tuple[List[CatalogRow], int]:
+        """
+        Страница каталога (до limit строк) и общее количество по фильтрам
+
+        Фильтры - как в get_courses, NULL им не удовлетворяет (как в SQL);
+        after - (значение ключа, id) из курсора. Ключ сортировки - только
+        поддерживаемый (supports)
+        """
+        mask = self.alive
+        for attribute, value in (("category_id", category_id), ("level", level), ("instructor_id", instructor_id)):
+            if value:
+                mask &= self.bitmaps[attribute].get(value, 0)
+        if is_free is not None:
+            mask &= self.free if is_free else ~self.free & ~self.nulls["price"]
+        if min_price is not None or max_price is not None:
+            mask &= self._range(
+                "price", -INFINITY if min_price is None else min_price, INFINITY if max_price is None else max_price
+            )
+        if min_rating is not None:
+            mask &= self._range("rating", min_rating, INFINITY)
+
+        total = mask.bit_count()
+        if not total or (after is not None and after[0] is None):
+            # Как в SQL: сравнение с NULL из курсора не выбирает строк
+            return [], total
+
+        order = self.orders[sort_key]
+        rows = self.rows
+        size = len(rows)
+        needed = offset + limit
+
+        # Фильтр по тому же ключу, что и сортировка, сужает обходимую часть порядка
+        start, end = 0, len(order)
+        if sort_key == "price":
+            if min_price is not None:
+                start = max(start, bisect_left(order, (min_price,)))
+            if max_price is not None:
+                end = min(end, bisect_right(order, (max_price, INFINITY)))
+            if is_free is not None:
+                zero = bisect_right(order, (0, INFINITY))
+                start, end = (start, min(end, zero)) if is_free else (max(start, zero), end)
+        elif sort_key == "rating" and min_rating is not None:
+            start = bisect_left(order, (min_rating,))
+
+        # Обход порядка читает в среднем needed * (строк / total) записей; выборка
+        # позиций из маски - size / 8 байт и total ключей. При редком совпадении
+        # дешевле второе: позиции из маски и первые needed через heapq
+        if mask != self.alive and needed * (end - start) > (size // 8 + 4 * total) * total:
+            attribute = SORT_ATTRIBUTES[sort_key]
+            keys = [(getattr(rows[position], attribute), rows[position].id, position)
+                    for position in _positions(mask, size)]
+            if after is not None:
+                keys = [key for key in keys if (key[:2] < after if descending else key[:2] > after)]
+            chosen = heapq.nlargest(needed, keys) if descending else heapq.nsmallest(needed, keys)
+            return [rows[position] for _, _, position in chosen[offset:]], total
+
+        if descending:
+            bound = min(end, bisect_left(order, after)) if after is not None else end
+            indexes = range(bound - 1, start - 1, -1)
+        else:
+            bound = max(start, bisect_right(order, (after[0], after[1], INFINITY))) if after is not None else start
+            indexes = range(bound, end)
+
+        # Байтовое представление маски: проверка бита позиции за O(1)
+        bits = mask.to_bytes((size >> 3) + 1, "little")
+        page = []
+        for index in indexes:
+            position = order[index][2]
+            if bits[position >> 3] >> (position & 7) & 1:
+                if offset:
+                    offset -= 1
+                    continue
+                page.append(rows[position])
+                if len(page) == limit:
+                    break
+        return page, total
+
+
+class CatalogCache:
+    """
+    Снимок каталога в пределах worker
+
+    Изменения курсов в этом процессе (invalidate) применяются к снимку
+    при следующем чтении: перечитываются только эти курсы. Раз в ttl снимок
+    строится заново - так подхватываются изменения других worker'ов и
+    счетчики (студенты, рейтинг), которые меняются без invalidate
+
+    Снимок читается из основной БД (session_factory), а не с реплики:
+    отставшая реплика вернула бы курс до изменения. Каждое изменение
+    получает версию; отложенный ID снимается только после успешной
+    загрузки, начатой не раньше его версии
+
+    Одновременно идет не больше одной загрузки (общая задача для всех
+    запросов), построение снимка выполняется в потоке. Пока идет пересборка
+    по ttl, запросы получают прежний снимок; изменения этого worker'а
+    (короткая загрузка нескольких курсов) запрос дожидается
+    """
+
+    def __init__(self, ttl: float, session_factory: Callable[[], AsyncSession]):
+        self.ttl = ttl
+        self.session_factory = session_factory
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        self._version = 0
+        # Версия изменений, учтенных в self.snapshot
+        self._snapshot_version = 0
+        # ID курса -> версия последнего изменения
+        self._pending: Dict[int, int] = {}
+        # Текущая загрузка и признак полной пересборки
+        self._task: Optional[asyncio.Future] = None
+        self._task_full = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def invalidate(self, course_id: int):
+        """Курс создан, изменен, опубликован, снят с публикации или удален (после commit)"""
+        with self._lock:
+            self._version += 1
+            self._pending[course_id] = self._version
+
+    def clear(self):
+        with self._lock:
+            self.snapshot = None
+            self._pending.clear()
+            # Загрузки, начатые до очистки, снимок не устанавливают
+            self._snapshot_version = self._version
+
+    async def get(self, rows_query: Callable[[], object]) -> Optional[CatalogSnapshot]:
+        """
+        Актуальный снимок (None - снимок выключен или не загрузился)
+
+        rows_query - запрос опубликованных курсов со столбцами CatalogRow
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            requested = self._version
+
+        while True:
+            snapshot = self.snapshot
+            expired = snapshot is None or time.monotonic() - snapshot.built_at > self.ttl
+            with self._lock:
+                # Изменения, сделанные до этого запроса
+                pending = any(version <= requested for version in self._pending.values())
+            if not expired and not pending:
+                record_cache("catalog_snapshot", True)
+                return snapshot
+
+            if self._task is None:
+                self._task_full = expired
+                self._task = asyncio.ensure_future(self._load(rows_query, expired))
+            if snapshot is not None and self._task_full and not pending:
+                record_cache("catalog_snapshot", True)
+                return snapshot
+
+            # shield: отмена одного запроса не прерывает общую загрузку
+            if not await asyncio.shield(self._task):
+                return None
+
+    async def _load(self, rows_query: Callable[[], object], full: bool) -> bool:
+        """Полная или инкрементальная загрузка из основной БД; False - ошибка"""
+        try:
+            with self._lock:
+                snapshot, started, pending = self.snapshot, self._version, set(self._pending)
+            full = full or snapshot is None
+
+            async with self.session_factory() as db:
+                if full:
+                    rows = (await db.execute(rows_query())).all()
+                    binary_collation = db.bind.dialect.name in BINARY_COLLATION_DIALECTS
+                else:
+                    rows = (await db.execute(rows_query().where(Course.id.in_(pending)))).all()
+
+            # Построение снимка - работа CPU: в потоке, event loop продолжает обслуживать запросы
+            if full:
+                snapshot = await asyncio.to_thread(
+                    lambda: CatalogSnapshot.build(map(CatalogRow.from_row, rows), binary_collation)
+                )
+            else:
+                snapshot = await asyncio.to_thread(
+                    lambda: snapshot.replace(pending, [CatalogRow.from_row(row) for row in rows])
+                )
+        except Exception:
+            # Отложенные ID остаются: их перечитает следующая загрузка
+            logger.exception("Не удалось загрузить снимок каталога")
+            return False
+        finally:
+            self._task = None
+            self._task_full = False
+        record_cache("catalog_snapshot", False)
+
+        with self._lock:
+            if started >= self._snapshot_version:
+                self.snapshot = snapshot
+                self._snapshot_version = started
+            for course_id in pending:
+                if self._pending.get(course_id, INFINITY) <= started:
+                    del self._pending[course_id]
+        return True
+
+
+catalog_cache = CatalogCache(settings.CATALOG_SNAPSHOT_TTL_SECONDS, AsyncSessionLocal)
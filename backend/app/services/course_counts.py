@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.utils.metrics import record_cache
+
+
+class CountCache:
+    """
+    TTL кэш количества курсов по набору фильтров в пределах worker
+
+    Значение - (total, is_estimate). Публикация, снятие с публикации и
+    другие изменения курсов в этом процессе сбрасывают кэш целиком (clear),
+    в других worker'ах устаревший total живет не дольше ttl
+    """
+
+    def __init__(self, ttl: float, max_size: int = 1000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple[float, Tuple[int, bool]]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[int, bool]]:
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                value = entry[1]
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                value = None
+
+        record_cache("course_count", value is not None)
+        return value
+
+    def put(self, key: Hashable, value: Tuple[int, bool]):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+course_counts = CountCache(settings.COURSE_COUNT_CACHE_TTL_SECONDS, settings.COURSE_COUNT_CACHE_SIZE)
+
+
+async def estimate_rows(db: AsyncSession, query) -> Optional[int]:
+    """
+    Оценка количества строк запроса по статистике планировщика (EXPLAIN, без выполнения)
+
+    Только PostgreSQL; для остальных СУБД - None
+    """
+    dialect = db.bind.dialect
+    if dialect.name != "postgresql":
+        return None
+
+    sql = str(query.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    plan = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar()
+    # asyncpg возвращает json строкой, psycopg2 - разобранным
+    if isinstance(plan, (str, bytes)):
+        plan = orjson.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_courses(db: AsyncSession, key: Hashable, count_query, estimate_query=None) -> Tuple[int, bool]:
+    """
+    Количество курсов (total, is_estimate) с кэшированием по ключу фильтров
+
+    estimate_query передается для списков без пользовательских фильтров: при
+    COURSE_COUNT_ESTIMATE оценка планировщика заменяет COUNT(*), если она
+    не меньше COURSE_COUNT_ESTIMATE_MIN (небольшие количества считаются точно)
+    """
+    cached = course_counts.get(key)
+    if cached is not None:
+        return cached
+
+    result = None
+    if estimate_query is not None and settings.COURSE_COUNT_ESTIMATE:
+        estimate = await estimate_rows(db, estimate_query)
+        if estimate is not None and estimate >= settings.COURSE_COUNT_ESTIMATE_MIN:
+            result = (estimate, True)
+
+    if result is None:
+        result = (await db.scalar(count_query), False)
+
+    course_counts.put(key, result)
+    return result
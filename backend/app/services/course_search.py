@@ -0,0 +1,86 @@
+import re
+from typing import List, Optional
+
+from sqlalchemy import String, bindparam, column, func, literal_column, or_, select, table
+
+from app.models.course import Course, SEARCH_CONFIGS
+
+# Ограничение числа слов запроса (длинные запросы не усложняют план)
+MAX_SEARCH_TERMS = 8
+
+# Конфигурации, по которым строится запрос PostgreSQL: язык курса заранее
+# неизвестен, поэтому запрос объединяет варианты всех языков (индекс используется)
+QUERY_CONFIGS = tuple(dict.fromkeys(SEARCH_CONFIGS.values())) + ("simple",)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+search_vector = literal_column("courses.search_vector")
+courses_fts = table("courses_fts", column("rowid"))
+
+
+def search_terms(search: Optional[str]) -> List[str]:
+    """Слова поискового запроса в нижнем регистре (без операторов и кавычек)"""
+    return _WORD.findall((search or "").lower())[:MAX_SEARCH_TERMS]
+
+
+def tsquery_text(terms: List[str]) -> str:
+    """Запрос для to_tsquery: все слова обязательны, последнее - по префиксу"""
+    return " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+
+
+def fts5_query(terms: List[str]) -> str:
+    """Запрос FTS5 MATCH: все слова обязательны, последнее - по префиксу"""
+    return " ".join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+
+
+class CourseSearch:
+    """
+    Поиск курсов для выбранной СУБД
+
+    - postgresql: tsvector + GIN, ранжирование ts_rank_cd
+    - sqlite: FTS5, ранжирование bm25
+    - остальные: ILIKE по названию и описаниям, без ранжирования
+
+    apply() добавляет условие поиска к запросу (выборке или подсчету),
+    rank - выражение сортировки по релевантности (None без ранжирования)
+    """
+
+    def __init__(self, search: str, terms: List[str], backend: str):
+        self.terms = terms
+        self.backend = backend if backend in ("postgresql", "sqlite") else "ilike"
+        self.rank = None
+
+        if self.backend == "postgresql":
+            text = bindparam("search_query", tsquery_text(self.terms), type_=String)
+            query = None
+            for config in QUERY_CONFIGS:
+                part = func.to_tsquery(literal_column(f"'{config}'::regconfig"), text)
+                query = part if query is None else query.op("||")(part)
+            self._condition = search_vector.op("@@")(query)
+            self.rank = func.ts_rank_cd(search_vector, query).desc()
+        elif self.backend == "sqlite":
+            matches = select(
+                courses_fts.c.rowid.label("course_id"),
+                # Веса столбцов как в PostgreSQL: название > краткое описание > описание
+                func.bm25(literal_column("courses_fts"), 10.0, 4.0, 1.0).label("rank")
+            ).where(literal_column("courses_fts").op("MATCH")(fts5_query(self.terms))).subquery("search")
+            self._matches = matches
+            self.rank = matches.c.rank.asc()
+        else:
+            pattern = f"%{search}%"
+            self._condition = or_(
+                Course.title.ilike(pattern),
+                Course.description.ilike(pattern),
+                Course.short_description.ilike(pattern)
+            )
+
+    @classmethod
+    def build(cls, search: Optional[str], backend: str) -> Optional["CourseSearch"]:
+        """Поиск по запросу пользователя; None, если в запросе нет слов"""
+        terms = search_terms(search)
+        return cls(search, terms, backend) if terms else None
+
+    def apply(self, query):
+        if self.backend == "sqlite":
+            return query.join(self._matches, self._matches.c.course_id == Course.id)
+        return query.where(self._condition)
@@ -0,0 +1,113 @@
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.refresh_token import RefreshToken
+from app.utils.security import create_refresh_token
+
+
+class RefreshTokenError(Exception):
+    """Refresh токен не найден, уже использован или отозван"""
+
+
+def hash_jti(jti: str) -> str:
+    """SHA-256 идентификатора токена (в БД сам jti не хранится)"""
+    return hashlib.sha256(jti.encode()).hexdigest()
+
+
+def issue_refresh_token(db: AsyncSession, user_id: int, email: str, family_id: Optional[str] = None) -> str:
+    """
+    Создает refresh токен и добавляет его запись в сессию (commit - у вызывающего)
+
+    Без family_id начинается новая цепочка ротации (новый вход, новое устройство)
+    """
+    jti = secrets.token_urlsafe(16)
+    family_id = family_id or uuid.uuid4().hex
+    token = create_refresh_token(data={"sub": user_id, "email": email, "jti": jti, "fam": family_id})
+
+    db.add(RefreshToken(
+        jti_hash=hash_jti(jti),
+        user_id=user_id,
+        family_id=family_id,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    return token
+
+
+async def consume_refresh_token(db: AsyncSession, user_id: int, jti: str) -> str:
+    """
+    Помечает токен использованным и возвращает family_id для следующего токена
+
+    Повторное предъявление использованного токена отзывает всю цепочку
+
+    Raises:
+        RefreshTokenError: токен не найден, чужой или уже использован
+    """
+    token = await db.scalar(select(RefreshToken).where(RefreshToken.jti_hash == hash_jti(jti)))
+    if token is None or token.user_id != user_id:
+        raise RefreshTokenError("Refresh токен не найден")
+
+    # Условный UPDATE: из параллельных запросов с одним токеном проходит только один
+    result = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == token.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+    if result.rowcount != 1:
+        await revoke_family(db, token.family_id)
+        await db.commit()
+        raise RefreshTokenError("Refresh токен уже был использован")
+
+    return token.family_id
+
+
+async def revoke_family(db: AsyncSession, family_id: str):
+    """Отзывает все действующие токены цепочки"""
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+
+async def revoke_user_tokens(db: AsyncSession, user_id: int):
+    """Отзывает все действующие токены пользователя (выход на всех устройствах)"""
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+
+def delete_expired_refresh_tokens(db: Session, batch_size: int = 10_000) -> int:
+    """
+    Удаляет истекшие токены пачками (короткие транзакции без долгих блокировок)
+
+    Returns:
+        Количество удаленных строк
+    """
+    now = datetime.now(timezone.utc)
+    deleted = 0
+    while True:
+        expired_ids = (
+            select(RefreshToken.id)
+            .where(RefreshToken.expires_at < now)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = db.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.id.in_(expired_ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
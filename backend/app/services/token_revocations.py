@@ -0,0 +1,124 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, NamedTuple, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.token_revocation import TokenRevocation
+from app.utils.dependencies import principal_cache, revoked_tokens
+from app.utils.revocation import RevocationList
+
+logger = logging.getLogger(__name__)
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite возвращает naive datetime (значения записаны в UTC)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class Revocation(NamedTuple):
+    """Отзыв, записанный в сессию, но еще не примененный в памяти worker'а"""
+    user_id: int
+    revoked_at: float
+
+
+def revoke_user_access(db, user_id: int, reason: str) -> Revocation:
+    """
+    Отзывает access токены пользователя, выданные до текущего момента
+
+    Запись добавляется в сессию (sync или async, commit - у вызывающего).
+    После успешного commit вызывающий передает результат в apply_revocation:
+    в этом worker отзыв действует сразу, в остальных - после синхронизации.
+    Если commit не прошел, память worker'а не меняется
+    """
+    now = datetime.now(timezone.utc)
+    db.add(TokenRevocation(
+        user_id=user_id,
+        reason=reason,
+        revoked_at=now,
+        expires_at=now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    ))
+    return Revocation(user_id, now.timestamp())
+
+
+def apply_revocation(revocation: Revocation):
+    """Применяет зафиксированный отзыв в этом worker: кэш пользователя и список отзыва"""
+    principal_cache.invalidate(revocation.user_id)
+    revoked_tokens.revoke_user(revocation.user_id, revocation.revoked_at)
+
+
+def delete_expired_revocations(db: Session) -> int:
+    """Удаляет записи об отзыве, токены по которым уже истекли"""
+    result = db.execute(
+        delete(TokenRevocation)
+        .where(TokenRevocation.expires_at < datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+class RevocationSync:
+    """
+    Подгрузка отзывов из БД в RevocationList worker'а
+
+    Первый вызов загружает все действующие отзывы, следующие - записи
+    с created_at не раньше курсора (минус overlap: транзакции, начатые
+    раньше, могут зафиксироваться позже). Повторное применение безопасно
+    """
+
+    def __init__(self, revocations: RevocationList, session_factory: Callable[[], Session],
+                 interval: float, overlap: float = 30.0):
+        self.revocations = revocations
+        self.session_factory = session_factory
+        self.interval = interval
+        self.overlap = timedelta(seconds=overlap)
+        self.cursor: Optional[datetime] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sync_once(self) -> int:
+        """Один проход синхронизации; возвращает количество прочитанных записей"""
+        query = select(TokenRevocation.user_id, TokenRevocation.revoked_at, TokenRevocation.created_at).where(
+            TokenRevocation.expires_at > datetime.now(timezone.utc)
+        )
+        if self.cursor is not None:
+            query = query.where(TokenRevocation.created_at >= self.cursor - self.overlap)
+
+        with self.session_factory() as db:
+            rows = db.execute(query).all()
+
+        self.revocations.revoke_many((row.user_id, _timestamp(row.revoked_at)) for row in rows)
+        self.revocations.prune()
+        if rows:
+            self.cursor = max(row.created_at for row in rows)
+        return len(rows)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sync_once()
+            except Exception:
+                logger.exception("Не удалось синхронизировать отзыв токенов")
+
+    def start(self):
+        """Начальная загрузка и фоновый поток синхронизации"""
+        try:
+            self.sync_once()
+        except Exception:
+            logger.exception("Не удалось загрузить отзыв токенов")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="token-revocation-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
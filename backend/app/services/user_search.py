@@ -0,0 +1,57 @@
+from typing import Optional
+
+from sqlalchemy import String, and_, func, literal, literal_column, or_
+
+from app.models.user import User, USER_SEARCH_TEXT
+
+# Ограничение длины запроса (длинная строка не добавляет точности)
+MAX_SEARCH_LENGTH = 100
+
+# Верхняя граница диапазона строк с заданным префиксом
+PREFIX_END = "\U0010ffff"
+
+search_text = literal_column(USER_SEARCH_TEXT)
+
+
+def escape_like(value: str) -> str:
+    """Экранирует спецсимволы LIKE (escape-символ - обратный слеш)"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class UserSearch:
+    """
+    Поиск пользователей в админке для выбранной СУБД
+
+    - postgresql: подстрока (LIKE) или нечеткое совпадение слова (<%) по
+      строке "email имя фамилия"; оба условия обслуживает GIN индекс
+      pg_trgm, ранжирование - word_similarity
+    - остальные: префикс email, имени или фамилии по индексам lower(),
+      без ранжирования (в SQLite lower() меняет регистр только у ASCII)
+    """
+
+    def __init__(self, term: str, backend: str):
+        self.term = term
+        self.backend = "postgresql" if backend == "postgresql" else "prefix"
+        self.rank = None
+
+        if self.backend == "postgresql":
+            self._condition = or_(
+                search_text.like(f"%{escape_like(term)}%", escape="\\"),
+                literal(term, String).op("<%")(search_text)
+            )
+            self.rank = func.word_similarity(term, search_text).desc()
+        else:
+            # Диапазон вместо LIKE 'term%': использует индекс lower() в любой СУБД
+            self._condition = or_(*(
+                and_(func.lower(column) >= term, func.lower(column) < term + PREFIX_END)
+                for column in (User.email, User.first_name, User.last_name)
+            ))
+
+    @classmethod
+    def build(cls, search: Optional[str], backend: str) -> Optional["UserSearch"]:
+        """Поиск по запросу админа; None для пустого запроса"""
+        term = (search or "").strip().lower()[:MAX_SEARCH_LENGTH]
+        return cls(term, backend) if term else None
+
+    def apply(self, query):
+        return query.filter(self._condition)
@@ -1,9 +1,39 @@
 # app/tests/conftest.py
+import uuid
+
 import pytest
 from fastapi.testclient import TestClient
-from app.main import app
+from app.database import create_tables
+from app.main import create_app
+import app.models  # noqa: F401 - регистрирует модели в Base.metadata
+from app.api.auth import rate_limiter
+
 
 @pytest.fixture(scope="session")
 def client():
-    with TestClient(app) as client:
+    # Приложение не создает таблицы само, в тестах схема создается напрямую
+    create_tables()
+    # Все тесты приходят с одного адреса; лимиты проверяются отдельно
+    rate_limiter.enabled = False
+    with TestClient(create_app()) as client:
         yield client
+
+
+@pytest.fixture
+def register_user(client):
+    """Регистрирует нового пользователя с уникальным email и возвращает ответ API"""
+
+    def register(role: str = "student") -> dict:
+        response = client.post("/api/auth/register", json={
+            "email": f"{uuid.uuid4().hex[:12]}@example.com",
+            "password": "secret123",
+            "first_name": "Test",
+            "last_name": "User",
+            "role": role
+        })
+        assert response.status_code == 201
+        data = response.json()
+        data["headers"] = {"Authorization": f"Bearer {data['access_token']}"}
+        return data
+
+    return register
@@ -0,0 +1,143 @@
+# app/tests/integration/test_admin.py
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.database import SessionLocal
+from app.models import TokenRevocation, User
+from app.services.token_revocations import RevocationSync, apply_revocation, revoke_user_access
+from app.services.user_search import UserSearch, escape_like
+from app.utils.dependencies import revoked_tokens
+from app.utils.revocation import RevocationList
+
+
+def test_database_pool_stats(client, register_user):
+    """Админ видит состояние обоих пулов соединений"""
+    headers = register_user(role="admin")["headers"]
+
+    response = client.get("/api/admin/admin/database/pool", headers=headers)
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["sync"]["checkouts"] >= 1
+    assert "checked_out" in stats["async"]
+
+
+def test_admin_read_endpoint_authorized_from_token(client, register_user):
+    """Свежий токен админа проверяется по claims: запрос к users не выполняется"""
+    headers = register_user(role="admin")["headers"]
+
+    response = client.get("/api/admin/admin/database/pool", headers=headers)
+    assert response.status_code == 200
+    assert 'desc="0 queries"' in response.headers["server-timing"]
+
+
+def test_database_pool_stats_forbidden_for_student(client, register_user):
+    """Студенту статистика пула недоступна"""
+    headers = register_user()["headers"]
+
+    response = client.get("/api/admin/admin/database/pool", headers=headers)
+    assert response.status_code == 403
+
+
+def test_slow_queries(client, register_user):
+    """Админ видит журнал медленных запросов и может его очистить"""
+    headers = register_user(role="admin")["headers"]
+
+    response = client.get("/api/admin/admin/database/slow-queries", headers=headers)
+    assert response.status_code == 200
+    assert "queries" in response.json()
+
+    response = client.delete("/api/admin/admin/database/slow-queries", headers=headers)
+    assert response.status_code == 204
+
+
+def test_role_and_status_changes_apply_immediately(client, register_user):
+    """Изменения админа отзывают выданные токены: новая роль и блокировка действуют сразу"""
+    admin = register_user(role="admin")["headers"]
+    user = register_user()
+    headers, user_id = user["headers"], user["user"]["id"]
+
+    # Пользователь попадает в кэш
+    assert client.get("/api/admin/admin/database/pool", headers=headers).status_code == 403
+
+    response = client.patch(f"/api/admin/admin/users/{user_id}/role", headers=admin, params={"new_role": "admin"})
+    assert response.status_code == 200
+    assert client.get("/api/admin/admin/database/pool", headers=headers).status_code == 401
+
+    # Токен после обновления несет новую роль
+    response = client.post("/api/auth/refresh", json={"refresh_token": user["refresh_token"]})
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get("/api/admin/admin/database/pool", headers=headers).status_code == 200
+
+    response = client.patch(f"/api/admin/admin/users/{user_id}/status", headers=admin, params={"is_active": False})
+    assert response.status_code == 200
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+
+def test_revocations_synced_from_database(client, register_user):
+    """Отзыв, записанный другим worker'ом, подгружается синхронизацией"""
+    user_id = register_user()["user"]["id"]
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        db.add(TokenRevocation(user_id=user_id, reason="logout", revoked_at=now,
+                               expires_at=now + timedelta(minutes=5)))
+        db.commit()
+
+    revocations = RevocationList(window=300)
+    sync = RevocationSync(revocations, SessionLocal, interval=1)
+    assert sync.sync_once() >= 1
+    assert revocations.is_revoked(user_id, now.timestamp() - 1)
+    assert not revocations.is_revoked(user_id, now.timestamp() + 1)
+    assert sync.cursor is not None
+
+
+def test_revocation_applied_only_after_commit(client, register_user):
+    """Отзыв из откаченной транзакции не меняет память worker'а"""
+    user = register_user()
+    headers, user_id = user["headers"], user["user"]["id"]
+
+    with SessionLocal() as db:
+        revocation = revoke_user_access(db, user_id, "logout")
+        db.rollback()
+    assert not revoked_tokens.is_revoked(user_id, revocation.revoked_at - 1)
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    with SessionLocal() as db:
+        revocation = revoke_user_access(db, user_id, "logout")
+        db.commit()
+    apply_revocation(revocation)
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+
+def test_profile_update_refreshes_cached_user(client, register_user):
+    """Новое имя после обновления профиля сразу видно в /auth/me"""
+    headers = register_user()["headers"]
+    assert client.get("/api/auth/me", headers=headers).json()["first_name"] == "Test"
+
+    response = client.patch("/api/users/me", headers=headers, json={"first_name": "Renamed"})
+    assert response.status_code == 200
+    assert client.get("/api/auth/me", headers=headers).json()["first_name"] == "Renamed"
+
+
+def test_user_search_by_prefix(client, register_user):
+    """Без pg_trgm поиск идет по началу email, имени или фамилии"""
+    headers = register_user(role="admin")["headers"]
+    email = register_user()["user"]["email"]
+
+    response = client.get("/api/admin/admin/users", headers=headers, params={"search": email[:8].upper()})
+    assert response.status_code == 200
+    assert [user["email"] for user in response.json()["users"]] == [email]
+
+    response = client.get("/api/admin/admin/users", headers=headers, params={"search": email[2:10]})
+    assert response.json()["total"] == 0
+
+
+def test_user_search_postgresql_uses_trigrams():
+    user_search = UserSearch.build("Iv%an", "postgresql")
+    sql = str(user_search.apply(select(User.id)).compile(dialect=postgresql.dialect()))
+
+    assert "LIKE" in sql and "<%%" in sql
+    assert user_search.term == "iv%an"
+    assert escape_like(user_search.term) == "iv\\%an"
@@ -0,0 +1,52 @@
+# app/tests/integration/test_async_routers.py
+import uuid
+
+
+def test_register_and_login(client, register_user):
+    """Регистрация и вход работают через AsyncSession"""
+    data = register_user()
+    response = client.post("/api/auth/login", json={
+        "email": data["user"]["email"],
+        "password": "secret123"
+    })
+    assert response.status_code == 200
+    assert response.json()["user"]["id"] == data["user"]["id"]
+
+
+def test_create_and_get_course(client, register_user):
+    """Курс создается и читается с преподавателем без lazy load"""
+    headers = register_user(role="instructor")["headers"]
+
+    response = client.post("/api/courses/", headers=headers, json={
+        "title": f"Async course {uuid.uuid4().hex[:6]}",
+        "description": "Course created through the async session"
+    })
+    assert response.status_code == 201
+    course = response.json()
+    assert course["instructor_name"] == "Test User"
+
+    response = client.get(f"/api/courses/{course['id']}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["slug"] == course["slug"]
+
+    response = client.get("/api/courses/my/instructor", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+
+
+def test_categories_list(client):
+    """Список категорий доступен без авторизации"""
+    response = client.get("/api/categories/")
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+
+
+def test_logout_clears_refresh_token(client, register_user):
+    """Выход изменяет пользователя через асинхронную сессию"""
+    data = register_user()
+
+    response = client.post("/api/auth/logout", headers=data["headers"])
+    assert response.status_code == 200
+
+    response = client.post("/api/auth/refresh", json={"refresh_token": data["refresh_token"]})
+    assert response.status_code == 401
@@ -0,0 +1,19 @@
+# app/tests/integration/test_auth.py
+from app.config import settings
+from app.database import SessionLocal
+from app.models import User
+
+
+def test_login_rehashes_password_with_new_cost(client, register_user, monkeypatch):
+    """После смены BCRYPT_ROUNDS хеш пересчитывается при входе"""
+    data = register_user()
+    credentials = {"email": data["user"]["email"], "password": "secret123"}
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+
+    assert client.post("/api/auth/login", json=credentials).status_code == 200
+
+    with SessionLocal() as db:
+        hashed_password = db.get(User, data["user"]["id"]).hashed_password
+    assert hashed_password.startswith("$2b$05$")
+    assert client.post("/api/auth/login", json=credentials).status_code == 200
+    assert client.post("/api/auth/login", json={**credentials, "password": "wrong"}).status_code == 401
@@ -0,0 +1,237 @@
+# app/tests/integration/test_course_pagination.py
+import re
+import uuid
+from unittest.mock import patch
+
+import sqlite3
+
+import pytest
+from sqlalchemy import event, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import SessionLocal, async_engine, get_async_read_db
+from app.models import Course
+from app.services.catalog_snapshot import catalog_cache
+from app.services.course_counts import course_counts
+
+
+def create_courses(client, headers, prices: list) -> list:
+    ids = []
+    for price in prices:
+        response = client.post("/api/courses/", headers=headers, json={
+            "title": f"Paged course {uuid.uuid4().hex[:6]}",
+            "description": "Course for cursor pagination",
+            "price": price
+        })
+        assert response.status_code == 201
+        ids.append(response.json()["id"])
+    return ids
+
+
+def walk(client, headers, url: str, params: dict) -> list:
+    """Все страницы по next_cursor"""
+    ids, cursor = [], None
+    while True:
+        response = client.get(url, headers=headers, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        data = response.json()
+        ids += [course["id"] for course in data["courses"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_cursor_pages_match_offset_pages(client, register_user):
+    """Курсоры обходят все курсы без пропусков и повторов (курсы созданы в одну секунду)"""
+    headers = register_user(role="instructor")["headers"]
+    ids = create_courses(client, headers, [0.0] * 5)
+
+    assert walk(client, headers, "/api/courses/my/instructor", {"page_size": 2}) == ids[::-1]
+
+    response = client.get("/api/courses/my/instructor", headers=headers, params={"page": 2, "page_size": 2})
+    assert [course["id"] for course in response.json()["courses"]] == ids[::-1][2:4]
+
+
+def test_cursor_with_equal_sort_values(client, register_user):
+    """Равные цены разрешаются по ID"""
+    data = register_user(role="instructor")
+    headers = data["headers"]
+    ids = create_courses(client, headers, [10.0, 5.0, 10.0, 5.0, 10.0])
+    params = {"instructor_id": data["user"]["id"], "sort_by": "price", "sort_order": "asc", "page_size": 2}
+
+    assert walk(client, headers, "/api/courses/", params) == [ids[1], ids[3], ids[0], ids[2], ids[4]]
+
+
+def test_invalid_cursor(client, register_user):
+    headers = register_user(role="instructor")["headers"]
+    create_courses(client, headers, [0.0, 0.0])
+
+    response = client.get("/api/courses/my/instructor", headers=headers, params={"page_size": 1})
+    cursor = response.json()["next_cursor"]
+    assert cursor is not None
+
+    response = client.get("/api/courses/", headers=headers, params={"cursor": cursor, "sort_by": "price"})
+    assert response.status_code == 400
+    response = client.get("/api/courses/", headers=headers, params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_catalog_total_cached_until_publish(client, register_user):
+    """Количество курсов кэшируется и сбрасывается публикацией"""
+    headers = register_user(role="instructor")["headers"]
+    student = register_user()["headers"]
+    course_id = create_courses(client, headers, [0.0])[0]
+
+    first = client.get("/api/courses/", headers=student).json()
+    assert first["total_is_estimate"] is False
+    with patch("app.services.course_counts.AsyncSession.scalar") as scalar:
+        assert client.get("/api/courses/", headers=student).json()["total"] == first["total"]
+    scalar.assert_not_called()
+
+    assert client.patch(f"/api/courses/{course_id}/publish", headers=headers, json={"is_published": True}).status_code == 200
+    assert client.get("/api/courses/", headers=student).json()["total"] == first["total"] + 1
+
+
+def test_catalog_page_selects_only_list_columns(client, register_user):
+    """Страница каталога - один запрос без текстов курса; поля CourseShort заполнены"""
+    data = register_user(role="instructor")
+    headers = data["headers"]
+    create_courses(client, headers, [0.0, 25.0])
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = client.get("/api/courses/", headers=headers, params={"instructor_id": data["user"]["id"]})
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    courses = response.json()["courses"]
+    assert [(course["instructor_name"], course["is_free"]) for course in courses] == [
+        ("Test User", False), ("Test User", True)
+    ]
+    pages = [statement for statement in statements if "FROM courses JOIN users" in statement]
+    assert len(pages) == 1
+    assert "courses.description" not in pages[0] and "courses.requirements" not in pages[0]
+
+
+def test_published_catalog_served_from_snapshot(client, register_user):
+    """Повторный просмотр каталога не обращается к courses; публикация и снятие видны сразу"""
+    data = register_user(role="instructor")
+    headers, instructor_id = data["headers"], data["user"]["id"]
+    student = register_user()["headers"]
+    course_id = create_courses(client, headers, [0.0])[0]
+    params = {"instructor_id": instructor_id}
+
+    assert client.get("/api/courses/", headers=student, params=params).json()["total"] == 0
+
+    client.patch(f"/api/courses/{course_id}/publish", headers=headers, json={"is_published": True})
+    response = client.get("/api/courses/", headers=student, params=params)
+    assert [course["id"] for course in response.json()["courses"]] == [course_id]
+
+    response = client.get("/api/courses/", headers=student, params=params)
+    assert response.json()["total"] == 1
+    # Только пользователь (кэш Principal) - запросов к courses нет
+    assert int(re.search(r'desc="(\d+) queries"', response.headers["server-timing"]).group(1)) <= 1
+
+    client.patch(f"/api/courses/{course_id}/publish", headers=headers, json={"is_published": False})
+    assert client.get("/api/courses/", headers=student, params=params).json()["courses"] == []
+
+
+def test_snapshot_reloads_changes_from_primary(client, register_user, tmp_path):
+    """Отставшая реплика не попадает в снимок: измененные курсы перечитываются из основной БД"""
+    if async_engine.dialect.name != "sqlite":
+        pytest.skip("Копия реплики снимается средствами SQLite")
+
+    data = register_user(role="instructor")
+    headers = data["headers"]
+    student = register_user()["headers"]
+    params = {"instructor_id": data["user"]["id"]}
+    course_id = create_courses(client, headers, [0.0])[0]
+    assert client.get("/api/courses/", headers=student, params=params).json()["courses"] == []
+
+    # Реплика остановилась до публикации
+    replica_path = tmp_path / "replica.db"
+    with sqlite3.connect(async_engine.url.database) as source, sqlite3.connect(replica_path) as target:
+        source.backup(target)
+    replica_engine = create_async_engine(f"sqlite+aiosqlite:///{replica_path}")
+    replica_sessions = async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def stale_read_db():
+        async with replica_sessions() as db:
+            yield db
+
+    client.patch(f"/api/courses/{course_id}/publish", headers=headers, json={"is_published": True})
+    client.app.dependency_overrides[get_async_read_db] = stale_read_db
+    try:
+        response = client.get("/api/courses/", headers=student, params=params)
+    finally:
+        client.app.dependency_overrides.pop(get_async_read_db)
+    assert [course["id"] for course in response.json()["courses"]] == [course_id]
+
+
+def test_snapshot_matches_database_with_mixed_case(client, register_user):
+    """Снимок и SQL отдают одинаковые страницы: заглавные и строчные title, фильтры цены и рейтинга"""
+    data = register_user(role="instructor")
+    headers = data["headers"]
+    student = register_user()["headers"]
+    titles = ["apple", "Banana", "cherry", "Äpfel", "banana split", "Apple pie"]
+    ids = []
+    for index, title in enumerate(titles):
+        response = client.post("/api/courses/", headers=headers, json={
+            "title": title, "description": "Snapshot consistency", "price": float(index % 3) * 10
+        })
+        ids.append(response.json()["id"])
+        client.patch(f"/api/courses/{ids[-1]}/publish", headers=headers, json={"is_published": True})
+
+    def listing(params: dict) -> dict:
+        course_counts.clear()
+        response = client.get("/api/courses/", headers=student, params={"instructor_id": data["user"]["id"], **params})
+        assert response.status_code == 200
+        return response.json()
+
+    cases = [
+        {}, {"min_rating": 0}, {"max_price": 15}, {"min_price": 0}, {"is_free": False}, {"is_free": True},
+        {"sort_by": "title", "sort_order": "asc"}, {"sort_by": "title", "page_size": 2},
+        {"sort_by": "price", "sort_order": "asc"}, {"sort_by": "rating"}
+    ]
+    from_snapshot = [listing(params) for params in cases]
+    ttl = catalog_cache.ttl
+    catalog_cache.ttl = 0
+    try:
+        from_database = [listing(params) for params in cases]
+    finally:
+        catalog_cache.ttl = ttl
+
+    assert from_snapshot == from_database
+    assert from_snapshot[4]["total"] == 4
+
+
+def test_sort_keys_without_values_paginate(client, register_user):
+    """Курс, записанный без цены, рейтинга и студентов, получает 0 и не выпадает из курсоров; NULL не записывается"""
+    data = register_user(role="instructor")
+    headers, instructor_id = data["headers"], data["user"]["id"]
+    ids = create_courses(client, headers, [10.0, 5.0])
+    with SessionLocal() as db:
+        db.execute(text(
+            "INSERT INTO courses (title, slug, description, instructor_id) "
+            "VALUES ('Raw course', :slug, 'Inserted without sort values', :instructor_id)"
+        ), {"slug": f"raw-{uuid.uuid4().hex[:6]}", "instructor_id": instructor_id})
+        db.commit()
+        raw_id = db.scalar(text("SELECT max(id) FROM courses WHERE instructor_id = :id"), {"id": instructor_id})
+
+        with pytest.raises(IntegrityError):
+            db.execute(update(Course).where(Course.id == ids[0]).values(price=None))
+        db.rollback()
+
+    for sort_by in ("price", "rating", "students"):
+        params = {"instructor_id": instructor_id, "sort_by": sort_by, "sort_order": "asc", "page_size": 1}
+        assert sorted(walk(client, headers, "/api/courses/", params)) == sorted(ids + [raw_id])
+    params = {"instructor_id": instructor_id, "sort_by": "price", "sort_order": "asc", "page_size": 1}
+    assert walk(client, headers, "/api/courses/", params) == [raw_id, ids[1], ids[0]]
+
+    response = client.put(f"/api/courses/{ids[0]}", headers=headers, json={"price": None})
+    assert response.status_code == 422
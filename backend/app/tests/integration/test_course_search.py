@@ -0,0 +1,72 @@
+# app/tests/integration/test_course_search.py
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models import Course
+from app.services.course_search import CourseSearch, fts5_query, search_terms, tsquery_text
+
+
+def create_course(client, headers, title: str, description: str) -> dict:
+    response = client.post("/api/courses/", headers=headers, json={"title": title, "description": description})
+    assert response.status_code == 201
+    return response.json()
+
+
+def search(client, headers, instructor_id: int, query: str, **params) -> list:
+    response = client.get("/api/courses/", headers=headers,
+                          params={"search": query, "instructor_id": instructor_id, **params})
+    assert response.status_code == 200
+    return [course["title"] for course in response.json()["courses"]]
+
+
+def test_search_ranks_title_matches_first(client, register_user):
+    """Совпадение в названии выше совпадения в описании; последнее слово ищется по префиксу"""
+    data = register_user(role="instructor")
+    headers, instructor_id = data["headers"], data["user"]["id"]
+    marker = uuid.uuid4().hex[:8]
+
+    create_course(client, headers, f"Кулинария {marker}", "Основы программирования упоминаются вскользь")
+    create_course(client, headers, f"Программирование на Python {marker}", "Курс для начинающих")
+    create_course(client, headers, f"Рисование {marker}", "Акварель и гуашь")
+
+    assert search(client, headers, instructor_id, f"{marker} программ") == [
+        f"Программирование на Python {marker}", f"Кулинария {marker}"
+    ]
+    assert search(client, headers, instructor_id, f"{marker} акварел") == [f"Рисование {marker}"]
+    assert search(client, headers, instructor_id, f"{marker} программ", sort_by="title", sort_order="asc") == [
+        f"Кулинария {marker}", f"Программирование на Python {marker}"
+    ]
+
+
+def test_search_index_follows_updates(client, register_user):
+    """Измененное название находится поиском, старое - нет"""
+    data = register_user(role="instructor")
+    headers, instructor_id = data["headers"], data["user"]["id"]
+    marker = uuid.uuid4().hex[:8]
+    course = create_course(client, headers, f"Черновик {marker}", "Описание будущего курса")
+
+    response = client.put(f"/api/courses/{course['id']}", headers=headers, json={"title": f"Итоговый {marker}"})
+    assert response.status_code == 200
+
+    assert search(client, headers, instructor_id, f"итоговый {marker}") == [f"Итоговый {marker}"]
+    assert search(client, headers, instructor_id, f"черновик {marker}") == []
+
+
+def test_search_query_builders():
+    """Операторы и кавычки пользователя не попадают в синтаксис запроса"""
+    terms = search_terms('Python "OR" -basics* ')
+    assert terms == ["python", "or", "basics"]
+    assert tsquery_text(terms) == "python & or & basics:*"
+    assert fts5_query(terms) == '"python" "or" "basics"*'
+    assert CourseSearch.build(" *-! ", "sqlite") is None
+
+
+def test_postgresql_search_uses_tsvector():
+    course_search = CourseSearch.build("python", "postgresql")
+    sql = str(course_search.apply(select(Course.id)).compile(dialect=postgresql.dialect()))
+
+    assert "courses.search_vector @@" in sql
+    assert "to_tsquery('russian'::regconfig, %(search_query)s)" in sql
+    assert "ILIKE" not in sql
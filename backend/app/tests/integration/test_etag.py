@@ -0,0 +1,112 @@
+# app/tests/integration/test_etag.py
+import uuid
+
+
+def create_course(client, headers) -> dict:
+    response = client.post("/api/courses/", headers=headers, json={
+        "title": f"ETag course {uuid.uuid4().hex[:6]}",
+        "description": "Course for conditional requests"
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def create_lesson(client, headers, course_id: int, **fields) -> dict:
+    response = client.post("/api/lessons/", headers=headers, json={
+        "title": f"Lesson {uuid.uuid4().hex[:6]}",
+        "course_id": course_id,
+        "lesson_type": "text",
+        "content": "Lesson content " * 50,
+        **fields
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_course_not_modified(client, register_user):
+    """Повторный запрос курса с If-None-Match получает 304, после изменения - 200"""
+    headers = register_user(role="instructor")["headers"]
+    course = create_course(client, headers)
+
+    for path in (f"/api/courses/{course['id']}", f"/api/courses/slug/{course['slug']}"):
+        first = client.get(path, headers=headers)
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+
+        cached = client.get(path, headers={**headers, "If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        assert cached.content == b""
+
+    response = client.put(f"/api/courses/{course['id']}", headers=headers, json={"price": 10.0})
+    assert response.status_code == 200
+
+    response = client.get(f"/api/courses/{course['id']}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_unpublished_course_not_modified_requires_access(client, register_user):
+    """304 не раскрывает неопубликованный курс постороннему пользователю"""
+    instructor = register_user(role="instructor")["headers"]
+    course = create_course(client, instructor)
+    etag = client.get(f"/api/courses/{course['id']}", headers=instructor).headers["etag"]
+
+    student = register_user()["headers"]
+    response = client.get(f"/api/courses/{course['id']}", headers={**student, "If-None-Match": etag})
+    assert response.status_code == 403
+
+
+def test_lessons_not_modified(client, register_user):
+    """Список уроков и урок отвечают 304; новый урок меняет ETag списка"""
+    headers = register_user(role="instructor")["headers"]
+    course = create_course(client, headers)
+    lesson = create_lesson(client, headers, course["id"])
+
+    path = f"/api/lessons/course/{course['id']}"
+    etag = client.get(path).headers["etag"]
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    create_lesson(client, headers, course["id"])
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+    path = f"/api/lessons/{lesson['id']}"
+    etag = client.get(path, headers=headers).headers["etag"]
+    assert client.get(path, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    # Незаписанный студент не получает 304 для закрытого урока
+    student = register_user()["headers"]
+    assert client.get(path, headers={**student, "If-None-Match": etag}).status_code == 403
+
+
+def test_categories_not_modified(client):
+    """Список категорий отвечает 304 при совпадении ETag"""
+    etag = client.get("/api/categories/").headers["etag"]
+
+    response = client.get("/api/categories/", headers={"If-None-Match": f'"other", {etag}'})
+    assert response.status_code == 304
+
+
+def test_lesson_etag_changes_on_edit_within_second(client, register_user):
+    """Два изменения урока в одну секунду дают разные ETag (updated_at в SQLite - до секунды)"""
+    headers = register_user(role="instructor")["headers"]
+    course = create_course(client, headers)
+    lesson = create_lesson(client, headers, course["id"])
+    path = f"/api/lessons/{lesson['id']}"
+    list_path = f"/api/lessons/course/{course['id']}"
+
+    etag = client.get(path, headers=headers).headers["etag"]
+    list_etag = client.get(list_path).headers["etag"]
+    for title in ("First edit", "Second edit"):
+        assert client.put(path, headers=headers, json={"title": title}).status_code == 200
+
+        response = client.get(path, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["title"] == title
+        etag = response.headers["etag"]
+
+        response = client.get(list_path, headers={"If-None-Match": list_etag})
+        assert response.status_code == 200
+        list_etag = response.headers["etag"]
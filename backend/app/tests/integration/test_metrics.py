@@ -0,0 +1,13 @@
+# app/tests/integration/test_metrics.py
+def test_metrics_endpoint(client):
+    """/metrics отдает счетчики по шаблону маршрута и состояние пулов"""
+    client.get("/api/categories/")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    text = response.text
+    assert 'http_requests_total{method="GET",route="/api/categories/",status="200"}' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/categories/",le="+Inf"}' in text
+    assert 'db_pool_checkouts_total{pool="sync"}' in text
@@ -0,0 +1,223 @@
+# app/tests/integration/test_query_budget.py
+"""
+Число SQL запросов endpoint не должно расти с объемом данных (признак N+1)
+
+Каждый endpoint вызывается на наборе данных размера SMALL и после его
+увеличения до LARGE; число запросов берется из заголовка Server-Timing.
+LARGE меньше размеров страниц по умолчанию, поэтому рост выдачи виден.
+"""
+import re
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.database import SessionLocal
+from app.models import (
+    User, UserRole, Category, Course, CourseStatus, Lesson, Enrollment, Progress,
+    Review, Comment, Quiz, QuizQuestion, QuizAnswer, QuizAttempt
+)
+from app.utils.security import create_access_token
+from app.services.catalog_snapshot import catalog_cache
+from app.services.course_counts import course_counts
+from app.utils.dependencies import principal_cache
+
+SMALL = 2
+LARGE = 6
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+# (роль, путь) - в пути подставляются ID из World
+ENDPOINTS = [
+    ("public", "/api/categories/"),
+    ("public", "/api/categories/{category_id}"),
+    ("student", "/api/courses/"),
+    ("student", "/api/courses/{course_id}"),
+    ("public", "/api/lessons/course/{course_id}/preview"),
+    ("public", "/api/reviews/course/{course_id}"),
+    ("public", "/api/reviews/course/{course_id}/stats"),
+    ("public", "/api/users/{student_id}/courses"),
+    ("public", "/api/users/{instructor_id}/courses"),
+    ("student", "/api/auth/me"),
+    ("student", "/api/comments/lessons/{lesson_id}"),
+    ("student", "/api/comments/my"),
+    ("student", "/api/lessons/{lesson_id}"),
+    ("student", "/api/lessons/course/{course_id}"),
+    ("student", "/api/lessons/course/{course_id}/with-progress"),
+    ("student", "/api/progress/courses/{course_id}"),
+    ("student", "/api/progress/my-courses"),
+    ("student", "/api/progress/statistics"),
+    ("student", "/api/enrollments/my-courses"),
+    ("student", "/api/enrollments/check/{course_id}"),
+    ("student", "/api/users/me/dashboard"),
+    ("student", "/api/quizzes/lessons/{lesson_id}"),
+    ("student", "/api/quizzes/{quiz_id}/start"),
+    ("student", "/api/quizzes/{quiz_id}/attempts"),
+    ("student", "/api/reviews/user/my-reviews"),
+    ("instructor", "/api/courses/my/instructor"),
+    ("instructor", "/api/enrollments/course/{course_id}/students"),
+    ("instructor", "/api/enrollments/course/{course_id}/statistics"),
+    ("instructor", "/api/users/me/dashboard"),
+    ("instructor", "/api/quizzes/{quiz_id}"),
+    ("instructor", "/api/quizzes/{quiz_id}/statistics"),
+    ("instructor", "/api/quizzes/{quiz_id}/all-attempts"),
+    ("admin", "/api/users/me/dashboard"),
+    ("admin", "/api/admin/admin/users"),
+    ("admin", "/api/admin/admin/courses"),
+    ("admin", "/api/admin/admin/statistics"),
+    ("admin", "/api/admin/admin/recent-activity"),
+]
+
+
+def _unique(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:10]}"
+
+
+class World:
+    """
+    Набор данных вокруг одного курса, урока и квиза
+
+    grow() добавляет по одной единице каждой коллекции, которую читают
+    endpoint из ENDPOINTS: уроки с прогрессом, комментарии с ответами,
+    категории, записи студента, студенты курса с отзывами и попытками,
+    вопросы квиза
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.now = datetime.now(timezone.utc)
+        self.size = 0
+
+        self.admin = self._user(UserRole.ADMIN)
+        self.instructor = self._user(UserRole.INSTRUCTOR)
+        self.student = self._user(UserRole.STUDENT)
+        self.category = self._add(Category(name=_unique("category"), slug=_unique("category")))
+        self.course = self._course(self.category)
+        self.lesson = self._lesson(self.course, order=0)
+        self.quiz = self._add(Quiz(title="Budget quiz", lesson_id=self.lesson.id, max_attempts=1000))
+        self._enroll(self.student, self.course)
+
+    def _add(self, item):
+        self.db.add(item)
+        self.db.flush()
+        return item
+
+    def _user(self, role: UserRole) -> User:
+        return self._add(User(
+            email=f"{_unique(role.value)}@example.com",
+            hashed_password="-",
+            first_name="Budget",
+            last_name=role.value.title(),
+            role=role,
+        ))
+
+    def _course(self, category: Category) -> Course:
+        return self._add(Course(
+            title=_unique("course"),
+            slug=_unique("course"),
+            description="Query budget course",
+            status=CourseStatus.PUBLISHED,
+            is_published=True,
+            published_at=self.now.replace(tzinfo=None),
+            category_id=category.id,
+            instructor_id=self.instructor.id,
+        ))
+
+    def _lesson(self, course: Course, order: int) -> Lesson:
+        return self._add(Lesson(title=f"Lesson {order}", course_id=course.id, order=order, is_free_preview=True))
+
+    def _enroll(self, student: User, course: Course):
+        self._add(Enrollment(student_id=student.id, course_id=course.id, last_accessed_at=self.now))
+
+    def grow(self, size: int):
+        while self.size < size:
+            self.size += 1
+
+            # Урок курса с прогрессом студента
+            lesson = self._lesson(self.course, order=self.size)
+            self._add(Progress(student_id=self.student.id, lesson_id=lesson.id, is_completed=True, time_spent=60))
+
+            # Студент курса: запись, отзыв, попытка квиза, комментарий с ответом
+            classmate = self._user(UserRole.STUDENT)
+            self._enroll(classmate, self.course)
+            self._add(Review(student_id=classmate.id, course_id=self.course.id, rating=5))
+            self._add(QuizAttempt(
+                student_id=classmate.id, quiz_id=self.quiz.id, score=1, max_score=1,
+                percentage=100, is_passed=True, answers={}, completed_at=self.now
+            ))
+            root = self._add(Comment(content="Question", user_id=classmate.id, lesson_id=self.lesson.id))
+            self._add(Comment(content="Answer", user_id=self.student.id, lesson_id=self.lesson.id, parent_id=root.id))
+
+            # Категория с курсом, на который записан студент и оставил отзыв
+            category = self._add(Category(name=_unique("category"), slug=_unique("category")))
+            course = self._course(category)
+            self._lesson(course, order=1)
+            self._enroll(self.student, course)
+            self._add(Review(student_id=self.student.id, course_id=course.id, rating=4))
+
+            # Квиз урока и вопрос основного квиза
+            self._add(Quiz(title=f"Quiz {self.size}", lesson_id=self.lesson.id))
+            question = self._add(QuizQuestion(quiz_id=self.quiz.id, question_text="Budget question", order=self.size))
+            for order in range(2):
+                self._add(QuizAnswer(question_id=question.id, answer_text=f"Answer {order}", is_correct=order == 0))
+
+            # Попытка студента
+            self._add(QuizAttempt(
+                student_id=self.student.id, quiz_id=self.quiz.id, score=0, max_score=1,
+                percentage=0, is_passed=False, answers={}, completed_at=self.now
+            ))
+
+        self.db.commit()
+
+    def path(self, template: str) -> str:
+        return template.format(
+            category_id=self.category.id,
+            course_id=self.course.id,
+            lesson_id=self.lesson.id,
+            quiz_id=self.quiz.id,
+            student_id=self.student.id,
+            instructor_id=self.instructor.id,
+        )
+
+    def headers(self, role: str) -> dict:
+        user = getattr(self, role, None)
+        if user is None:
+            return {}
+        return {"Authorization": f"Bearer {create_access_token({'sub': user.id})}"}
+
+
+def count_queries(client, world: World) -> dict:
+    counts = {}
+    for role, template in ENDPOINTS:
+        # Пользователь, количество курсов и каталог всегда читаются из БД, чтобы счет не зависел от кэша
+        principal_cache.clear()
+        course_counts.clear()
+        catalog_cache.clear()
+        response = client.get(world.path(template), headers=world.headers(role))
+        assert response.status_code == 200, (template, response.status_code, response.text)
+        counts[(role, template)] = int(_QUERIES.search(response.headers["server-timing"]).group(1))
+    return counts
+
+
+@pytest.fixture(scope="module")
+def query_counts(client):
+    db = SessionLocal()
+    try:
+        world = World(db)
+        world.grow(SMALL)
+        small = count_queries(client, world)
+        world.grow(LARGE)
+        large = count_queries(client, world)
+    finally:
+        db.close()
+    return small, large
+
+
+@pytest.mark.parametrize("role,template", ENDPOINTS)
+def test_query_count_does_not_grow(query_counts, role, template):
+    """Число запросов одинаково при SMALL и LARGE строк в коллекциях"""
+    small, large = query_counts
+    assert large[(role, template)] == small[(role, template)], (
+        f"{role} {template}: {small[(role, template)]} запросов при {SMALL}, "
+        f"{large[(role, template)]} при {LARGE}"
+    )
@@ -0,0 +1,46 @@
+# app/tests/integration/test_rate_limit.py
+from unittest.mock import patch
+
+import pytest
+
+from app.api import auth
+from app.api.auth import rate_limiter
+from app.config import settings
+
+
+@pytest.fixture
+def rate_limits(monkeypatch):
+    """
+    Включенные лимиты с чистыми корзинами
+
+    conftest выключает лимиты для всех тестов; прежнее значение восстанавливается
+    """
+    enabled = rate_limiter.enabled
+    rate_limiter.enabled = True
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOGIN_PER_EMAIL", "2/m")
+    rate_limiter.backend.clear()
+    try:
+        yield
+    finally:
+        rate_limiter.enabled = enabled
+        rate_limiter.backend.clear()
+
+
+def test_login_throttled_before_password_check(client, register_user, rate_limits):
+    """После лимита попыток вход отвечает 429 с Retry-After, не проверяя пароль"""
+    email = register_user()["user"]["email"]
+    for _ in range(2):
+        response = client.post("/api/auth/login", json={"email": email, "password": "wrong"})
+        assert response.status_code == 401
+
+    async def fail(*args):
+        raise AssertionError("bcrypt не должен вызываться")
+
+    with patch.object(auth, "verify_password_async", fail):
+        response = client.post("/api/auth/login", json={"email": email.upper(), "password": "secret123"})
+    assert response.status_code == 429
+    assert 0 < int(response.headers["retry-after"]) <= 30
+
+    # Лимит по email не мешает другим пользователям с того же адреса
+    other = register_user()["user"]["email"]
+    assert client.post("/api/auth/login", json={"email": other, "password": "secret123"}).status_code == 200
@@ -0,0 +1,96 @@
+# app/tests/integration/test_refresh_tokens.py
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, select
+
+from app.database import SessionLocal, async_engine
+from app.models import RefreshToken
+from app.services.refresh_tokens import delete_expired_refresh_tokens
+
+
+def refresh(client, token: str):
+    return client.post("/api/auth/refresh", json={"refresh_token": token})
+
+
+def login(client, email: str) -> dict:
+    response = client.post("/api/auth/login", json={"email": email, "password": "secret123"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_refresh_rotates_without_writing_users(client, register_user):
+    """Refresh выдает новый токен той же цепочки и не изменяет строку users"""
+    data = register_user()
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = refresh(client, data["refresh_token"])
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    assert response.status_code == 200
+    assert not [statement for statement in statements if statement.startswith("UPDATE users")]
+
+    with SessionLocal() as db:
+        tokens = db.scalars(
+            select(RefreshToken).where(RefreshToken.user_id == data["user"]["id"]).order_by(RefreshToken.id)
+        ).all()
+    assert len(tokens) == 2
+    assert tokens[0].family_id == tokens[1].family_id
+    assert tokens[0].revoked_at is not None and tokens[1].revoked_at is None
+
+    assert refresh(client, response.json()["refresh_token"]).status_code == 200
+
+
+def test_reused_refresh_token_revokes_family(client, register_user):
+    """Повторное предъявление использованного токена отзывает всю цепочку"""
+    data = register_user()
+    rotated = refresh(client, data["refresh_token"]).json()["refresh_token"]
+
+    assert refresh(client, data["refresh_token"]).status_code == 401
+    assert refresh(client, rotated).status_code == 401
+
+
+def test_sessions_on_several_devices(client, register_user):
+    """Каждый вход - отдельная цепочка; выход с токеном завершает только свою сессию"""
+    data = register_user()
+    email = data["user"]["email"]
+    laptop, phone = login(client, email), login(client, email)
+
+    response = client.post("/api/auth/logout", headers=data["headers"], json={"refresh_token": laptop["refresh_token"]})
+    assert response.status_code == 200
+
+    assert refresh(client, laptop["refresh_token"]).status_code == 401
+    assert refresh(client, phone["refresh_token"]).status_code == 200
+    assert refresh(client, data["refresh_token"]).status_code == 200
+
+
+def test_logout_revokes_access_token(client, register_user):
+    """После выхода access токен сразу перестает приниматься"""
+    headers = register_user()["headers"]
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+
+def test_delete_expired_refresh_tokens(client, register_user):
+    """Очистка удаляет только истекшие токены"""
+    user_id = register_user()["user"]["id"]
+    now = datetime.now(timezone.utc)
+
+    with SessionLocal() as db:
+        db.add_all([
+            RefreshToken(jti_hash=f"expired-{user_id}-{index}", user_id=user_id, family_id="expired",
+                         expires_at=now - timedelta(days=1))
+            for index in range(3)
+        ])
+        db.commit()
+
+        assert delete_expired_refresh_tokens(db, batch_size=2) >= 3
+        remaining = db.scalars(select(RefreshToken.family_id).where(RefreshToken.user_id == user_id)).all()
+    assert remaining and "expired" not in remaining
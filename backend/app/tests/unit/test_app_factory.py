@@ -0,0 +1,51 @@
+import subprocess
+import sys
+
+import pytest
+
+from app.config import Settings
+from app.main import create_app, resolve_routers, ROUTERS
+
+
+def route_paths(app) -> set:
+    return {route.path for route in app.routes}
+
+
+def test_all_routers_by_default():
+    """Без настроек подключаются все роутеры"""
+    assert resolve_routers(None) == list(ROUTERS)
+    assert resolve_routers([]) == list(ROUTERS)
+
+
+def test_group_expands_without_duplicates():
+    """Группа раскрывается в роутеры, повторы не добавляются"""
+    assert resolve_routers(["catalog", "courses", "auth"]) == [
+        "courses", "categories", "lessons", "reviews", "auth"
+    ]
+
+
+def test_unknown_router():
+    with pytest.raises(ValueError):
+        resolve_routers(["payments"])
+
+
+def test_catalog_app_mounts_only_catalog():
+    """Worker каталога не содержит маршрутов админки и авторизации"""
+    app = create_app(Settings(DATABASE_URL="sqlite://", SECRET_KEY="x", ENABLED_ROUTERS="catalog"))
+    paths = route_paths(app)
+
+    assert "/api/courses/" in paths
+    assert "/api/categories/" in paths
+    assert "/health" in paths
+    assert not any(path.startswith("/api/admin") for path in paths)
+    assert not any(path.startswith("/api/auth") for path in paths)
+
+
+def test_import_is_lazy():
+    """Импорт app.main не подключает роутеры и не создает engine БД"""
+    code = (
+        "import sys, app.main; "
+        "print(any(name.startswith('app.api') or name == 'app.database' for name in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
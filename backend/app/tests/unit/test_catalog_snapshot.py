@@ -0,0 +1,197 @@
+import asyncio
+import itertools
+import random
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.course import CourseLevel
+from app.services.catalog_snapshot import CatalogCache, CatalogRow, CatalogSnapshot, SORT_ATTRIBUTES
+
+
+def make_row(course_id: int, rng: random.Random) -> CatalogRow:
+    return CatalogRow(
+        id=course_id, title=f"Course {rng.randrange(20)}", short_description=None, thumbnail_url=None,
+        level=rng.choice(list(CourseLevel)), price=rng.choice((0.0, 10.0, 20.0, 50.0)), discount_price=None,
+        average_rating=rng.choice((0.0, 3.5, 4.0, 5.0)), total_students=rng.randrange(5), total_lessons=1,
+        duration_hours=1.0, created_at=datetime(2026, 1, 1) + timedelta(hours=rng.randrange(10)),
+        instructor_first_name="Test", instructor_last_name="User", category_name=None,
+        category_id=rng.choice((None, 1, 2)), instructor_id=rng.choice((1, 2, 3))
+    )
+
+
+def reference(rows, sort_key, descending, category_id=None, level=None, is_free=None, min_price=None,
+              max_price=None, min_rating=None, after=None):
+    """Та же выборка обычной фильтрацией и сортировкой"""
+    attribute = SORT_ATTRIBUTES[sort_key]
+    result = [
+        row for row in rows
+        if (not category_id or row.category_id == category_id)
+        and (not level or row.level == level)
+        and (is_free is None or (row.price == 0) == is_free)
+        and (min_price is None or row.price >= min_price)
+        and (max_price is None or row.price <= max_price)
+        and (min_rating is None or row.average_rating >= min_rating)
+    ]
+    total = len(result)
+    result.sort(key=lambda row: (getattr(row, attribute), row.id), reverse=descending)
+    if after is not None:
+        result = [row for row in result
+                  if ((getattr(row, attribute), row.id) < after if descending else (getattr(row, attribute), row.id) > after)]
+    return [row.id for row in result], total
+
+
+@pytest.fixture
+def rows():
+    rng = random.Random(1)
+    return [make_row(course_id, rng) for course_id in range(1, 201)]
+
+
+@pytest.mark.parametrize("sort_key,descending", itertools.product(SORT_ATTRIBUTES, (True, False)))
+def test_query_matches_reference(rows, sort_key, descending):
+    snapshot = CatalogSnapshot.build(rows)
+    for filters in ({}, {"category_id": 1}, {"level": CourseLevel.ADVANCED, "is_free": False},
+                    {"min_price": 10.0, "max_price": 20.0}, {"min_rating": 4.0, "category_id": 2},
+                    {"is_free": True, "min_rating": 3.5}):
+        ids, total = reference(rows, sort_key, descending, **filters)
+        page, snapshot_total = snapshot.query(sort_key, descending, 7, offset=5, **filters)
+
+        assert snapshot_total == total
+        assert [row.id for row in page] == ids[5:12]
+
+
+def test_cursor_continues_after_key(rows):
+    snapshot = CatalogSnapshot.build(rows)
+    ids, _ = reference(rows, "price", True)
+    first, _ = snapshot.query("price", True, 10)
+    last = first[-1]
+
+    page, _ = snapshot.query("price", True, 10, after=(last.price, last.id))
+    assert [row.id for row in first + page] == ids[:20]
+
+
+def test_replace_updates_indexes(rows):
+    snapshot = CatalogSnapshot.build(rows)
+    changed = rows[0]._replace(price=999.0, category_id=2)
+    added = make_row(500, random.Random(2))._replace(price=0.0)
+
+    updated = snapshot.replace([rows[1].id], [changed, added])
+    current = [changed, added] + rows[2:]
+
+    assert len(updated) == len(rows)
+    for sort_key, filters in (("price", {}), ("created_at", {"category_id": 2}), ("title", {"is_free": True})):
+        ids, total = reference(current, sort_key, True, **filters)
+        page, snapshot_total = updated.query(sort_key, True, 500, **filters)
+        assert ([row.id for row in page], snapshot_total) == (ids, total)
+
+    # Старый снимок не меняется
+    assert snapshot.query("price", True, 1)[0][0].id != changed.id
+
+
+def test_nulls_follow_sql_semantics(rows):
+    """NULL не проходит фильтры цены и рейтинга; ключ с NULL снимком не сортируется"""
+    rows = [rows[0]._replace(price=None, average_rating=None)] + rows[1:]
+    snapshot = CatalogSnapshot.build(rows)
+
+    for filters in ({"min_rating": 0.0}, {"max_price": 100.0}, {"is_free": False}, {"is_free": True}):
+        page, total = snapshot.query("created_at", True, 500, **filters)
+        assert rows[0].id not in [row.id for row in page]
+        assert total == len(page)
+
+    assert not snapshot.supports("price") and not snapshot.supports("rating")
+    assert snapshot.supports("created_at")
+    assert snapshot.replace([rows[0].id], []).supports("price")
+    assert not CatalogSnapshot.build(rows, binary_collation=False).supports("title")
+
+
+class FakeSession:
+    """Сессия основной БД: результат запроса или ошибка, calls - количество запросов"""
+
+    bind = SimpleNamespace(dialect=SimpleNamespace(name="sqlite"))
+
+    def __init__(self, rows, error=None, calls=None, delay=0):
+        self.rows, self.error, self.calls, self.delay = rows, error, calls, delay
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, query):
+        if self.calls is not None:
+            self.calls.append(query)
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        # Row SQLAlchemy - кортеж в порядке столбцов запроса, как CatalogRow
+        return SimpleNamespace(all=lambda: list(self.rows))
+
+
+class RowsQuery:
+    def where(self, *conditions):
+        return self
+
+
+def test_pending_kept_until_reload_succeeds(rows):
+    """Ошибка загрузки не теряет отложенные ID: курс перечитывается следующим запросом"""
+    changed = rows[0]._replace(price=999.0)
+    cache = CatalogCache(ttl=60, session_factory=lambda: FakeSession([], error=RuntimeError("primary down")))
+    cache.snapshot = CatalogSnapshot.build(rows)
+    cache.invalidate(changed.id)
+
+    assert asyncio.run(cache.get(RowsQuery)) is None
+    assert changed.id in cache._pending
+
+    cache.session_factory = lambda: FakeSession([changed])
+    snapshot = asyncio.run(cache.get(RowsQuery))
+    assert snapshot.query("price", True, 1)[0][0] == changed
+    assert not cache._pending
+
+
+def test_concurrent_gets_share_single_load(rows):
+    """Одновременные запросы без снимка дожидаются одной загрузки"""
+    calls = []
+    cache = CatalogCache(ttl=60, session_factory=lambda: FakeSession(rows, calls=calls, delay=0.01))
+
+    async def main():
+        return await asyncio.gather(*(cache.get(RowsQuery) for _ in range(10)))
+
+    snapshots = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+    assert len(snapshots[0]) == len(rows)
+
+
+def test_expired_snapshot_served_during_single_reload(rows):
+    """После ttl запросы получают прежний снимок, пересборка запускается один раз"""
+    calls = []
+    cache = CatalogCache(ttl=60, session_factory=lambda: FakeSession(rows, calls=calls, delay=0.01))
+    stale = cache.snapshot = CatalogSnapshot.build(rows[:-1])
+    stale.built_at -= 120
+
+    async def main():
+        served = await asyncio.gather(*(cache.get(RowsQuery) for _ in range(10)))
+        await cache._task
+        return served
+
+    served = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(snapshot is stale for snapshot in served)
+    assert len(cache.snapshot) == len(rows)
+    assert cache._task is None
+
+
+def test_own_invalidation_waits_for_reload(rows):
+    """Изменение этого worker'а не отдается из прежнего снимка во время пересборки"""
+    changed = rows[0]._replace(price=999.0)
+    calls = []
+    cache = CatalogCache(ttl=60, session_factory=lambda: FakeSession([changed] + rows[1:], calls=calls, delay=0.01))
+    cache.snapshot = CatalogSnapshot.build(rows)
+    cache.snapshot.built_at -= 120
+    cache.invalidate(changed.id)
+
+    snapshot = asyncio.run(cache.get(RowsQuery))
+    assert len(calls) == 1
+    assert snapshot.query("price", True, 1)[0][0] == changed
@@ -0,0 +1,82 @@
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.utils.compression import CompressionMiddleware, choose_encoding, brotli
+from app.utils.metrics import HTTP_RESPONSE_BYTES
+
+PAYLOAD = {"items": [{"id": index, "description": "Описание курса " * 5} for index in range(50)]}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, min_size=500, excluded_types=["image/"])
+
+    @app.get("/large")
+    def large():
+        return PAYLOAD
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/image")
+    def image():
+        return Response(content=b"\x89PNG" + b"0" * 2000, media_type="image/png")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((b"line of text\n" * 100 for _ in range(5)), media_type="text/plain")
+
+    return TestClient(app)
+
+
+def test_choose_encoding():
+    """Выбор кодировки учитывает q и доступность brotli"""
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("gzip, deflate, br", brotli_available=False) == "gzip"
+    assert choose_encoding("br;q=0.5, gzip") == "gzip"
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("*") == "br"
+    assert choose_encoding("deflate") is None
+
+
+def test_large_response_gzipped(client):
+    """Большой ответ сжимается, Content-Length пересчитан, метрики учтены"""
+    before = HTTP_RESPONSE_BYTES.value(route="/large", encoding="gzip", stage="original")
+
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == PAYLOAD
+    assert HTTP_RESPONSE_BYTES.value(route="/large", encoding="gzip", stage="original") - before == len(
+        response.content
+    )
+
+
+def test_not_compressed(client):
+    """Маленькие ответы, исключенные типы и запросы без Accept-Encoding не сжимаются"""
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/image", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_streaming_response_gzipped(client):
+    """Потоковый ответ сжимается по частям"""
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == "line of text\n" * 500
+
+
+@pytest.mark.skipif(brotli is None, reason="пакет brotli не установлен")
+def test_brotli(client):
+    """При наличии brotli он предпочтительнее gzip"""
+    response = client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["content-encoding"] == "br"
+    assert response.json() == PAYLOAD
@@ -1,3 +1,5 @@
+import time
+
 import pytest
 from unittest.mock import MagicMock, patch
 from fastapi import HTTPException, status
@@ -8,16 +10,33 @@ from app.utils.dependencies import (
     require_role,
     require_instructor,
     require_admin,
+    principal_cache,
+    get_token_user,
+    revoked_tokens,
 )
+from app.utils.principal import Principal, PrincipalCache
+from app.utils.revocation import BloomFilter, RevocationList
 from app.models.user import User, UserRole
 
 
+@pytest.fixture(autouse=True)
+def clear_principal_cache():
+    principal_cache.clear()
+    revoked_tokens.clear()
+    yield
+    principal_cache.clear()
+    revoked_tokens.clear()
+
+
 @pytest.fixture
 def fake_user():
     user = MagicMock(spec=User)
     user.id = 1
     user.is_active = True
     user.role = UserRole.STUDENT
+    user.first_name = "Test"
+    user.last_name = "User"
+    user.avatar_url = None
     return user
 
 
@@ -40,10 +59,23 @@ def fake_credentials():
 @patch("app.utils.dependencies.decode_token", return_value={"sub": 1})
 def test_get_current_user_valid(mock_decode, fake_db, fake_credentials, fake_user):
     user = get_current_user(fake_credentials, fake_db)
-    assert user == fake_user
+    assert isinstance(user, Principal)
+    assert (user.id, user.role, user.full_name) == (1, UserRole.STUDENT, "Test User")
     mock_decode.assert_called_once()
 
 
+@patch("app.utils.dependencies.decode_token", return_value={"sub": 1})
+def test_get_current_user_cached(mock_decode, fake_db, fake_credentials):
+    """Повторный запрос берет пользователя из кэша, invalidate возвращает чтение из БД"""
+    get_current_user(fake_credentials, fake_db)
+    get_current_user(fake_credentials, fake_db)
+    assert fake_db.query.call_count == 1
+
+    principal_cache.invalidate(1)
+    get_current_user(fake_credentials, fake_db)
+    assert fake_db.query.call_count == 2
+
+
 @patch("app.utils.dependencies.decode_token", return_value=None)
 def test_get_current_user_invalid_token(mock_decode, fake_db, fake_credentials):
     with pytest.raises(HTTPException) as exc:
@@ -136,3 +168,135 @@ def test_require_admin_forbidden(fake_user):
     with pytest.raises(HTTPException) as exc:
         require_admin(fake_user)
     assert exc.value.status_code == status.HTTP_403_FORBIDDEN
+
+
+# ---- PrincipalCache ----
+def make_principal(user_id: int) -> Principal:
+    return Principal(user_id, UserRole.STUDENT, True, "Test", "User")
+
+
+def test_principal_cache_expires():
+    cache = PrincipalCache(ttl=30)
+    cache.put(make_principal(1))
+    assert cache.get(1).id == 1
+
+    with patch("app.utils.principal.time.monotonic", return_value=10 ** 9):
+        assert cache.get(1) is None
+    assert len(cache) == 0
+
+
+def test_principal_cache_bounded():
+    """При переполнении вытесняется давно использованная запись"""
+    cache = PrincipalCache(ttl=30, max_size=2)
+    cache.put(make_principal(1))
+    cache.put(make_principal(2))
+    cache.get(1)
+    cache.put(make_principal(3))
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None and cache.get(3) is not None
+
+
+def test_principal_cache_disabled():
+    cache = PrincipalCache(ttl=0)
+    cache.put(make_principal(1))
+    assert cache.get(1) is None
+
+
+# ---- get_token_user ----
+def access_claims(age: float = 0, role: str = "admin") -> dict:
+    return {"sub": "1", "role": role, "type": "access", "iat": int(time.time() - age)}
+
+
+def test_get_token_user_from_claims(fake_db, fake_credentials):
+    """Свежий токен: роль из claims, БД не используется"""
+    with patch("app.utils.dependencies.decode_token", return_value=access_claims()):
+        user = get_token_user(fake_credentials, fake_db)
+
+    assert (user.id, user.role) == (1, UserRole.ADMIN)
+    fake_db.query.assert_not_called()
+
+
+@pytest.mark.parametrize("claims", [
+    access_claims(age=3600),
+    {**access_claims(), "type": "refresh"},
+    {**access_claims(), "role": "superuser"},
+])
+def test_get_token_user_falls_back_to_db(fake_db, fake_credentials, claims):
+    """Старый, не access или с неизвестной ролью токен проверяется по БД"""
+    with patch("app.utils.dependencies.decode_token", return_value=claims):
+        user = get_token_user(fake_credentials, fake_db)
+
+    assert user.role == UserRole.STUDENT
+    fake_db.query.assert_called_once()
+
+
+def test_get_token_user_revoked(fake_db, fake_credentials):
+    """Токены, выданные до отзыва, не принимаются ни по claims, ни по БД"""
+    claims = access_claims(age=5)
+    revoked_tokens.revoke_user(1)
+
+    with patch("app.utils.dependencies.decode_token", return_value=claims):
+        with pytest.raises(HTTPException) as exc:
+            get_token_user(fake_credentials, fake_db)
+
+    assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+    fake_db.query.assert_not_called()
+
+
+def test_get_current_user_token_issued_after_revocation(fake_db, fake_credentials):
+    """Токен, выданный после отзыва (повторный вход), принимается"""
+    revoked_tokens.revoke_user(1, at=time.time() - 10)
+
+    with patch("app.utils.dependencies.decode_token", return_value=access_claims(age=5)):
+        assert get_current_user(fake_credentials, fake_db).id == 1
+
+
+def test_revocation_list_window():
+    revocations = RevocationList(window=60)
+    revocations.revoke_user(1, at=1000.0)
+
+    assert revocations.is_revoked(1, 999)
+    assert revocations.is_revoked(1, 1000)
+    assert not revocations.is_revoked(1, 1001)
+    assert not revocations.is_revoked(2, 999)
+
+
+def test_revocation_list_keeps_latest_and_prunes():
+    revocations = RevocationList(window=60)
+    revocations.revoke_many([(1, time.time()), (1, 1000.0), (2, time.time() - 120)])
+
+    assert revocations.is_revoked(1, time.time() - 1)
+    revocations.prune()
+    assert len(revocations) == 1
+    assert not revocations.is_revoked(2, 0)
+
+
+def test_revocation_visible_while_pruning():
+    """Пока prune пересобирает фильтр, is_revoked отвечает по прежней паре словарь/фильтр"""
+    revocations = RevocationList(window=60)
+    revoked_at = time.time()
+    revocations.revoke_many([(user_id, revoked_at) for user_id in range(1, 4)])
+    seen = []
+    add = BloomFilter.add
+
+    def add_and_check(bloom, key):
+        # Проверка из другого потока в середине пересборки
+        seen.append(revocations.is_revoked(3, revoked_at - 1))
+        add(bloom, key)
+
+    with patch.object(BloomFilter, "add", add_and_check):
+        revocations.prune()
+
+    assert seen and all(seen)
+    assert revocations.is_revoked(3, revoked_at - 1)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for key in range(0, 2000, 2):
+        bloom.add(key)
+
+    assert all(key in bloom for key in range(0, 2000, 2))
+    false_positives = sum(key in bloom for key in range(1, 20000, 2))
+    assert false_positives < 10000 * 0.05
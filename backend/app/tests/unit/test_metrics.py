@@ -0,0 +1,55 @@
+import pytest
+
+from app.utils.metrics import Registry, Counter, Gauge
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_counter_render(registry):
+    counter = registry.counter("events_total", "События", ["kind"])
+    counter.inc(kind="a")
+    counter.inc(2, kind="a")
+    counter.inc(kind='say "hi"')
+
+    text = registry.render()
+    assert "# TYPE events_total counter" in text
+    assert 'events_total{kind="a"} 3' in text
+    assert 'events_total{kind="say \\"hi\\""} 1' in text
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = registry.histogram("latency_seconds", "Задержка", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, route="/x")
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/x",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/x",le="1"} 3' in text
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/x"} 4' in text
+    assert 'latency_seconds_sum{route="/x"} 4.25' in text
+
+
+def test_labels_are_validated(registry):
+    counter = registry.counter("checked_total", "Проверка", ["kind"])
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+
+
+def test_collector_runs_on_render(registry):
+    def collect():
+        gauge = Gauge("live_value", "Значение при экспорте")
+        gauge.set(42)
+        return [gauge]
+
+    registry.add_collector(collect)
+    assert "live_value 42" in registry.render()
+
+
+def test_duplicate_metric(registry):
+    registry.register(Counter("dup_total", "Дубликат"))
+    with pytest.raises(ValueError):
+        registry.counter("dup_total", "Дубликат")
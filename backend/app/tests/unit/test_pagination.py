@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models import Course
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_condition
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 17, 12, 30, tzinfo=timezone.utc)
+    token = encode_cursor("created_at:desc", created_at.isoformat(), 42)
+
+    assert decode_cursor(token, "created_at:desc", Course.created_at) == (created_at, 42)
+    assert "=" not in token
+
+
+@pytest.mark.parametrize("token", ["", "!!!", encode_cursor("price:asc", 1.0, 1), encode_cursor("created_at:desc", None, 1)])
+def test_invalid_cursor(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, "created_at:desc", Course.created_at)
+
+
+def test_keyset_condition_compares_tuples():
+    condition = keyset_condition(Course.price, Course.id, 10.0, 7, descending=False, dialect="postgresql")
+    sql = str(condition.compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("(courses.price, courses.id) >")
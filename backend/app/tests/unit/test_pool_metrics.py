@@ -0,0 +1,47 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.pool import NullPool
+
+from app.utils.pool_metrics import InstrumentedQueuePool, pool_status
+
+
+@pytest.fixture
+def pool():
+    return InstrumentedQueuePool(
+        lambda: sqlite3.connect(":memory:"),
+        pool_size=1,
+        max_overflow=0,
+        timeout=0.05
+    )
+
+
+def test_checkout_is_counted(pool):
+    """Каждый checkout учитывается в метриках и в checked_out"""
+    connection = pool.connect()
+    status = pool_status(pool)
+    assert status["checked_out"] == 1
+    assert status["checkouts"] == 1
+    assert status["checkout_timeouts"] == 0
+
+    connection.close()
+    assert pool_status(pool)["checked_out"] == 0
+
+
+def test_checkout_timeout_is_counted(pool):
+    """Таймаут ожидания соединения учитывается отдельно"""
+    connection = pool.connect()
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+
+    status = pool_status(pool)
+    assert status["checkout_timeouts"] == 1
+    assert status["wait_max_ms"] >= 50
+    connection.close()
+
+
+def test_status_for_pool_without_queue():
+    """Для NullPool возвращается только класс пула"""
+    pool = NullPool(lambda: sqlite3.connect(":memory:"))
+    assert pool_status(pool) == {"pool_class": "NullPool"}
@@ -0,0 +1,68 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.utils.query_stats import QueryStatsMiddleware, track_queries, statement_shape
+from app.utils.request_context import RequestContextMiddleware
+
+
+@pytest.fixture
+def client():
+    engine = create_engine("sqlite://")
+    track_queries(engine)
+
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, query_budget=3)
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/items/{count}")
+    def items(count: int):
+        with engine.connect() as connection:
+            for value in range(count):
+                connection.execute(text("SELECT :value"), {"value": value})
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_statement_shape():
+    assert statement_shape("SELECT *\n    FROM users\n  WHERE id = ?") == "SELECT * FROM users WHERE id = ?"
+
+
+def test_server_timing_counts_queries(client):
+    """Заголовок Server-Timing содержит число запросов этого HTTP запроса"""
+    response = client.get("/items/2")
+    assert 'desc="2 queries"' in response.headers["server-timing"]
+
+    response = client.get("/items/0")
+    assert 'desc="0 queries"' in response.headers["server-timing"]
+
+
+def test_budget_warning(client, caplog):
+    """При превышении бюджета в лог пишется маршрут и повторяющийся запрос"""
+    with caplog.at_level(logging.WARNING, logger="app.utils.query_stats"):
+        client.get("/items/3")
+        assert not caplog.records
+
+        client.get("/items/5")
+
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert "/items/{count}" in message
+    assert "повторяется 5 раз: SELECT ?" in message
+
+
+def test_failed_statement_leaves_no_state_on_connection():
+    """Запрос с ошибкой не оставляет время начала на соединении пула"""
+    engine = create_engine("sqlite://")
+    track_queries(engine)
+
+    with engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(Exception):
+                connection.execute(text("SELECT * FROM missing_table"))
+        connection.execute(text("SELECT 1"))
+        assert "query_start" not in connection.info
@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils.rate_limit import MemoryRateLimitBackend, RateLimitBackend, RateLimiter, parse_rate
+
+
+def test_parse_rate():
+    assert parse_rate("5/m") == (5, 60.0)
+    assert parse_rate("10/30") == (10, 30.0)
+    assert parse_rate("3") == (3, 1.0)
+    with pytest.raises(ValueError):
+        parse_rate("0/m")
+
+
+def test_token_bucket_refills():
+    """Корзина пропускает capacity запросов и пополняется со скоростью capacity/период"""
+    backend = MemoryRateLimitBackend()
+    with patch("app.utils.rate_limit.time.monotonic", return_value=100.0):
+        assert [backend.take("ip", 2, 1 / 30) for _ in range(2)] == [0.0, 0.0]
+        assert backend.take("ip", 2, 1 / 30) == pytest.approx(30.0)
+
+    with patch("app.utils.rate_limit.time.monotonic", return_value=130.0):
+        assert backend.take("ip", 2, 1 / 30) == 0.0
+        assert backend.take("ip", 2, 1 / 30) > 0
+
+
+def test_backend_bounded():
+    backend = MemoryRateLimitBackend(max_keys=2)
+    for key in ("a", "b", "c"):
+        backend.take(key, 1, 1.0)
+    assert len(backend) == 2
+
+
+def test_limiter_raises_429():
+    limiter = RateLimiter(MemoryRateLimitBackend())
+    limiter.enforce(("login_email", "1/m", "user@example.com"), ("login_ip", "5/m", None))
+
+    with pytest.raises(HTTPException) as exc:
+        limiter.enforce(("login_email", "1/m", "user@example.com"))
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "60"
+
+    limiter.enabled = False
+    limiter.enforce(("login_email", "1/m", "user@example.com"))
+
+
+def test_backend_requires_all_methods():
+    """Backend без clear не создается - ошибка при старте, а не на первом входе"""
+    class PartialBackend(RateLimitBackend):
+        def take(self, key, capacity, refill_rate, cost=1.0):
+            return 0.0
+
+    with pytest.raises(TypeError):
+        PartialBackend()
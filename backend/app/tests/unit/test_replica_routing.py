@@ -0,0 +1,92 @@
+import pytest
+from fastapi import FastAPI, Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, Column, Integer, String
+from sqlalchemy.orm import declarative_base, sessionmaker, Session
+
+from app import database
+from app.utils.request_context import (
+    RequestContextMiddleware,
+    RecentWrites,
+    PRIMARY_COOKIE,
+)
+from app.utils.security import create_access_token
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+    source = Column(String)
+
+
+@pytest.fixture
+def two_databases(tmp_path, monkeypatch):
+    """Основная БД и реплика - два файла SQLite с разным содержимым"""
+    factories = {}
+    for name in ("primary", "replica"):
+        engine = create_engine(f"sqlite:///{tmp_path / name}.db")
+        Base.metadata.create_all(bind=engine)
+        factories[name] = sessionmaker(bind=engine)
+        with factories[name]() as db:
+            db.add(Item(source=name))
+            db.commit()
+
+    monkeypatch.setattr(database, "SessionLocal", factories["primary"])
+    monkeypatch.setattr(database, "ReplicaSessionLocal", factories["replica"])
+    monkeypatch.setattr(database, "recent_writes", RecentWrites(window=5))
+
+
+@pytest.fixture
+def client(two_databases):
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware, window=5)
+
+    @app.get("/source")
+    def read_source(db: Session = Depends(database.get_read_db)):
+        return {"source": db.query(Item.source).order_by(Item.id).first()[0]}
+
+    @app.post("/items")
+    def write_item(db: Session = Depends(database.get_db)):
+        db.add(Item(source="primary"))
+        db.commit()
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def test_reads_go_to_replica(client):
+    """Без недавних записей чтение идет на реплику"""
+    assert client.get("/source").json()["source"] == "replica"
+
+
+def test_read_your_writes_by_user(client):
+    """После записи пользователь читает с основной БД, другие - с реплики"""
+    client.cookies.clear()
+    response = client.post("/items", headers=auth(1))
+    assert PRIMARY_COOKIE in response.headers.get("set-cookie", "")
+    client.cookies.clear()
+
+    assert client.get("/source", headers=auth(1)).json()["source"] == "primary"
+    assert client.get("/source", headers=auth(2)).json()["source"] == "replica"
+
+
+def test_read_your_writes_by_cookie(client):
+    """Cookie после записи направляет чтение на основную БД даже без токена"""
+    client.post("/items")
+    assert client.get("/source").json()["source"] == "primary"
+
+    client.cookies.clear()
+    assert client.get("/source").json()["source"] == "replica"
+
+
+def test_without_replica_uses_primary(two_databases, monkeypatch):
+    """Если реплика не настроена, чтение идет на основную БД"""
+    monkeypatch.setattr(database, "ReplicaSessionLocal", database.SessionLocal)
+    assert database.use_replica() is False
@@ -1,8 +1,13 @@
+import asyncio
 from datetime import timedelta
 from jose import jwt
 from app.utils.security import (
     get_password_hash,
+    get_password_hash_async,
+    password_hash_rounds,
+    password_needs_rehash,
     verify_password,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     decode_token
@@ -23,6 +28,27 @@ def test_password_hash_and_verify():
     assert not verify_password("wrongpassword", hashed)
 
 
+def test_password_hash_rounds(monkeypatch):
+    """Cost factor берется из настроек, хеш с другим cost требует пересчета"""
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    hashed = get_password_hash("secret123")
+
+    assert password_hash_rounds(hashed) == 5
+    assert not password_needs_rehash(hashed)
+    assert password_needs_rehash(get_password_hash("secret123", rounds=4))
+    assert password_hash_rounds("plain") is None
+
+
+def test_password_hash_async():
+    """Хеширование и проверка в пуле bcrypt"""
+
+    async def run():
+        hashed = await get_password_hash_async("secret123")
+        return await verify_password_async("secret123", hashed), await verify_password_async("wrong", hashed)
+
+    assert asyncio.run(run()) == (True, False)
+
+
 def test_create_access_token():
     """Создание и валидация access token"""
     data = {"user_id": 42}
@@ -0,0 +1,36 @@
+import json
+from datetime import datetime, timezone
+
+from fastapi.responses import JSONResponse
+
+from app.models import Comment, User, UserRole
+from app.schemas.comment import CommentResponse
+from app.utils.serialization import FastJSONResponse, fields_of, project
+from app.api.comments import comment_row
+
+
+def test_project_keeps_schema_fields_only():
+    """Проекция берет поля схемы и вычисляемые значения, без _sa_instance_state"""
+    user = User(id=3, first_name="Anna", last_name="Ivanova", avatar_url=None, role=UserRole.STUDENT)
+
+    row = project(user, ("id", "first_name", "role"), role="student", full_name="Anna Ivanova")
+
+    assert row == {"id": 3, "first_name": "Anna", "role": "student", "full_name": "Anna Ivanova"}
+    assert list(row)[:3] == ["id", "first_name", "role"]
+
+
+def test_fast_response_matches_pydantic_serialization():
+    """Тело FastJSONResponse совпадает с сериализацией через response_model"""
+    now = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    user = User(id=1, first_name="Анна", last_name="Иванова", avatar_url=None, role=UserRole.STUDENT)
+    comment = Comment(
+        id=7, content="Вопрос", user_id=1, lesson_id=2, parent_id=None,
+        is_edited=False, is_deleted=False, created_at=now, updated_at=now, user=user
+    )
+
+    row = comment_row(comment, replies_count=2)
+    expected = JSONResponse(CommentResponse(**row).model_dump(mode="json")).body
+
+    assert set(row) == set(fields_of(CommentResponse))
+    assert FastJSONResponse(row).body == expected
+    assert json.loads(FastJSONResponse(row).body)["created_at"].endswith("Z")
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from sqlalchemy import create_engine, event, text
+
+from app.utils.slow_queries import SlowQueryLog, track_slow_queries, parameter_types
+
+
+def test_parameter_types_hide_values():
+    assert parameter_types({"email": "a@b.c", "id": 1}) == {"email": "str", "id": "int"}
+    assert parameter_types((1, 2.5)) == ["int", "float"]
+
+
+def test_slow_statements_are_grouped():
+    """Медленные запросы группируются по форме, быстрые не записываются"""
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def register_sleep(dbapi_connection, connection_record):
+        dbapi_connection.create_function("sleep_ms", 1, lambda ms: time.sleep(ms / 1000) or ms)
+
+    log = SlowQueryLog(threshold_ms=20)
+    track_slow_queries(engine, log)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        for ms in (30, 40):
+            connection.execute(text("SELECT sleep_ms(:ms)"), {"ms": ms})
+
+    top = log.top()
+    assert len(top) == 1
+    assert top[0]["statement"] == "SELECT sleep_ms(?)"
+    assert top[0]["count"] == 2
+    assert top[0]["max_ms"] >= 40
+    assert top[0]["parameter_types"] == ["int"]
+    assert top[0]["plan"] is None  # EXPLAIN только для PostgreSQL
+
+
+def test_log_size_keeps_slowest():
+    """При переполнении вытесняется самая быстрая форма"""
+    log = SlowQueryLog(threshold_ms=0, size=2)
+    log.record("A", 0.3)
+    log.record("B", 0.1)
+    log.record("C", 0.2)
+    log.record("D", 0.05)
+
+    assert [entry["statement"] for entry in log.top()] == ["A", "C"]
+
+
+def test_plan_is_requested_once_and_stored():
+    """План снимается один раз на форму и попадает в журнал через set_plan"""
+    log = SlowQueryLog(threshold_ms=0)
+    assert log.record("A", 0.1) is True
+    assert log.record("A", 0.2) is False
+
+    log.set_plan("A", "Seq Scan on a")
+    log.set_plan("B", "Seq Scan on b")  # формы нет в журнале - план не сохраняется
+    assert [(entry["statement"], entry["plan"]) for entry in log.top()] == [("A", "Seq Scan on a")]
+
+
+def test_failed_statement_leaves_no_state_on_connection():
+    """Запрос с ошибкой не оставляет время начала на соединении пула"""
+    engine = create_engine("sqlite://")
+    track_slow_queries(engine, SlowQueryLog(threshold_ms=0))
+
+    with engine.connect() as connection:
+        with pytest.raises(Exception):
+            connection.execute(text("SELECT * FROM missing_table"))
+        connection.execute(text("SELECT 1"))
+        assert "slow_query_start" not in connection.info
@@ -0,0 +1,205 @@
+import zlib
+from typing import Iterable, Optional
+
+from app.utils.metrics import HTTP_COMPRESSION_RATIO, HTTP_RESPONSE_BYTES
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость, без нее только gzip
+    brotli = None
+
+# Статусы без тела ответа
+_NO_BODY_STATUSES = {204, 304}
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Кодировки из Accept-Encoding с весами q: {"gzip": 1.0, "br": 0.5}"""
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[name] = quality
+    return encodings
+
+
+def choose_encoding(header: str, brotli_available: bool = True) -> Optional[str]:
+    """Лучшая поддерживаемая кодировка (br, затем gzip) или None"""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    candidates = ("br", "gzip") if brotli_available else ("gzip",)
+
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _add_vary(headers: list) -> list:
+    """Добавляет Accept-Encoding в Vary (кэши должны различать сжатые ответы)"""
+    for index, (name, value) in enumerate(headers):
+        if name == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers[index] = (name, value + b", Accept-Encoding")
+            return headers
+    headers.append((b"vary", b"Accept-Encoding"))
+    return headers
+
+
+class _Compressor:
+    """Потоковый компрессор gzip или brotli"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits 16 + MAX_WBITS - формат gzip (заголовок и CRC)
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def flush(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware: сжатие ответов gzip/brotli по Accept-Encoding
+
+    - Ответы меньше min_size, без тела, с Content-Encoding и с Content-Type
+      из excluded_types (префиксы) отдаются как есть
+    - Обычный ответ (одно сообщение тела) сжимается целиком, Content-Length
+      пересчитывается; потоковый - сжимается по частям без Content-Length
+    - Размеры до и после сжатия и степень сжатия учитываются в метриках
+      по шаблону маршрута
+    """
+
+    def __init__(self, app, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4,
+                 excluded_types: Iterable[str] = ()):
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.excluded_types = tuple(value.lower() for value in excluded_types)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+
+        encoding = choose_encoding(accept, brotli is not None) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressedResponse(self, scope, encoding, send).run(receive)
+
+
+class _CompressedResponse:
+    """Состояние одного ответа: решение о сжатии принимается по заголовкам и первой части тела"""
+
+    def __init__(self, middleware: CompressionMiddleware, scope, encoding: str, send):
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self.send = send
+        self.start = None
+        self.compressor = None
+        self.passthrough = False
+        self.original_size = 0
+        self.compressed_size = 0
+
+    async def run(self, receive):
+        await self.middleware.app(self.scope, receive, self.send_wrapper)
+
+    def compressible(self, headers: list) -> bool:
+        if self.start["status"] in _NO_BODY_STATUSES or self.start["status"] < 200:
+            return False
+        for name, value in headers:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.decode("latin-1").lower()
+                if content_type.startswith(self.middleware.excluded_types):
+                    return False
+        return True
+
+    async def send_wrapper(self, message):
+        if message["type"] == "http.response.start":
+            # Заголовки отправляются вместе с первой частью тела
+            self.start = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            headers = list(self.start.get("headers", []))
+            too_small = not more_body and len(body) < self.middleware.min_size
+            if too_small or not self.compressible(headers):
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            headers = [
+                (name, value) for name, value in headers
+                if name not in (b"content-length", b"content-encoding")
+            ]
+            headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+            headers = _add_vary(headers)
+
+            if not more_body:
+                # Тело целиком: сжимаем сразу и выставляем точный Content-Length
+                compressed = self.compressor.compress(body) + self.compressor.flush()
+                headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+                await self.send({**self.start, "headers": headers})
+                await self.send({"type": "http.response.body", "body": compressed})
+                self.record(len(body), len(compressed))
+                return
+
+            await self.send({**self.start, "headers": headers})
+
+        self.original_size += len(body)
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.flush()
+        self.compressed_size += len(chunk)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+        if not more_body:
+            self.record(self.original_size, self.compressed_size)
+
+    def record(self, original: int, compressed: int):
+        route = getattr(self.scope.get("route"), "path", None) or "unmatched"
+        HTTP_RESPONSE_BYTES.inc(original, route=route, encoding=self.encoding, stage="original")
+        HTTP_RESPONSE_BYTES.inc(compressed, route=route, encoding=self.encoding, stage="compressed")
+        if compressed:
+            HTTP_COMPRESSION_RATIO.observe(original / compressed, route=route, encoding=self.encoding)
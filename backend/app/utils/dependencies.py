@@ -1,28 +1,43 @@
+import time
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Optional
+from app.config import settings
 from app.database import get_db
 from app.models.user import User, UserRole
+from app.utils.principal import PRINCIPAL_COLUMNS, Principal, PrincipalCache
+from app.utils.revocation import RevocationList
 from app.utils.security import decode_token
 
 # Security scheme для JWT
 security = HTTPBearer()
 
+# Кэш аутентифицированных пользователей (сбрасывается при изменении роли, статуса и профиля)
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_SIZE)
+
+# Отозванные access токены (выход, смена роли, блокировка, удаление);
+# пополняется app.services.token_revocations
+revoked_tokens = RevocationList(settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60, settings.TOKEN_REVOCATION_CAPACITY)
+
 
 def get_current_user(
         credentials: HTTPAuthorizationCredentials = Depends(security),
         db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
     """
     Получает текущего пользователя по JWT токену
 
+    Пользователь берется из principal_cache; при промахе читаются только
+    нужные колонки users
+
     Args:
         credentials: HTTP Bearer токен
         db: Сессия БД
 
     Returns:
-        User объект
+        Principal (ID, роль, статус, имя, аватар)
 
     Raises:
         HTTPException: Если токен невалиден или пользователь не найден
@@ -49,13 +64,24 @@ def get_current_user(
             detail="Некорректный ID пользователя в токене"
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
+    if revoked_tokens.is_revoked(user_id, payload.get("iat") or 0):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Пользователь не найден"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Токен отозван, выполните вход заново",
+            headers={"WWW-Authenticate": "Bearer"},
         )
 
+    user = principal_cache.get(user_id)
+    if user is None:
+        row = db.query(*PRINCIPAL_COLUMNS).filter(User.id == user_id).first()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Пользователь не найден"
+            )
+        user = Principal.from_row(row)
+        principal_cache.put(user)
+
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -65,9 +91,55 @@ def get_current_user(
     return user
 
 
-def get_current_active_user(
-        current_user: User = Depends(get_current_user)
+def get_token_user(
+        credentials: HTTPAuthorizationCredentials = Depends(security),
+        db: Session = Depends(get_db)
+) -> Principal:
+    """
+    Текущий пользователь по claims access токена, без запроса к БД
+
+    Claims принимаются только у свежего (TOKEN_CLAIMS_MAX_AGE_SECONDS) и не
+    отозванного токена; иначе пользователь проверяется как в get_current_user
+    (отозванный токен получает 401).
+    Подходит для проверки роли в endpoints чтения; имени и аватара в Principal нет
+    """
+    payload = decode_token(credentials.credentials)
+    if payload is not None and payload.get("type") == "access":
+        principal = Principal.from_claims(payload)
+        issued_at = payload.get("iat")
+        if (
+                principal is not None and
+                isinstance(issued_at, (int, float)) and
+                time.time() - issued_at < settings.TOKEN_CLAIMS_MAX_AGE_SECONDS and
+                not revoked_tokens.is_revoked(principal.id, issued_at)
+        ):
+            return principal
+
+    return get_current_user(credentials, db)
+
+
+def get_current_db_user(
+        current_user: Principal = Depends(get_current_user),
+        db: Session = Depends(get_db)
 ) -> User:
+    """
+    Полная ORM строка текущего пользователя
+
+    Для endpoints, которые изменяют пользователя или отдают его профиль целиком
+    """
+    user = db.get(User, current_user.id)
+    if user is None:
+        principal_cache.invalidate(current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Пользователь не найден"
+        )
+    return user
+
+
+def get_current_active_user(
+        current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """
     Проверяет что пользователь активен
     """
@@ -79,12 +151,14 @@ def get_current_active_user(
     return current_user
 
 
-def require_role(required_roles: list[UserRole]):
+def require_role(required_roles: list[UserRole], from_token: bool = False):
     """
     Dependency для проверки роли пользователя
+
+    from_token=True - роль берется из claims токена (get_token_user), без БД
     """
 
-    def role_checker(current_user: User = Depends(get_current_user)) -> User:
+    def role_checker(current_user: Principal = Depends(get_token_user if from_token else get_current_user)) -> Principal:
         if current_user.role not in required_roles and current_user.role != UserRole.ADMIN:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -96,7 +170,7 @@ def require_role(required_roles: list[UserRole]):
 
 
 
-def require_instructor(current_user: User = Depends(get_current_user)) -> User:
+def require_instructor(current_user: Principal = Depends(get_current_user)) -> Principal:
     """
     Проверяет что пользователь - преподаватель или админ
     """
@@ -108,7 +182,7 @@ def require_instructor(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
+def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     """
     Проверяет что пользователь - администратор
     """
@@ -0,0 +1,34 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Response
+
+
+def weak_etag(*parts) -> str:
+    """
+    Слабый ETag из версии данных (ID, updated_at, счетчики)
+
+    Слабый, потому что одинаковые данные могут сериализоваться по-разному
+    (например, при сжатии ответа)
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Совпадение по If-None-Match (слабое сравнение, список и *)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    """Ответ 304 без тела"""
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,310 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from app.utils.pool_metrics import pool_status
+
+# Content-Type текстового формата Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Базовая метрика с метками; значения хранятся в памяти процесса"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: ожидаются метки {self.labelnames}, получены {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, tuple, tuple, float]]:
+        """Список (имя, имена меток, значения меток, значение) для экспорта"""
+        with self._lock:
+            return [(self.name, self.labelnames, key, value) for key, value in self._values.items()]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for name, labelnames, labelvalues, value in self.samples():
+            lines.append(f"{name}{_format_labels(labelnames, labelvalues)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Монотонно растущий счетчик"""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    """Значение, которое может расти и уменьшаться"""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(Metric):
+    """Гистограмма с фиксированными границами корзин (le)"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [счетчики корзин (без +Inf), сумма, количество]
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        result = []
+        with self._lock:
+            items = [(key, list(state[0]), state[1], state[2]) for key, state in self._values.items()]
+
+        bucket_labels = self.labelnames + ("le",)
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                result.append((f"{self.name}_bucket", bucket_labels, key + (_format_value(bound),), cumulative))
+            result.append((f"{self.name}_bucket", bucket_labels, key + ("+Inf",), count))
+            result.append((f"{self.name}_sum", self.labelnames, key, total))
+            result.append((f"{self.name}_count", self.labelnames, key, count))
+        return result
+
+
+class Registry:
+    """
+    Набор метрик процесса
+
+    Коллекторы вызываются при каждом экспорте и возвращают готовые метрики
+    (например, состояние пулов соединений на момент запроса /metrics)
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Metric]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus"""
+        metrics = list(self._metrics.values())
+        for collector in self._collectors:
+            metrics.extend(collector())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# HTTP
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "Количество HTTP запросов", ["method", "route", "status"]
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "Время обработки HTTP запроса", ["method", "route"]
+)
+HTTP_IN_PROGRESS = REGISTRY.gauge(
+    "http_requests_in_progress", "HTTP запросы в обработке", ["method"]
+)
+
+# Сжатие ответов (app.utils.compression)
+HTTP_RESPONSE_BYTES = REGISTRY.counter(
+    "http_response_bytes_total", "Размер сжатых ответов до и после сжатия", ["route", "encoding", "stage"]
+)
+HTTP_COMPRESSION_RATIO = REGISTRY.histogram(
+    "http_response_compression_ratio", "Степень сжатия ответа (исходный размер / сжатый)",
+    ["route", "encoding"], buckets=(1.5, 2, 3, 4, 6, 8, 12, 16, 24)
+)
+
+# Ограничение частоты запросов (app.utils.rate_limit)
+RATE_LIMITED = REGISTRY.counter(
+    "rate_limited_total", "Запросы, отклоненные с 429", ["scope"]
+)
+
+# Кэши
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "Обращения к кэшам приложения", ["cache", "result"]
+)
+
+# Доменные события
+QUIZ_SUBMISSIONS = REGISTRY.counter(
+    "quiz_submissions_total", "Отправленные попытки квизов", ["passed"]
+)
+ENROLLMENTS = REGISTRY.counter(
+    "enrollments_total", "Записи на курсы"
+)
+LESSON_COMPLETIONS = REGISTRY.counter(
+    "lesson_completions_total", "Завершенные уроки"
+)
+
+
+def record_cache(cache: str, hit: bool):
+    """Учитывает обращение к кэшу (hit или miss)"""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _cache_hit_ratio() -> List[Metric]:
+    totals: Dict[str, Dict[str, float]] = {}
+    for _, _, (cache, result), value in CACHE_REQUESTS.samples():
+        totals.setdefault(cache, {}).setdefault(result, 0)
+        totals[cache][result] += value
+
+    ratio = Gauge("cache_hit_ratio", "Доля попаданий в кэш", ["cache"])
+    for cache, results in totals.items():
+        requests = results.get("hit", 0) + results.get("miss", 0)
+        ratio.set(results.get("hit", 0) / requests if requests else 0.0, cache=cache)
+    return [ratio]
+
+
+REGISTRY.add_collector(_cache_hit_ratio)
+
+
+# Пулы соединений БД (регистрируются в app.database)
+_POOLS: Dict[str, object] = {}
+
+# Поля pool_status -> (метрика, тип, описание, множитель)
+_POOL_FIELDS = {
+    "size": ("db_pool_size", Gauge, "Размер пула соединений", 1),
+    "checked_out": ("db_pool_checked_out", Gauge, "Занятые соединения", 1),
+    "overflow": ("db_pool_overflow", Gauge, "Соединения сверх pool_size", 1),
+    "checkouts": ("db_pool_checkouts_total", Counter, "Выдачи соединений из пула", 1),
+    "checkout_timeouts": ("db_pool_checkout_timeouts_total", Counter, "Таймауты ожидания соединения", 1),
+    "wait_total_ms": ("db_pool_wait_seconds_total", Counter, "Суммарное ожидание соединения", 0.001),
+}
+
+
+def register_pool(name: str, pool):
+    """Добавляет пул соединений в экспорт метрик"""
+    _POOLS[name] = pool
+
+
+def _pool_metrics() -> List[Metric]:
+    metrics = {}
+    for pool_name, pool in _POOLS.items():
+        status = pool_status(pool)
+        for field, (metric_name, metric_class, documentation, scale) in _POOL_FIELDS.items():
+            if field not in status:
+                continue
+            metric = metrics.get(metric_name)
+            if metric is None:
+                metric = metrics[metric_name] = metric_class(metric_name, documentation, ["pool"])
+            metric._values[(pool_name,)] = status[field] * scale
+    return list(metrics.values())
+
+
+REGISTRY.add_collector(_pool_metrics)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: количество, длительность и число одновременных HTTP запросов
+
+    Маршрут берется из шаблона пути (/api/courses/{course_id}), чтобы число
+    временных рядов не зависело от значений параметров
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc(method=method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_PROGRESS.dec(method=method)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUESTS.inc(method=method, route=route_path, status=status_code)
+            HTTP_LATENCY.observe(time.perf_counter() - started, method=method, route=route_path)
@@ -0,0 +1,76 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+import orjson
+from sqlalchemy import DateTime, String, literal, tuple_
+
+
+class InvalidCursor(ValueError):
+    """Курсор поврежден или выдан для другой сортировки"""
+
+
+def encode_cursor(sort: str, value: Any, last_id: int) -> str:
+    """
+    Непрозрачный курсор страницы: ключ сортировки, его значение и ID
+    последней строки (разрешает равные значения ключа)
+    """
+    payload = orjson.dumps({"s": sort, "v": value, "id": last_id})
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str, sort: str, column) -> Tuple[Any, int]:
+    """
+    Значение ключа и ID из курсора
+
+    Raises:
+        InvalidCursor: курсор не читается или сортировка другая
+    """
+    try:
+        data = orjson.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        value, last_id = data["v"], int(data["id"])
+        if data["s"] != sort:
+            raise InvalidCursor("Курсор выдан для другой сортировки")
+        # Ключи сортировки NOT NULL: курсор с null не выбрал бы ни одной строки
+        if value is None:
+            raise InvalidCursor("Некорректный курсор")
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+    except InvalidCursor:
+        raise
+    except (binascii.Error, orjson.JSONDecodeError, KeyError, TypeError, ValueError) as error:
+        raise InvalidCursor("Некорректный курсор") from error
+    return value, last_id
+
+
+def _bind(column, value, dialect: str):
+    # SQLite хранит даты строками: CURRENT_TIMESTAMP - без микросекунд, а
+    # SQLAlchemy передает параметр с ними; сравнение строк в этом случае
+    # ошибается на равных значениях, поэтому формат повторяет хранимый
+    if dialect == "sqlite" and isinstance(value, datetime):
+        text = value.strftime("%Y-%m-%d %H:%M:%S")
+        if value.microsecond:
+            text += f".{value.microsecond:06d}"
+        return literal(text, String)
+    return literal(value, column.type)
+
+
+def keyset_condition(column, id_column, value, last_id: int, descending: bool, dialect: str):
+    """
+    Условие "строки после курсора" для сортировки (column, id) в одном направлении
+
+    Сравнение кортежей обслуживается range scan по индексу (column, id)
+    """
+    row = tuple_(column, id_column)
+    bound = tuple_(_bind(column, value, dialect), literal(last_id))
+    return row < bound if descending else row > bound
+
+
+def next_cursor(sort: str, column, rows: list, page_size: int) -> Optional[str]:
+    """Курсор следующей страницы или None, если строк больше нет (rows - page_size + 1 строк)"""
+    if len(rows) <= page_size:
+        return None
+    last = rows[page_size - 1]
+    value = getattr(last, column.key)
+    return encode_cursor(sort, value.isoformat() if isinstance(value, datetime) else value, last.id)
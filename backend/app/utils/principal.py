@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.models.user import User, UserRole
+from app.utils.metrics import record_cache
+
+# Колонки users, из которых собирается Principal (без пароля и токенов)
+PRINCIPAL_COLUMNS = (User.id, User.role, User.is_active, User.first_name, User.last_name, User.avatar_url)
+
+
+class Principal:
+    """
+    Облегченный аутентифицированный пользователь (без ORM и сессии БД)
+
+    Достаточен для проверок доступа и подписи записей; полную строку
+    users endpoint получает через get_current_db_user
+    """
+
+    __slots__ = ("id", "role", "is_active", "first_name", "last_name", "avatar_url")
+
+    def __init__(self, id: int, role: UserRole, is_active: bool, first_name: Optional[str] = None,
+                 last_name: Optional[str] = None, avatar_url: Optional[str] = None):
+        self.id = id
+        self.role = role
+        self.is_active = is_active
+        self.first_name = first_name
+        self.last_name = last_name
+        self.avatar_url = avatar_url
+
+    @classmethod
+    def from_row(cls, row) -> "Principal":
+        """Из строки с PRINCIPAL_COLUMNS или ORM объекта User"""
+        return cls(row.id, row.role, bool(row.is_active), row.first_name, row.last_name, row.avatar_url)
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> Optional["Principal"]:
+        """
+        Из проверенного access токена (sub, role) без обращения к БД
+
+        Имени и аватара в токене нет; None - если claims неполные
+        """
+        try:
+            return cls(int(payload["sub"]), UserRole(payload["role"]), True)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+    def __repr__(self):
+        return f"<Principal {self.id} ({self.role})>"
+
+
+class PrincipalCache:
+    """
+    TTL кэш Principal по ID пользователя в пределах worker
+
+    Ограничен по размеру (вытесняются давно использованные записи).
+    Изменения в этом процессе сбрасывают запись явно (invalidate),
+    в других worker'ах устаревшая запись живет не дольше ttl
+    """
+
+    def __init__(self, ttl: float, max_size: int = 10_000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, tuple[float, Principal]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                principal = entry[1]
+            else:
+                if entry is not None:
+                    del self._entries[user_id]
+                principal = None
+
+        record_cache("principal", principal is not None)
+        return principal
+
+    def put(self, principal: Principal):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        """Сбрасывает запись после изменения роли, статуса, профиля или удаления"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,115 @@
+import logging
+import re
+import time
+
+from sqlalchemy import event
+
+from app.utils.request_context import current_request
+
+logger = logging.getLogger(__name__)
+
+# Длина формы запроса в логе
+SHAPE_MAX_LENGTH = 300
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Форма SQL запроса: параметры уже вынесены в bind, схлопываем пробелы"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    if len(shape) > SHAPE_MAX_LENGTH:
+        shape = shape[:SHAPE_MAX_LENGTH] + "..."
+    return shape
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Время начала хранится в контексте выполнения: он живет один запрос и
+    # не остается на соединении пула, если запрос завершился ошибкой
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = context._query_start
+    state = current_request.get()
+    if state is None:
+        return
+
+    state.queries += 1
+    state.db_time += time.perf_counter() - started
+    shape = statement_shape(statement)
+    state.statements[shape] = state.statements.get(shape, 0) + 1
+
+
+def track_queries(engine):
+    """
+    Подключает подсчет запросов к engine
+
+    Для AsyncEngine передается engine.sync_engine
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def server_timing(state, total: float) -> str:
+    """Значение заголовка Server-Timing: время в БД, число запросов, общее время"""
+    return (
+        f'db;dur={state.db_time * 1000:.2f};desc="{state.queries} queries", '
+        f"app;dur={total * 1000:.2f}"
+    )
+
+
+def repeated_statement(state):
+    """Самый частый запрос запроса (форма, количество) или None"""
+    if not state.statements:
+        return None
+    return max(state.statements.items(), key=lambda item: item[1])
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware: Server-Timing с временем и числом SQL запросов
+    и предупреждение в лог при превышении бюджета запросов (признак N+1)
+
+    Использует RequestState, поэтому подключается внутри RequestContextMiddleware
+    """
+
+    def __init__(self, app, query_budget: int = 0, server_timing_header: bool = True):
+        self.app = app
+        self.query_budget = query_budget
+        self.server_timing_header = server_timing_header
+
+    async def __call__(self, scope, receive, send):
+        state = current_request.get()
+        if scope["type"] != "http" or state is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                self.check_budget(state)
+                if self.server_timing_header:
+                    value = server_timing(state, time.perf_counter() - started)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", value.encode("latin-1"))
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def check_budget(self, state):
+        if not self.query_budget or state.queries <= self.query_budget:
+            return
+
+        shape, count = repeated_statement(state)
+        logger.warning(
+            "Превышен бюджет SQL запросов: %s - %d запросов (бюджет %d), %.1f мс в БД; "
+            "повторяется %d раз: %s",
+            state.route,
+            state.queries,
+            self.query_budget,
+            state.db_time * 1000,
+            count,
+            shape
+        )
@@ -0,0 +1,135 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.utils.metrics import RATE_LIMITED
+
+
+def parse_rate(value: str) -> Tuple[int, float]:
+    """
+    Лимит из строки "количество/период": "5/m" -> (5, 60.0)
+
+    Период: s, m, h или число секунд ("10/30" - 10 запросов за 30 секунд)
+    """
+    count, _, period = value.strip().partition("/")
+    units = {"s": 1.0, "m": 60.0, "h": 3600.0}
+    period = period.strip().lower() or "s"
+    seconds = units[period] if period in units else float(period)
+    if int(count) <= 0 or seconds <= 0:
+        raise ValueError(f"Некорректный лимит: {value}")
+    return int(count), seconds
+
+
+class RateLimitBackend(ABC):
+    """
+    Хранилище корзин токенов
+
+    Общий для worker'ов backend (например, Redis со скриптом на сервере)
+    реализует take и clear; без них подкласс не создается
+    """
+
+    @abstractmethod
+    def take(self, key: str, capacity: int, refill_rate: float, cost: float = 1.0) -> float:
+        """
+        Списывает cost токенов из корзины key
+
+        Пересчет и списание должны быть атомарными: параллельные запросы
+        одного ключа не могут списать больше, чем есть в корзине.
+        Отсутствующая корзина считается полной (capacity токенов)
+
+        Args:
+            key: ключ корзины ("scope:identity")
+            capacity: емкость корзины
+            refill_rate: пополнение, токенов в секунду
+            cost: сколько токенов списать
+
+        Returns:
+            0, если токенов хватило, иначе секунды до их появления
+        """
+
+    @abstractmethod
+    def clear(self):
+        """Удаляет все корзины: следующий запрос любого ключа начинается с полной корзины"""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Корзины токенов в памяти процесса
+
+    Ограничен по размеру: при переполнении вытесняются давно не использованные
+    ключи (их корзины считаются полными при следующем запросе)
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key -> (токены, время последнего пересчета)
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, capacity: int, refill_rate: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(capacity), now))
+            tokens = min(float(capacity), tokens + (now - updated) * refill_rate)
+            if tokens >= cost:
+                tokens -= cost
+                retry_after = 0.0
+            else:
+                retry_after = (cost - tokens) / refill_rate
+
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RateLimiter:
+    """Именованные лимиты (token bucket) поверх backend"""
+
+    def __init__(self, backend: RateLimitBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+
+    def hit(self, scope: str, rate: str, identity: str) -> float:
+        """Учитывает запрос identity в лимите scope; 0 или секунды ожидания"""
+        capacity, period = parse_rate(rate)
+        return self.backend.take(f"{scope}:{identity}", capacity, capacity / period)
+
+    def enforce(self, *limits: Tuple[str, str, Optional[str]]):
+        """
+        Проверяет лимиты (scope, rate, identity) по порядку
+
+        Raises:
+            HTTPException 429 с Retry-After при превышении любого из них
+        """
+        if not self.enabled:
+            return
+
+        for scope, rate, identity in limits:
+            if not identity:
+                continue
+            retry_after = self.hit(scope, rate, identity)
+            if retry_after > 0:
+                RATE_LIMITED.inc(scope=scope)
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Слишком много попыток, повторите позже",
+                    headers={"Retry-After": str(math.ceil(retry_after))}
+                )
+
+
+def client_ip(request: Request) -> Optional[str]:
+    """IP клиента (за прокси адрес из X-Forwarded-For подставляет uvicorn --proxy-headers)"""
+    return request.client.host if request.client else None
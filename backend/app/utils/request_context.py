@@ -0,0 +1,143 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from app.utils.security import decode_token
+
+# Cookie, по которой запросы после записи читают с primary (работает между worker'ами)
+PRIMARY_COOKIE = "db_primary_until"
+
+
+class RequestState:
+    """Состояние текущего HTTP запроса, доступное из сессий БД и зависимостей"""
+
+    __slots__ = ("scope", "user_id", "wrote", "primary_until", "queries", "db_time", "statements")
+
+    def __init__(self, user_id: Optional[int] = None, primary_until: float = 0.0, scope: Optional[dict] = None):
+        self.scope = scope
+        self.user_id = user_id
+        self.wrote = False
+        self.primary_until = primary_until
+        # Статистика SQL запросов (заполняется app.utils.query_stats)
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements: dict[str, int] = {}
+
+    @property
+    def route(self) -> str:
+        """Метод и шаблон маршрута (GET /api/courses/{course_id}), если маршрут уже найден"""
+        if not self.scope:
+            return ""
+        route = self.scope.get("route")
+        path = route.path if route is not None else self.scope.get("path", "")
+        return f"{self.scope.get('method', '')} {path}"
+
+
+# Состояние запроса; в sync endpoints (threadpool) доступен тот же объект
+current_request: ContextVar[Optional[RequestState]] = ContextVar("current_request", default=None)
+
+
+class RecentWrites:
+    """
+    Время последней записи пользователей в пределах worker
+
+    Ограничен по размеру: при переполнении удаляются записи старше окна
+    """
+
+    def __init__(self, window: float, max_size: int = 100_000):
+        self.window = window
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._writes: dict[int, float] = {}
+
+    def mark(self, user_id: int):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._writes) >= self.max_size:
+                self._writes = {
+                    uid: ts for uid, ts in self._writes.items() if now - ts < self.window
+                }
+                if len(self._writes) >= self.max_size:
+                    self._writes.clear()
+            self._writes[user_id] = now
+
+    def is_recent(self, user_id: int) -> bool:
+        written_at = self._writes.get(user_id)
+        return written_at is not None and time.monotonic() - written_at < self.window
+
+
+def _header(headers: list, name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def user_id_from_authorization(value: Optional[str]) -> Optional[int]:
+    """ID пользователя из заголовка Authorization (без обращения к БД)"""
+    if not value or not value.lower().startswith("bearer "):
+        return None
+
+    payload = decode_token(value[7:])
+    if not payload:
+        return None
+
+    try:
+        return int(payload.get("sub"))
+    except (TypeError, ValueError):
+        return None
+
+
+def primary_until_from_cookie(value: Optional[str]) -> float:
+    """Момент (unix time), до которого запросы должны читать с primary"""
+    if not value:
+        return 0.0
+
+    for part in value.split(";"):
+        name, _, cookie_value = part.strip().partition("=")
+        if name == PRIMARY_COOKIE:
+            try:
+                return float(cookie_value)
+            except ValueError:
+                return 0.0
+    return 0.0
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware: создает RequestState для каждого запроса
+
+    Если включено окно read-your-writes (window > 0), после запроса с записью
+    в БД выставляет cookie, чтобы следующие чтения шли на primary
+    """
+
+    def __init__(self, app, window: float = 0.0):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = scope["headers"]
+        state = RequestState(
+            scope=scope,
+            user_id=user_id_from_authorization(_header(headers, b"authorization")),
+            primary_until=primary_until_from_cookie(_header(headers, b"cookie")) if self.window else 0.0
+        )
+        token = current_request.set(state)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and self.window and state.wrote:
+                until = int(time.time() + self.window) + 1
+                cookie = f"{PRIMARY_COOKIE}={until}; Max-Age={int(self.window) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
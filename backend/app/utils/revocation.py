@@ -0,0 +1,101 @@
+import hashlib
+import math
+import threading
+import time
+from typing import Iterable, Optional
+
+
+class BloomFilter:
+    """
+    Битовый фильтр Блума для целых ключей (ID пользователей)
+
+    Ложноположительные ответы возможны с вероятностью ~error_rate при
+    заполнении до capacity, ложноотрицательные - нет. Удаление не
+    поддерживается: фильтр пересобирается целиком
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: int):
+        # Двойное хеширование: k позиций из двух 64-битных хешей
+        digest = hashlib.blake2b(key.to_bytes(8, "little", signed=True), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + index * second) % self.size for index in range(self.hashes))
+
+    def add(self, key: int):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: int) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    """
+    Отзыв access токенов пользователей в пределах worker
+
+    Для пользователя хранится момент отзыва: токены, выданные не позже него
+    (iat), не принимаются. Проверка O(1) без обращения к БД: фильтр Блума
+    отвечает "не отзывался" для подавляющего большинства пользователей,
+    точное время отзыва берется из словаря только при попадании в фильтр.
+    Записи старше window (время жизни access токена) удаляются - такие
+    токены уже истекли сами
+
+    Словарь и фильтр хранятся одной парой: is_revoked читает ее без
+    блокировки, а пересборка готовит новую пару и подменяет ее целиком
+    """
+
+    def __init__(self, window: float, capacity: int = 100_000):
+        self.window = window
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._state: tuple[dict[int, float], BloomFilter] = ({}, BloomFilter(capacity))
+
+    def revoke_user(self, user_id: int, at: Optional[float] = None):
+        """Отзывает токены пользователя, выданные до момента at (по умолчанию - сейчас)"""
+        self.revoke_many([(user_id, at if at is not None else time.time())])
+
+    def revoke_many(self, entries: Iterable[tuple[int, float]]):
+        """Применяет пары (ID пользователя, момент отзыва); повторное применение безопасно"""
+        with self._lock:
+            revoked, bloom = self._state
+            for user_id, at in entries:
+                if at > revoked.get(user_id, 0.0):
+                    revoked[user_id] = at
+                    bloom.add(user_id)
+            if len(revoked) > self.capacity:
+                self._prune(time.time())
+
+    def is_revoked(self, user_id: int, issued_at: float) -> bool:
+        revoked, bloom = self._state
+        if user_id not in bloom:
+            return False
+        revoked_at = revoked.get(user_id)
+        return revoked_at is not None and issued_at <= revoked_at
+
+    def _prune(self, now: float):
+        revoked = {
+            user_id: revoked_at for user_id, revoked_at in self._state[0].items()
+            if now - revoked_at < self.window
+        }
+        bloom = BloomFilter(self.capacity)
+        for user_id in revoked:
+            bloom.add(user_id)
+        self._state = (revoked, bloom)
+
+    def prune(self):
+        """Удаляет истекшие записи и пересобирает фильтр"""
+        with self._lock:
+            self._prune(time.time())
+
+    def clear(self):
+        with self._lock:
+            self._state = ({}, BloomFilter(self.capacity))
+
+    def __len__(self) -> int:
+        return len(self._state[0])
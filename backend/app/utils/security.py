@@ -1,9 +1,17 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 from app.config import settings
 
+# Отдельный пул потоков для bcrypt: хеширование не блокирует event loop
+# и не занимает общий threadpool синхронных endpoints
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_executor_lock = threading.Lock()
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
@@ -12,19 +20,61 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     )
 
 
-def get_password_hash(password: str) -> str:
-    salt = bcrypt.gensalt()
+def get_password_hash(password: str, rounds: Optional[int] = None) -> str:
+    salt = bcrypt.gensalt(rounds or settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
+def password_hash_rounds(hashed_password: str) -> Optional[int]:
+    """Cost factor из bcrypt хеша ($2b$12$...), None для нераспознанного формата"""
+    parts = hashed_password.split("$")
+    if len(parts) < 4:
+        return None
+    try:
+        return int(parts[2])
+    except ValueError:
+        return None
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Хеш создан с другим cost factor, чем BCRYPT_ROUNDS"""
+    return password_hash_rounds(hashed_password) != settings.BCRYPT_ROUNDS
+
+
+def hash_executor() -> ThreadPoolExecutor:
+    """Пул потоков bcrypt (создается при первом использовании)"""
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_executor_lock:
+            if _hash_executor is None:
+                _hash_executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+                )
+    return _hash_executor
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password в пуле bcrypt (для async def endpoints)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hash_executor(), verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash в пуле bcrypt (для async def endpoints)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hash_executor(), get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     # Приводим sub к строке, если это число
     if "sub" in to_encode:
         to_encode["sub"] = str(to_encode["sub"])
-    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire, "type": "access"})
+    now = datetime.now(timezone.utc)
+    expire = now + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+    # iat с миллисекундами: токен, выданный сразу после отзыва, не считается отозванным
+    to_encode.update({"exp": expire, "iat": round(now.timestamp(), 3), "type": "access"})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
@@ -0,0 +1,39 @@
+from typing import Any, Iterable
+
+import orjson
+from fastapi.responses import JSONResponse
+
+# Формат совпадает с сериализацией pydantic: UTC как "Z", ключи-числа как строки
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON ответ через orjson
+
+    Используется как default_response_class приложения. Если обработчик
+    возвращает FastJSONResponse сам, FastAPI не валидирует ответ повторно
+    через response_model - данные должны уже соответствовать схеме
+    (см. project)
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def fields_of(schema) -> tuple:
+    """Имена полей pydantic схемы в порядке объявления"""
+    return tuple(schema.model_fields)
+
+
+def project(obj, fields: Iterable[str], **values) -> dict:
+    """
+    Проекция ORM объекта (или строки Row) в словарь полей схемы
+
+    Заменяет построение pydantic объекта и `**obj.__dict__` (который тянет
+    _sa_instance_state): берутся только нужные атрибуты, вычисляемые поля
+    передаются в values
+    """
+    row = {name: values.pop(name) if name in values else getattr(obj, name) for name in fields}
+    row.update(values)
+    return row
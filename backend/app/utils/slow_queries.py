@@ -0,0 +1,166 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.utils.query_stats import statement_shape
+from app.utils.request_context import current_request
+
+logger = logging.getLogger(__name__)
+
+# Запросы, для которых можно получить план (EXPLAIN без ANALYZE их не выполняет)
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def parameter_types(parameters):
+    """Типы bind параметров без значений (значения могут содержать персональные данные)"""
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+class SlowQueryLog:
+    """
+    Журнал медленных запросов в памяти процесса
+
+    Запросы группируются по форме SQL; хранится не больше size форм,
+    при переполнении вытесняется форма с наименьшей максимальной длительностью
+    """
+
+    def __init__(self, threshold_ms: float, size: int = 100, explain: bool = True):
+        self.threshold = threshold_ms / 1000
+        self.size = size
+        self.explain = explain
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        # Формы, для которых уже пытались получить план
+        self._explained: set[str] = set()
+
+    def record(self, shape: str, duration: float, parameters=None, route: str = "") -> bool:
+        """
+        Учитывает медленный запрос
+
+        Returns:
+            нужен ли план - план снимается один раз на форму и сохраняется через set_plan
+        """
+        now = datetime.now(timezone.utc)
+        duration_ms = round(duration * 1000, 3)
+
+        with self._lock:
+            entry = self._entries.get(shape)
+            if entry is None:
+                if len(self._entries) >= self.size:
+                    weakest = min(self._entries, key=lambda key: self._entries[key]["max_ms"])
+                    if self._entries[weakest]["max_ms"] >= duration_ms:
+                        return False
+                    del self._entries[weakest]
+                    self._explained.discard(weakest)
+
+                entry = self._entries[shape] = {
+                    "statement": shape,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "plan": None,
+                }
+
+            entry["count"] += 1
+            entry["total_ms"] = round(entry["total_ms"] + duration_ms, 3)
+            if duration_ms >= entry["max_ms"]:
+                entry["max_ms"] = duration_ms
+                entry["parameter_types"] = parameter_types(parameters)
+                entry["route"] = route
+            entry["last_seen"] = now.isoformat()
+
+            needs_plan = self.explain and shape not in self._explained
+            if needs_plan:
+                self._explained.add(shape)
+
+        return needs_plan
+
+    def set_plan(self, shape: str, plan: Optional[str]):
+        """Сохраняет план формы (если она еще не вытеснена)"""
+        with self._lock:
+            entry = self._entries.get(shape)
+            if entry is not None:
+                entry["plan"] = plan
+
+    def top(self, limit: int = 20) -> list:
+        """Самые медленные формы запросов по максимальной длительности"""
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: entry["max_ms"], reverse=True)
+            return [
+                {**entry, "avg_ms": round(entry["total_ms"] / entry["count"], 3)}
+                for entry in entries[:limit]
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._explained.clear()
+
+
+def explain_plan(conn, statement: str, parameters) -> Optional[str]:
+    """
+    План запроса PostgreSQL через EXPLAIN (ANALYZE off)
+
+    Выполняется отдельным курсором внутри SAVEPOINT, чтобы ошибка EXPLAIN
+    не прервала транзакцию обработчика
+    """
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE off) {statement}", parameters)
+            rows = cursor.fetchall()
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        except Exception:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            raise
+        return "\n".join(row[0] for row in rows)
+    finally:
+        cursor.close()
+
+
+def track_slow_queries(engine, log: SlowQueryLog):
+    """
+    Подключает журнал медленных запросов к engine
+
+    Для AsyncEngine передается engine.sync_engine
+    """
+    can_explain = engine.dialect.name == "postgresql"
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Контекст выполнения живет один запрос: при ошибке на соединении ничего не остается
+        context._slow_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - context._slow_query_start
+        if duration < log.threshold:
+            return
+
+        state = current_request.get()
+        shape = statement_shape(statement)
+        needs_plan = log.record(
+            shape,
+            duration,
+            parameters,
+            route=state.route if state is not None else ""
+        )
+
+        if not needs_plan or not can_explain or executemany:
+            return
+        if not statement.lstrip().upper().startswith(EXPLAINABLE):
+            return
+
+        try:
+            log.set_plan(shape, explain_plan(conn, statement, parameters))
+        except Exception as error:
+            logger.warning("Не удалось получить план медленного запроса: %s", error)
@@ -0,0 +1,4 @@
+# Бенчмарки производительности backend
+#
+# Запуск из каталога backend:
+#     python -m benchmarks.<module> --help
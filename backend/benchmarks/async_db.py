@@ -0,0 +1,148 @@
+"""
+Бенчмарк: блокирует ли медленный запрос к БД event loop
+
+Сравниваются два варианта async def endpoint с одинаковым медленным запросом:
+- sync:  синхронная Session внутри async def (как было в роутерах раньше)
+- async: AsyncSession из app.database (текущий вариант)
+
+Пока выполняются медленные запросы, с фиксированным интервалом отправляются
+запросы к лёгкому endpoint /ping. Задержка считается от запланированного
+момента отправки, поэтому время, проведенное в заблокированном event loop,
+попадает в замер. В варианте sync каждый медленный запрос останавливает
+весь event loop, и p99 /ping растет до длительности запроса.
+
+Запуск:
+    python -m benchmarks.async_db --slow-ms 50 --slow-requests 40 --probes 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.database import make_async_url
+
+
+def percentile(values: list, pct: float) -> float:
+    """Перцентиль (nearest-rank) в миллисекундах"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index] * 1000
+
+
+def _register_sleep(dbapi_connection, connection_record):
+    """Функция sleep_ms() для SQLite, чтобы эмулировать медленный запрос"""
+    dbapi_connection.create_function("sleep_ms", 1, lambda ms: time.sleep(ms / 1000) or ms)
+
+
+def slow_sql(url: str, slow_ms: int) -> str:
+    """SQL медленного запроса для выбранной СУБД"""
+    if url.startswith("postgresql"):
+        return f"SELECT pg_sleep({slow_ms / 1000})"
+    return f"SELECT sleep_ms({slow_ms})"
+
+
+def build_app(url: str, mode: str, slow_ms: int) -> FastAPI:
+    """Мини-приложение с медленным endpoint в выбранном режиме и /ping"""
+    app = FastAPI()
+    sql = text(slow_sql(url, slow_ms))
+    # Пул достаточного размера, чтобы не упираться в ожидание соединения
+    pool_kwargs = {} if url.startswith("sqlite") else {"pool_size": 50, "max_overflow": 0}
+
+    if mode == "sync":
+        engine = create_engine(url, **pool_kwargs)
+        if url.startswith("sqlite"):
+            event.listen(engine, "connect", _register_sleep)
+        SessionLocal = sessionmaker(bind=engine)
+
+        @app.get("/slow")
+        async def slow():
+            db = SessionLocal()
+            try:
+                db.execute(sql)
+            finally:
+                db.close()
+            return {"ok": True}
+    else:
+        engine = create_async_engine(make_async_url(url), **pool_kwargs)
+        if url.startswith("sqlite"):
+            event.listen(engine.sync_engine, "connect", _register_sleep)
+        AsyncSessionLocal = async_sessionmaker(bind=engine)
+
+        @app.get("/slow")
+        async def slow():
+            async with AsyncSessionLocal() as db:
+                await db.execute(sql)
+            return {"ok": True}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def run_mode(url: str, mode: str, slow_ms: int, slow_requests: int,
+                   probes: int, probe_interval_ms: float) -> dict:
+    """Запускает медленные запросы и параллельно замеряет задержку /ping"""
+    app = build_app(url, mode, slow_ms)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/slow")  # прогрев пула
+
+        latencies = []
+        started = time.perf_counter()
+
+        async def probe(index: int):
+            scheduled = started + index * probe_interval_ms / 1000
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            await client.get("/ping")
+            latencies.append(time.perf_counter() - scheduled)
+
+        await asyncio.gather(
+            *(probe(i) for i in range(probes)),
+            *(client.get("/slow") for _ in range(slow_requests))
+        )
+        elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "elapsed_s": round(elapsed, 3),
+        "ping_p50_ms": round(percentile(latencies, 50), 2),
+        "ping_p99_ms": round(percentile(latencies, 99), 2),
+        "ping_mean_ms": round(statistics.mean(latencies) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="", help="URL БД (по умолчанию временный SQLite)")
+    parser.add_argument("--slow-ms", type=int, default=50, help="Длительность медленного запроса")
+    parser.add_argument("--slow-requests", type=int, default=40, help="Количество медленных запросов")
+    parser.add_argument("--probes", type=int, default=200, help="Количество замеров /ping")
+    parser.add_argument("--probe-interval-ms", type=float, default=5, help="Интервал между замерами /ping")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    for mode in ("sync", "async"):
+        result = asyncio.run(run_mode(
+            url, mode, args.slow_ms, args.slow_requests, args.probes, args.probe_interval_ms
+        ))
+        print(
+            f"{result['mode']:>5}: elapsed={result['elapsed_s']}s "
+            f"ping p50={result['ping_p50_ms']}ms p99={result['ping_p99_ms']}ms "
+            f"mean={result['ping_mean_ms']}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
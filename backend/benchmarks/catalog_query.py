@@ -0,0 +1,153 @@
+"""
+Бенчмарк: страница каталога курсов - ORM объекты против проекции столбцов
+
+Строится тело страницы GET /api/courses/ (CourseShort) тремя способами:
+- lazy:       select(Course) и lazy load преподавателя и категории
+              для каждой строки - N+1 запросов
+- orm:        select(Course) + joinedload (как было раньше): один запрос,
+              но полные строки с описаниями и ORM объекты в identity map
+- projection: course_short_query - только столбцы CourseShort, имена
+              преподавателя и категории в одном запросе (текущий вариант)
+
+Для каждого способа выводятся запросов на страницу и ms на страницу.
+Описания курсов крупные (--text-kb), как в реальном каталоге.
+
+Запуск (по умолчанию временный SQLite):
+    python -m benchmarks.catalog_query --courses 20000 --page-size 50 --pages 200
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+
+def percentile(values: list, pct: float) -> float:
+    """Перцентиль (nearest-rank) в миллисекундах"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index] * 1000
+
+
+def create_catalog(engine, courses: int, instructors: int, categories: int, text_kb: int):
+    from app.models import Category, Course, CourseStatus, User, UserRole
+    from benchmarks.datagen import Loader
+
+    loader = Loader(engine)
+    loader.load(User, (
+        {"id": index, "email": f"catalog-{index}@example.com", "hashed_password": "-",
+         "first_name": "Instructor", "last_name": str(index), "role": UserRole.INSTRUCTOR}
+        for index in range(1, instructors + 1)
+    ))
+    loader.load(Category, (
+        {"id": index, "name": f"Category {index}", "slug": f"category-{index}"}
+        for index in range(1, categories + 1)
+    ))
+
+    text = ("Подробное описание программы курса. " * (text_kb * 1024 // 36 + 1))[:text_kb * 1024]
+    rng = random.Random(42)
+    loader.load(Course, (
+        {
+            "title": f"Catalog course {index}",
+            "slug": f"catalog-course-{index}",
+            "description": text,
+            "requirements": text,
+            "learning_outcomes": text,
+            "short_description": "Краткое описание курса",
+            "price": rng.choice((0.0, 19.0, 49.0)),
+            "status": CourseStatus.PUBLISHED,
+            "is_published": True,
+            "instructor_id": index % instructors + 1,
+            "category_id": index % categories + 1,
+        }
+        for index in range(courses)
+    ))
+
+
+class QueryCounter:
+    """Количество SQL запросов к engine"""
+
+    def __init__(self, sync_engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(sync_engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def summary(mode: str, timings: list, queries: int) -> str:
+    return (
+        f"{mode:>10}: {queries / len(timings):6.1f} запросов/страница, "
+        f"p50={percentile(timings, 50):.2f}ms p95={percentile(timings, 95):.2f}ms "
+        f"mean={statistics.mean(timings) * 1000:.2f}ms"
+    )
+
+
+def run_mode(mode: str, offsets: list, page_size: int) -> str:
+    """
+    Страницы выбранным способом
+
+    Все способы - через sync Session одного engine: сравнивается форма
+    запроса и построение строк, а не драйвер
+    """
+    from sqlalchemy import select
+    from app.api.course import build_course_short, build_course_short_row, course_short_query, course_with_relations
+    from app.database import SessionLocal, engine
+    from app.models import Course
+
+    counter = QueryCounter(engine)
+    order = (Course.created_at.desc(), Course.id.desc())
+    timings = []
+    for offset in offsets:
+        started = time.perf_counter()
+        # Новая сессия на страницу, как в запросе: identity map пуст
+        with SessionLocal() as db:
+            if mode == "projection":
+                rows = db.execute(course_short_query().order_by(*order).offset(offset).limit(page_size)).all()
+                [build_course_short_row(row) for row in rows]
+            else:
+                query = course_with_relations() if mode == "orm" else select(Course)
+                courses = db.scalars(query.order_by(*order).offset(offset).limit(page_size)).all()
+                [build_course_short(course) for course in courses]
+        timings.append(time.perf_counter() - started)
+    return summary(mode, timings, counter.count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="", help="URL БД (по умолчанию временный SQLite)")
+    parser.add_argument("--courses", type=int, default=20_000)
+    parser.add_argument("--instructors", type=int, default=500)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--text-kb", type=int, default=4, help="Размер каждого текстового поля курса, KB")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=200, help="Страниц на способ")
+    parser.add_argument("--max-page", type=int, default=20, help="Страницы выбираются случайно из первых N")
+    args = parser.parse_args()
+
+    # Настройки читаются при импорте app, поэтому окружение задается до него
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'catalog.db')}"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ["DEBUG"] = "false"
+
+    import app.models  # noqa: F401
+    from app.database import create_tables, engine
+
+    create_tables()
+    started = time.perf_counter()
+    create_catalog(engine, args.courses, args.instructors, args.categories, args.text_kb)
+    print(f"courses: {args.courses:,} строк за {time.perf_counter() - started:.1f}s, page_size={args.page_size}")
+
+    # Первые страницы каталога: их запрашивают чаще всего, OFFSET не доминирует в замере
+    rng = random.Random(7)
+    offsets = [rng.randrange(args.max_page) * args.page_size for _ in range(args.pages)]
+
+    for mode in ("lazy", "orm", "projection"):
+        print(run_mode(mode, offsets, args.page_size))
+
+
+if __name__ == "__main__":
+    main()
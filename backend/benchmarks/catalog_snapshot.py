@@ -0,0 +1,122 @@
+"""
+Бенчмарк: снимок каталога в памяти worker'а (app.services.catalog_snapshot)
+
+Строки генерируются без БД, замеряются:
+- build:   построение снимка (полная пересборка раз в CATALOG_SNAPSHOT_TTL_SECONDS)
+- replace: применение изменения одного курса (invalidate после записи)
+- query:   страница и total по набору фильтров, как в GET /api/courses/
+
+Запуск:
+    python -m benchmarks.catalog_snapshot --courses 100000 --repeat 50
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+# (описание, ключ сортировки, по убыванию, фильтры)
+QUERIES = (
+    ("newest", "created_at", True, {}),
+    ("category", "created_at", True, {"category_id": 3}),
+    ("category+level", "rating", True, {"category_id": 3, "level": "ADVANCED"}),
+    ("instructor", "price", False, {"instructor_id": 17}),
+    ("paid, price range", "price", False, {"is_free": False, "min_price": 20.0, "max_price": 60.0}),
+    ("rating>=4.5", "students", True, {"min_rating": 4.5}),
+    ("category+rating, page 20", "created_at", True, {"category_id": 5, "min_rating": 3.0, "offset": 190}),
+    ("title", "title", False, {}),
+)
+
+
+def percentile(values: list, pct: float) -> float:
+    """Перцентиль (nearest-rank) в миллисекундах"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index] * 1000
+
+
+def catalog_rows(count: int, instructors: int, categories: int, seed: int) -> list:
+    from app.models.course import CourseLevel
+    from app.services.catalog_snapshot import CatalogRow
+
+    rng = random.Random(seed)
+    levels = list(CourseLevel)
+    started = datetime(2025, 1, 1)
+    return [
+        CatalogRow(
+            id=index, title=f"Course {rng.randrange(count):06d}", short_description="Краткое описание курса",
+            thumbnail_url=None, level=rng.choice(levels), price=rng.choice((0.0, 0.0, 9.0, 19.0, 29.0, 49.0, 99.0)),
+            discount_price=None, average_rating=round(rng.uniform(0, 5), 2), total_students=rng.randrange(10_000),
+            total_lessons=rng.randrange(1, 50), duration_hours=rng.randrange(1, 40) / 2,
+            created_at=started + timedelta(minutes=rng.randrange(600_000)), instructor_first_name="Instructor",
+            instructor_last_name=str(index % instructors), category_name=None,
+            category_id=rng.randrange(1, categories + 1), instructor_id=rng.randrange(1, instructors + 1)
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def timed(function, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def summary(name: str, timings: list) -> str:
+    return (
+        f"{name:>26}: p50={percentile(timings, 50):8.2f}ms p95={percentile(timings, 95):8.2f}ms "
+        f"mean={statistics.mean(timings) * 1000:8.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=100_000)
+    parser.add_argument("--instructors", type=int, default=2_000)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=50, help="Повторов replace и каждого запроса")
+    parser.add_argument("--builds", type=int, default=3, help="Повторов build")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # Настройки читаются при импорте app, поэтому окружение задается до него
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ["DEBUG"] = "false"
+
+    from app.models.course import CourseLevel
+    from app.services.catalog_snapshot import CatalogSnapshot
+
+    rows = catalog_rows(args.courses, args.instructors, args.categories, args.seed)
+    print(f"courses: {args.courses:,}, instructors: {args.instructors:,}, categories: {args.categories}")
+
+    snapshot = CatalogSnapshot.build(rows)
+    print(summary("build", timed(lambda: CatalogSnapshot.build(rows), args.builds)))
+
+    rng = random.Random(args.seed)
+
+    def replace_one():
+        row = rows[rng.randrange(len(rows))]
+        snapshot.replace([row.id], [row._replace(price=rng.choice((0.0, 19.0, 49.0)))])
+
+    print(summary("replace (1 course)", timed(replace_one, args.repeat)))
+
+    for name, sort_key, descending, filters in QUERIES:
+        filters = dict(filters)
+        offset = filters.pop("offset", 0)
+        if "level" in filters:
+            filters["level"] = CourseLevel[filters["level"]]
+        _, total = snapshot.query(sort_key, descending, args.page_size + 1, offset=offset, **filters)
+        timings = timed(
+            lambda: snapshot.query(sort_key, descending, args.page_size + 1, offset=offset, **filters), args.repeat
+        )
+        print(summary(name, timings) + f"  total={total:,}")
+
+
+if __name__ == "__main__":
+    main()
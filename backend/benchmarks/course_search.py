@@ -0,0 +1,146 @@
+"""
+Бенчмарк: поиск по каталогу курсов - ILIKE против полнотекстового индекса
+
+Выполняются те же запросы, что в GET /api/courses/?search=... (подсчет и
+первая страница опубликованных курсов), в двух режимах:
+- ilike: три ILIKE '%term%' по названию и описаниям (как было раньше),
+  каждый запрос читает всю таблицу courses
+- fts:   индекс СУБД (PostgreSQL: tsvector + GIN, SQLite: FTS5) с ранжированием
+
+Запуск (по умолчанию временный SQLite):
+    python -m benchmarks.course_search --courses 100000
+    python -m benchmarks.course_search --database-url postgresql://... --repeat 20
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+# Словарь для названий и описаний (ru и en, как в реальном каталоге)
+WORDS = {
+    "ru": (
+        "программирование основы анализ данных машинное обучение веб разработка дизайн интерфейсов "
+        "маркетинг управление проектами финансы бухгалтерия фотография видеомонтаж музыка гитара "
+        "английский язык математика статистика физика химия биология история психология "
+        "менеджмент продажи копирайтинг рисование акварель кулинария фитнес йога"
+    ).split(),
+    "en": (
+        "python javascript react django fastapi sql databases cloud devops docker kubernetes "
+        "security testing design photography marketing finance excel leadership writing "
+        "drawing music guitar statistics algorithms networks linux mobile android swift"
+    ).split(),
+}
+
+QUERIES = ("python", "машинное обучение", "анализ дан", "docker kubernetes", "акварель", "leadership")
+
+
+def percentile(values: list, pct: float) -> float:
+    """Перцентиль (nearest-rank) в миллисекундах"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index] * 1000
+
+
+def course_rows(count: int, instructor_id: int, seed: int):
+    from app.models import CourseStatus
+
+    rng = random.Random(seed)
+    for index in range(count):
+        language = "ru" if index % 3 else "en"
+        words = WORDS[language]
+        title = " ".join(rng.sample(words, 3)).capitalize()
+        yield {
+            "title": f"{title} {index}",
+            "slug": f"search-bench-{index}",
+            "short_description": " ".join(rng.sample(words, 8)),
+            "description": " ".join(rng.choices(words, k=60)),
+            "language": language,
+            "status": CourseStatus.PUBLISHED,
+            "is_published": True,
+            "instructor_id": instructor_id,
+        }
+
+
+def create_courses(engine, count: int, seed: int):
+    from app.models import User, UserRole, Course
+    from benchmarks.datagen import Loader
+
+    with engine.begin() as connection:
+        instructor_id = connection.execute(
+            User.__table__.insert().values(
+                email="search-bench@example.com", hashed_password="-", first_name="Bench",
+                last_name="Instructor", role=UserRole.INSTRUCTOR
+            )
+        ).inserted_primary_key[0]
+
+    started = time.perf_counter()
+    Loader(engine).load(Course, course_rows(count, instructor_id, seed))
+    print(f"courses: {count:,} строк за {time.perf_counter() - started:.1f}s")
+
+
+def run_mode(engine, mode: str, repeat: int, page_size: int) -> dict:
+    from sqlalchemy import func, select
+    from app.models import Course, CourseStatus
+    from app.services.course_search import CourseSearch
+
+    backend = "ilike" if mode == "ilike" else engine.dialect.name
+    filters = [Course.is_published == True, Course.status == CourseStatus.PUBLISHED]  # noqa: E712
+    timings, totals = [], {}
+
+    with engine.connect() as connection:
+        for query in QUERIES:
+            course_search = CourseSearch.build(query, backend)
+            order = [course_search.rank] if course_search.rank is not None else []
+            count_query = course_search.apply(select(func.count(Course.id)).select_from(Course).where(*filters))
+            page_query = course_search.apply(select(Course.id).where(*filters)).order_by(
+                *order, Course.created_at.desc()
+            ).limit(page_size)
+
+            for _ in range(repeat):
+                started = time.perf_counter()
+                totals[query] = connection.scalar(count_query)
+                connection.execute(page_query).all()
+                timings.append(time.perf_counter() - started)
+
+    return {
+        "mode": mode,
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "mean_ms": round(statistics.mean(timings) * 1000, 2),
+        "totals": totals,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="", help="URL БД (по умолчанию временный SQLite)")
+    parser.add_argument("--courses", type=int, default=100_000, help="Количество курсов")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторов каждого запроса")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # Настройки читаются при импорте app, поэтому окружение задается до него
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'search.db')}"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ["DEBUG"] = "false"
+
+    import app.models  # noqa: F401
+    from app.database import engine, create_tables
+
+    create_tables()
+    create_courses(engine, args.courses, args.seed)
+
+    for mode in ("ilike", "fts"):
+        result = run_mode(engine, mode, args.repeat, args.page_size)
+        print(
+            f"{result['mode']:>6}: p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+            f"mean={result['mean_ms']}ms"
+        )
+        print("        найдено: " + ", ".join(f"{query!r}={total}" for query, total in result["totals"].items()))
+
+
+if __name__ == "__main__":
+    main()
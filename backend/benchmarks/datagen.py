@@ -0,0 +1,671 @@
+"""
+Генератор синтетических данных произвольного масштаба
+
+Создает согласованные пользователей, категории, курсы, уроки, квизы (вопросы,
+ответы), записи на курсы, прогресс, отзывы, комментарии и попытки квизов.
+
+- Строки генерируются потоково и загружаются пакетами: COPY для
+  PostgreSQL (psycopg2), INSERT ... VALUES (executemany) для остальных СУБД
+- ID задаются арифметически от текущего MAX(id), поэтому связи
+  (уроки курса, записи студента, правильные ответы) вычисляются без чтения
+  из БД и без хранения строк в памяти - см. Dataset
+- Генерация детерминирована (--seed): повторный запуск дает те же данные
+
+Запуск (из каталога backend, схема уже создана: alembic upgrade head):
+    python -m benchmarks.datagen --scale 10
+    python -m benchmarks.datagen --enrollments 1000000 --progress 10000000
+    python -m benchmarks.datagen --database-url postgresql://... --manifest dataset.json
+
+Манифест (--manifest) описывает набор данных; его принимает
+benchmarks.loadtest --dataset, чтобы не генерировать данные заново.
+"""
+import argparse
+import csv
+import enum
+import io
+import itertools
+import json
+import math
+import os
+import random
+import time
+from dataclasses import dataclass, asdict, fields
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+SEED_PASSWORD = "benchmark123"
+
+# Рейтинги отзывов: смещены к высоким, как в реальных каталогах
+RATINGS = (5, 5, 5, 4, 4, 4, 3, 2, 1)
+
+
+@dataclass
+class Scale:
+    """Размер набора данных"""
+    students: int = 1000
+    instructors: int = 20
+    admins: int = 1
+    categories: int = 10
+    courses: int = 100
+    lessons_per_course: int = 10
+    enrollments_per_student: int = 3
+    # Доля уроков записанного курса, по которым есть прогресс (уроки завершены)
+    progress_ratio: float = 0.5
+    # Квиз у каждого N-го урока
+    quiz_every_lessons: int = 5
+    questions_per_quiz: int = 5
+    answers_per_question: int = 4
+    # Доля записей с отзывом и доля пройденных квизов с попыткой
+    review_ratio: float = 0.3
+    attempt_ratio: float = 0.5
+    comments_per_lesson: int = 2
+    seed: int = 42
+
+    def scaled(self, factor: float) -> "Scale":
+        """Масштабирует количество пользователей и курсов (структура курса не меняется)"""
+        return Scale(**{
+            **asdict(self),
+            "students": max(1, round(self.students * factor)),
+            "instructors": max(1, round(self.instructors * factor)),
+            "courses": max(1, round(self.courses * factor)),
+            "categories": max(1, round(self.categories * math.sqrt(factor))),
+        })
+
+    @property
+    def quizzes_per_course(self) -> int:
+        return self.lessons_per_course // max(self.quiz_every_lessons, 1)
+
+    @property
+    def completed_lessons(self) -> int:
+        return round(self.lessons_per_course * self.progress_ratio)
+
+    def estimate(self) -> Dict[str, int]:
+        """Ожидаемое количество строк по таблицам"""
+        published = self.courses - self.courses // 10
+        enrollments = self.students * min(self.enrollments_per_student, published)
+        quizzes = self.courses * self.quizzes_per_course
+        completed_quizzes = self.completed_lessons // max(self.quiz_every_lessons, 1)
+        return {
+            "users": self.admins + self.instructors + self.students,
+            "categories": self.categories,
+            "courses": self.courses,
+            "lessons": self.courses * self.lessons_per_course,
+            "quizzes": quizzes,
+            "quiz_questions": quizzes * self.questions_per_quiz,
+            "quiz_answers": quizzes * self.questions_per_quiz * self.answers_per_question,
+            "enrollments": enrollments,
+            "progress": enrollments * self.completed_lessons,
+            "reviews": round(enrollments * self.review_ratio),
+            "comments": self.courses * self.lessons_per_course * self.comments_per_lesson,
+            "quiz_attempts": round(enrollments * completed_quizzes * self.attempt_ratio),
+        }
+
+
+class Dataset:
+    """
+    Структура набора данных: ID и связи вычисляются по масштабу и базовым ID
+
+    base - первый ID каждой таблицы (MAX(id) + 1 на момент генерации)
+    """
+
+    def __init__(self, scale: Scale, base: Dict[str, int]):
+        self.scale = scale
+        self.base = base
+        self.password = SEED_PASSWORD
+        self._published = None
+
+    # ---------- пользователи ----------
+
+    @property
+    def admin_ids(self) -> range:
+        start = self.base["users"]
+        return range(start, start + self.scale.admins)
+
+    @property
+    def instructor_ids(self) -> range:
+        start = self.admin_ids.stop
+        return range(start, start + self.scale.instructors)
+
+    @property
+    def student_ids(self) -> range:
+        start = self.instructor_ids.stop
+        return range(start, start + self.scale.students)
+
+    # ---------- каталог ----------
+
+    @property
+    def category_ids(self) -> range:
+        return range(self.base["categories"], self.base["categories"] + self.scale.categories)
+
+    @property
+    def course_ids(self) -> range:
+        return range(self.base["courses"], self.base["courses"] + self.scale.courses)
+
+    def is_published(self, course_id: int) -> bool:
+        # Каждый десятый курс - черновик
+        return (course_id - self.base["courses"]) % 10 != 9
+
+    @property
+    def published_course_ids(self) -> List[int]:
+        if self._published is None:
+            self._published = [course_id for course_id in self.course_ids if self.is_published(course_id)]
+        return self._published
+
+    def lessons_of(self, course_id: int) -> range:
+        per_course = self.scale.lessons_per_course
+        start = self.base["lessons"] + (course_id - self.base["courses"]) * per_course
+        return range(start, start + per_course)
+
+    def quiz_lesson_index(self, quiz_number: int) -> int:
+        """Порядковый номер урока (с 0) в курсе для N-го квиза курса"""
+        return (quiz_number + 1) * max(self.scale.quiz_every_lessons, 1) - 1
+
+    def quizzes_of(self, course_id: int) -> list:
+        """[(quiz_id, {question_id: [correct_answer_id]})] квизов курса"""
+        scale = self.scale
+        result = []
+        for number in range(scale.quizzes_per_course):
+            quiz_index = (course_id - self.base["courses"]) * scale.quizzes_per_course + number
+            correct = {}
+            for question_number in range(scale.questions_per_quiz):
+                question_index = quiz_index * scale.questions_per_quiz + question_number
+                right = question_index % scale.answers_per_question
+                correct[self.base["quiz_questions"] + question_index] = [
+                    self.base["quiz_answers"] + question_index * scale.answers_per_question + right
+                ]
+            result.append((self.base["quizzes"] + quiz_index, correct))
+        return result
+
+    # ---------- обучение ----------
+
+    def enrollments_of(self, student_id: int) -> List[int]:
+        """Курсы студента (детерминированно по seed и номеру студента)"""
+        index = student_id - self.student_ids.start
+        rng = random.Random(self.scale.seed * 10_000_019 + index)
+        published = self.published_course_ids
+        return rng.sample(published, min(self.scale.enrollments_per_student, len(published)))
+
+    def progress_of(self, student_id: int) -> List[int]:
+        """Завершенные уроки студента"""
+        done = self.scale.completed_lessons
+        return [
+            lesson_id
+            for course_id in self.enrollments_of(student_id)
+            for lesson_id in self.lessons_of(course_id)[:done]
+        ]
+
+    def manifest(self) -> dict:
+        return {"scale": asdict(self.scale), "base": self.base}
+
+    @classmethod
+    def from_manifest(cls, data: dict) -> "Dataset":
+        return cls(Scale(**data["scale"]), data["base"])
+
+
+# ============ ГЕНЕРАЦИЯ СТРОК ============
+
+class Generator:
+    """Потоковая генерация строк всех таблиц набора данных"""
+
+    def __init__(self, dataset: Dataset, hashed_password: str):
+        self.dataset = dataset
+        self.scale = dataset.scale
+        self.hashed_password = hashed_password
+        self.now = datetime.now(timezone.utc)
+        # Агрегаты курсов, заполняются при генерации записей и отзывов
+        self.course_students: Dict[int, int] = {}
+        self.course_ratings: Dict[int, List[int]] = {}
+
+    def rng(self, table: str) -> random.Random:
+        return random.Random(f"{self.scale.seed}:{table}")
+
+    def users(self) -> Iterator[dict]:
+        from app.models import UserRole
+
+        data = self.dataset
+        for role, ids in (
+                (UserRole.ADMIN, data.admin_ids),
+                (UserRole.INSTRUCTOR, data.instructor_ids),
+                (UserRole.STUDENT, data.student_ids),
+        ):
+            for user_id in ids:
+                yield {
+                    "id": user_id,
+                    "email": f"{role.value}{user_id}@bench.example.com",
+                    "hashed_password": self.hashed_password,
+                    "first_name": "Bench",
+                    "last_name": f"{role.value.title()} {user_id}",
+                    "role": role,
+                    "is_active": True,
+                    "is_verified": True,
+                }
+
+    def categories(self) -> Iterator[dict]:
+        for order, category_id in enumerate(self.dataset.category_ids):
+            yield {
+                "id": category_id,
+                "name": f"Bench category {category_id}",
+                "slug": f"bench-category-{category_id}",
+                "order": order,
+            }
+
+    def courses(self) -> Iterator[dict]:
+        from app.models import CourseLevel, CourseStatus
+
+        data = self.dataset
+        rng = self.rng("courses")
+        levels = list(CourseLevel)
+        for index, course_id in enumerate(data.course_ids):
+            published = data.is_published(course_id)
+            yield {
+                "id": course_id,
+                "title": f"Bench course {course_id}",
+                "slug": f"bench-course-{course_id}",
+                "description": f"Описание тестового курса {course_id} для нагрузочного теста",
+                "short_description": f"Курс {course_id}",
+                "level": levels[index % len(levels)],
+                "price": rng.choice((0.0, 0.0, 19.0, 49.0, 99.0)),
+                "status": CourseStatus.PUBLISHED if published else CourseStatus.DRAFT,
+                "is_published": published,
+                "published_at": self.now.replace(tzinfo=None) if published else None,
+                "category_id": data.category_ids[index % len(data.category_ids)] if data.category_ids else None,
+                "instructor_id": data.instructor_ids[index % len(data.instructor_ids)],
+                "total_lessons": self.scale.lessons_per_course,
+                "total_students": 0,
+                "total_reviews": 0,
+                "average_rating": 0.0,
+            }
+
+    def lessons(self) -> Iterator[dict]:
+        from app.models import LessonType
+
+        rng = self.rng("lessons")
+        for course_id in self.dataset.course_ids:
+            for order, lesson_id in enumerate(self.dataset.lessons_of(course_id), start=1):
+                yield {
+                    "id": lesson_id,
+                    "title": f"Урок {order}",
+                    "course_id": course_id,
+                    "order": order,
+                    "lesson_type": LessonType.VIDEO,
+                    "video_duration": round(rng.uniform(3, 30), 1),
+                    "is_free_preview": order == 1,
+                    "is_published": True,
+                }
+
+    def quizzes(self) -> Iterator[dict]:
+        data = self.dataset
+        for course_id in data.course_ids:
+            lessons = data.lessons_of(course_id)
+            for number, (quiz_id, _) in enumerate(data.quizzes_of(course_id)):
+                yield {
+                    "id": quiz_id,
+                    "title": f"Квиз урока {lessons[data.quiz_lesson_index(number)]}",
+                    "lesson_id": lessons[data.quiz_lesson_index(number)],
+                    "max_attempts": 1_000_000,  # нагрузочный тест отправляет много попыток
+                    "is_published": True,
+                }
+
+    def quiz_questions(self) -> Iterator[dict]:
+        from app.models import QuizType
+
+        for course_id in self.dataset.course_ids:
+            for quiz_id, correct in self.dataset.quizzes_of(course_id):
+                for order, question_id in enumerate(correct):
+                    yield {
+                        "id": question_id,
+                        "quiz_id": quiz_id,
+                        "question_text": f"Вопрос {order + 1}",
+                        "question_type": QuizType.MULTIPLE_CHOICE,
+                        "order": order,
+                        "points": 1.0,
+                    }
+
+    def quiz_answers(self) -> Iterator[dict]:
+        per_question = self.scale.answers_per_question
+        for course_id in self.dataset.course_ids:
+            for _, correct in self.dataset.quizzes_of(course_id):
+                for question_id, (right_id,) in correct.items():
+                    first = self.dataset.base["quiz_answers"] + (
+                        question_id - self.dataset.base["quiz_questions"]
+                    ) * per_question
+                    for order in range(per_question):
+                        yield {
+                            "id": first + order,
+                            "question_id": question_id,
+                            "answer_text": f"Ответ {order + 1}",
+                            "is_correct": first + order == right_id,
+                            "order": order,
+                        }
+
+    def _enrollments(self) -> Iterator[tuple]:
+        for student_id in self.dataset.student_ids:
+            for course_id in self.dataset.enrollments_of(student_id):
+                yield student_id, course_id
+
+    def enrollments(self) -> Iterator[dict]:
+        from app.models import EnrollmentStatus
+
+        lessons = self.scale.lessons_per_course
+        done = self.scale.completed_lessons
+        status = EnrollmentStatus.COMPLETED if lessons and done == lessons else EnrollmentStatus.ACTIVE
+        for student_id, course_id in self._enrollments():
+            self.course_students[course_id] = self.course_students.get(course_id, 0) + 1
+            yield {
+                "student_id": student_id,
+                "course_id": course_id,
+                "status": status,
+                "progress_percentage": done / lessons * 100 if lessons else 0.0,
+                "completed_lessons": done,
+                "is_paid": True,
+                "completed_at": self.now if status == EnrollmentStatus.COMPLETED else None,
+            }
+
+    def progress(self) -> Iterator[dict]:
+        rng = self.rng("progress")
+        done = self.scale.completed_lessons
+        for student_id, course_id in self._enrollments():
+            for lesson_id in self.dataset.lessons_of(course_id)[:done]:
+                yield {
+                    "student_id": student_id,
+                    "lesson_id": lesson_id,
+                    "is_completed": True,
+                    "completion_percentage": 100.0,
+                    "time_spent": rng.randrange(60, 1800),
+                    "completed_at": self.now,
+                }
+
+    def reviews(self) -> Iterator[dict]:
+        rng = self.rng("reviews")
+        for student_id, course_id in self._enrollments():
+            if rng.random() >= self.scale.review_ratio:
+                continue
+            rating = rng.choice(RATINGS)
+            self.course_ratings.setdefault(course_id, []).append(rating)
+            yield {
+                "student_id": student_id,
+                "course_id": course_id,
+                "rating": rating,
+                "title": f"Отзыв {rating}/5",
+                "comment": "Синтетический отзыв для нагрузочного теста",
+            }
+
+    def comments(self) -> Iterator[dict]:
+        rng = self.rng("comments")
+        students = self.dataset.student_ids
+        comment_id = self.dataset.base["comments"]
+        for course_id in self.dataset.course_ids:
+            for lesson_id in self.dataset.lessons_of(course_id):
+                first = comment_id
+                for _ in range(self.scale.comments_per_lesson):
+                    # Примерно треть комментариев - ответы на предыдущие
+                    parent_id = rng.randrange(first, comment_id) if comment_id > first and rng.random() < 0.3 else None
+                    yield {
+                        "id": comment_id,
+                        "content": f"Комментарий {comment_id}",
+                        "user_id": students[rng.randrange(len(students))],
+                        "lesson_id": lesson_id,
+                        "parent_id": parent_id,
+                        "is_edited": False,
+                        "is_deleted": False,
+                    }
+                    comment_id += 1
+
+    def quiz_attempts(self) -> Iterator[dict]:
+        rng = self.rng("quiz_attempts")
+        data = self.dataset
+        done = self.scale.completed_lessons
+        for student_id, course_id in self._enrollments():
+            for number, (quiz_id, correct) in enumerate(data.quizzes_of(course_id)):
+                if data.quiz_lesson_index(number) >= done or rng.random() >= self.scale.attempt_ratio:
+                    continue
+                answers = {
+                    str(question_id): answer_ids if rng.random() < 0.75 else []
+                    for question_id, answer_ids in correct.items()
+                }
+                score = float(sum(1 for answer_ids in answers.values() if answer_ids))
+                max_score = float(len(correct))
+                percentage = round(score / max_score * 100, 2) if max_score else 0.0
+                yield {
+                    "student_id": student_id,
+                    "quiz_id": quiz_id,
+                    "score": score,
+                    "max_score": max_score,
+                    "percentage": percentage,
+                    "is_passed": percentage >= 70.0,
+                    "answers": answers,
+                    "time_spent": rng.randrange(30, 900),
+                    "completed_at": self.now,
+                }
+
+    def course_aggregates(self) -> Iterator[dict]:
+        """Счетчики курсов (total_students, total_reviews, average_rating)"""
+        for course_id in self.dataset.course_ids:
+            ratings = self.course_ratings.get(course_id, [])
+            yield {
+                "course_id": course_id,
+                "total_students": self.course_students.get(course_id, 0),
+                "total_reviews": len(ratings),
+                "average_rating": round(sum(ratings) / len(ratings), 2) if ratings else 0.0,
+            }
+
+
+# ============ ЗАГРУЗКА ============
+
+def copy_value(value):
+    """Значение для CSV в COPY: enum хранится по имени, NULL - пустое поле"""
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class Loader:
+    """
+    Пакетная загрузка строк в таблицу
+
+    method: "copy" (PostgreSQL + psycopg2), "insert" (executemany) или "auto"
+    """
+
+    def __init__(self, engine, method: str = "auto", batch_size: int = 10_000):
+        self.engine = engine
+        self.batch_size = batch_size
+        can_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+        if method == "copy" and not can_copy:
+            raise ValueError("COPY доступен только для PostgreSQL с драйвером psycopg2")
+        self.use_copy = can_copy if method == "auto" else method == "copy"
+
+    def load(self, model, rows: Iterable[dict]) -> int:
+        rows = iter(rows)
+        total = 0
+        with self.engine.begin() as connection:
+            while True:
+                batch = list(itertools.islice(rows, self.batch_size))
+                if not batch:
+                    break
+                if self.use_copy:
+                    self._copy(connection, model.__tablename__, batch)
+                else:
+                    from sqlalchemy import insert
+                    connection.execute(insert(model), batch)
+                total += len(batch)
+        return total
+
+    @staticmethod
+    def _copy(connection, table: str, batch: List[dict]):
+        columns = list(batch[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in batch:
+            writer.writerow([copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        cursor = connection.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table} ({quoted}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+
+def base_ids(engine) -> Dict[str, int]:
+    """Первый свободный ID таблиц с явными ID"""
+    from sqlalchemy import func, select
+    from app.models import User, Category, Course, Lesson, Quiz, QuizQuestion, QuizAnswer, Comment
+
+    with engine.connect() as connection:
+        return {
+            model.__tablename__: (connection.scalar(select(func.max(model.id))) or 0) + 1
+            for model in (User, Category, Course, Lesson, Quiz, QuizQuestion, QuizAnswer, Comment)
+        }
+
+
+def reset_sequences(engine, tables: Iterable[str]):
+    """
+    Сдвигает sequences PostgreSQL после вставки с явными ID,
+    иначе следующие INSERT приложения получат занятый ID
+    """
+    if engine.dialect.name != "postgresql":
+        return
+
+    from sqlalchemy import text
+
+    with engine.begin() as connection:
+        for table in tables:
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+            ))
+
+
+def generate(engine, scale: Scale = None, method: str = "auto", batch_size: int = 10_000,
+             log=None) -> Dataset:
+    """
+    Генерирует и загружает набор данных; возвращает его структуру
+
+    Таблицы загружаются в порядке внешних ключей, каждая в своей транзакции
+    """
+    from sqlalchemy import update, bindparam
+    from app.models import (
+        User, Category, Course, Lesson, Quiz, QuizQuestion, QuizAnswer,
+        Enrollment, Progress, Review, Comment, QuizAttempt
+    )
+    from app.utils.security import get_password_hash
+
+    scale = scale or Scale()
+    dataset = Dataset(scale, base_ids(engine))
+    generator = Generator(dataset, get_password_hash(SEED_PASSWORD))
+    loader = Loader(engine, method, batch_size)
+
+    for model, rows in (
+            (User, generator.users()),
+            (Category, generator.categories()),
+            (Course, generator.courses()),
+            (Lesson, generator.lessons()),
+            (Quiz, generator.quizzes()),
+            (QuizQuestion, generator.quiz_questions()),
+            (QuizAnswer, generator.quiz_answers()),
+            (Enrollment, generator.enrollments()),
+            (Progress, generator.progress()),
+            (Review, generator.reviews()),
+            (Comment, generator.comments()),
+            (QuizAttempt, generator.quiz_attempts()),
+    ):
+        started = time.perf_counter()
+        count = loader.load(model, rows)
+        if log:
+            elapsed = time.perf_counter() - started
+            log(f"{model.__tablename__:<15} {count:>12,} строк за {elapsed:7.1f}s "
+                f"({count / elapsed if elapsed else 0:,.0f} строк/s)")
+
+    # Счетчики курсов одним executemany UPDATE
+    statement = update(Course).where(Course.id == bindparam("course_id")).values(
+        total_students=bindparam("total_students"),
+        total_reviews=bindparam("total_reviews"),
+        average_rating=bindparam("average_rating"),
+    )
+    aggregates = generator.course_aggregates()
+    with engine.begin() as connection:
+        while True:
+            batch = list(itertools.islice(aggregates, batch_size))
+            if not batch:
+                break
+            connection.execute(statement, batch)
+
+    reset_sequences(engine, dataset.base)
+    return dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="", help="URL БД (по умолчанию DATABASE_URL)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Множитель базового размера")
+    parser.add_argument("--enrollments", type=int, default=0,
+                        help="Целевое количество записей на курсы (подбирается число студентов)")
+    parser.add_argument("--progress", type=int, default=0,
+                        help="Целевое количество строк прогресса (подбирается доля пройденных уроков)")
+    for item in fields(Scale):
+        if item.name != "seed":
+            parser.add_argument(f"--{item.name.replace('_', '-')}", type=type(item.default), default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--method", choices=("auto", "copy", "insert"), default="auto",
+                        help="Способ загрузки: COPY или пакетный INSERT")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--create-tables", action="store_true", help="Создать таблицы (без Alembic)")
+    parser.add_argument("--manifest", default="", help="Сохранить описание набора данных в JSON")
+    parser.add_argument("--dry-run", action="store_true", help="Только показать ожидаемое количество строк")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("DEBUG", "false")
+
+    scale = Scale().scaled(args.scale)
+    overrides = {
+        item.name: getattr(args, item.name)
+        for item in fields(Scale) if getattr(args, item.name) is not None
+    }
+    scale = Scale(**{**asdict(scale), **overrides})
+
+    if args.enrollments:
+        published = scale.courses - scale.courses // 10
+        per_student = min(scale.enrollments_per_student, published)
+        scale.students = max(1, math.ceil(args.enrollments / per_student))
+    if args.progress:
+        enrollments = scale.estimate()["enrollments"]
+        needed = args.progress / enrollments
+        if needed > scale.lessons_per_course:
+            scale.lessons_per_course = math.ceil(needed)
+        scale.progress_ratio = min(1.0, needed / scale.lessons_per_course)
+
+    print("Ожидаемый объем:")
+    for table, count in scale.estimate().items():
+        print(f"  {table:<15} {count:>12,}")
+    if args.dry_run:
+        return
+
+    import app.models  # noqa: F401
+    from app.database import engine, create_tables
+
+    if args.create_tables:
+        create_tables()
+
+    started = time.perf_counter()
+    dataset = generate(engine, scale, args.method, args.batch_size, log=print)
+    print(f"Готово за {time.perf_counter() - started:.1f}s")
+
+    if args.manifest:
+        with open(args.manifest, "w") as file:
+            json.dump(dataset.manifest(), file, indent=2)
+        print(f"Манифест: {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Нагрузочный тест: смешанный трафик через ASGI приложение
+
+БД наполняется benchmarks.datagen (или берется готовый набор по манифесту
+--dataset), затем N виртуальных пользователей в течение
+заданного времени выполняют сценарии (выбираются случайно по весам):
+- catalog:   список курсов, карточка курса, категории
+- lesson:    урок и список уроков курса
+- heartbeat: обновление прогресса урока (PATCH /progress/lessons/{id})
+- quiz:      начало квиза и отправка ответов
+- admin:     статистика платформы
+
+Запросы идут через httpx.ASGITransport без сети, поэтому замеряется само
+приложение и БД. Токены выдаются напрямую (create_access_token), вход не
+нагружает bcrypt. Для каждого endpoint считаются запросы/сек и p50/p95/p99,
+результат сохраняется в JSON для сравнения запусков (--compare).
+
+Запуск:
+    python -m benchmarks.loadtest --duration 30 --concurrency 20
+    python -m benchmarks.loadtest --courses 500 --students 5000 --mix catalog=80,quiz=20
+    python -m benchmarks.loadtest --database-url postgresql://... --dataset dataset.json
+    python -m benchmarks.loadtest --compare benchmarks/results/loadtest-20240101-120000.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DEFAULT_MIX = "catalog=50,lesson=20,heartbeat=15,quiz=10,admin=5"
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(values: list, pct: float) -> float:
+    """Перцентиль (nearest-rank) в миллисекундах"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index] * 1000
+
+
+def parse_mix(value: str) -> dict:
+    """Веса сценариев из строки catalog=50,quiz=10"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip():
+            mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Неизвестные сценарии: {', '.join(sorted(unknown))}")
+    return mix
+
+
+class Recorder:
+    """Длительности и ошибки по шаблонам endpoint"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    async def request(self, client, label: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - started
+
+        self.latencies.setdefault(label, []).append(elapsed)
+        if response.status_code >= 400:
+            self.errors[label] = self.errors.get(label, 0) + 1
+        return response
+
+    def summary(self, duration: float) -> dict:
+        endpoints = {}
+        for label, values in sorted(self.latencies.items()):
+            endpoints[label] = {
+                "requests": len(values),
+                "errors": self.errors.get(label, 0),
+                "rps": round(len(values) / duration, 2),
+                "mean_ms": round(statistics.mean(values) * 1000, 2),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+            }
+
+        all_values = [value for values in self.latencies.values() for value in values]
+        total = {
+            "requests": len(all_values),
+            "errors": sum(self.errors.values()),
+            "rps": round(len(all_values) / duration, 2),
+            "p50_ms": round(percentile(all_values, 50), 2) if all_values else 0.0,
+            "p95_ms": round(percentile(all_values, 95), 2) if all_values else 0.0,
+            "p99_ms": round(percentile(all_values, 99), 2) if all_values else 0.0,
+        }
+        return {"total": total, "endpoints": endpoints}
+
+
+# ============ СЦЕНАРИИ ============
+
+async def scenario_catalog(client, recorder, data, rng, student_id, headers):
+    page = rng.randint(1, max(1, len(data.published_course_ids) // 20))
+    await recorder.request(client, "GET /api/courses/", "GET", "/api/courses/",
+                           params={"page": page, "page_size": 20}, headers=headers)
+    await recorder.request(client, "GET /api/courses/{course_id}", "GET",
+                           f"/api/courses/{rng.choice(data.published_course_ids)}", headers=headers)
+    await recorder.request(client, "GET /api/categories/", "GET", "/api/categories/")
+
+
+async def scenario_lesson(client, recorder, data, rng, student_id, headers):
+    course_id = rng.choice(data.enrollments_of(student_id))
+    await recorder.request(client, "GET /api/lessons/{lesson_id}", "GET",
+                           f"/api/lessons/{rng.choice(data.lessons_of(course_id))}", headers=headers)
+    await recorder.request(client, "GET /api/lessons/course/{course_id}", "GET",
+                           f"/api/lessons/course/{course_id}", headers=headers)
+
+
+async def scenario_heartbeat(client, recorder, data, rng, student_id, headers):
+    lessons = data.progress_of(student_id)
+    if not lessons:
+        return
+    await recorder.request(client, "PATCH /api/progress/lessons/{lesson_id}", "PATCH",
+                           f"/api/progress/lessons/{rng.choice(lessons)}", headers=headers,
+                           json={"completion_percentage": rng.uniform(0, 100), "time_spent": rng.randrange(1, 600)})
+
+
+async def scenario_quiz(client, recorder, data, rng, student_id, headers):
+    quizzes = [quiz for course in data.enrollments_of(student_id) for quiz in data.quizzes_of(course)]
+    if not quizzes:
+        return
+    quiz_id, correct = rng.choice(quizzes)
+
+    await recorder.request(client, "GET /api/quizzes/{quiz_id}/start", "GET",
+                           f"/api/quizzes/{quiz_id}/start", headers=headers)
+
+    # Примерно 70% ответов верные
+    answers = [
+        {"question_id": question_id, "answer_ids": answer_ids if rng.random() < 0.7 else []}
+        for question_id, answer_ids in correct.items()
+    ]
+    await recorder.request(client, "POST /api/quizzes/submit", "POST", "/api/quizzes/submit",
+                           headers=headers, json={"quiz_id": quiz_id, "answers": answers, "time_spent": 120})
+
+
+async def scenario_admin(client, recorder, data, rng, student_id, headers):
+    await recorder.request(client, "GET /api/admin/admin/statistics", "GET",
+                           "/api/admin/admin/statistics", headers=auth_headers(data.admin_ids[0]))
+
+
+SCENARIOS = {
+    "catalog": scenario_catalog,
+    "lesson": scenario_lesson,
+    "heartbeat": scenario_heartbeat,
+    "quiz": scenario_quiz,
+    "admin": scenario_admin,
+}
+
+
+# ============ ЗАПУСК ============
+
+_tokens = {}
+
+
+def auth_headers(user_id: int) -> dict:
+    """Заголовок с токеном пользователя (токены выдаются по мере надобности)"""
+    headers = _tokens.get(user_id)
+    if headers is None:
+        from app.utils.security import create_access_token
+        headers = _tokens[user_id] = {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+    return headers
+
+
+async def run_load(app, data, mix: dict, concurrency: int, duration: float, warmup: float, seed: int) -> dict:
+    import httpx
+
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    transport = httpx.ASGITransport(app=app)
+    recorder = Recorder()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        async def worker(index: int, deadline: float, target: Recorder):
+            rng = random.Random(seed + index)
+            while time.perf_counter() < deadline:
+                student_id = rng.choice(data.student_ids)
+                scenario = SCENARIOS[rng.choices(names, weights)[0]]
+                await scenario(client, target, data, rng, student_id, auth_headers(student_id))
+
+        if warmup > 0:
+            deadline = time.perf_counter() + warmup
+            await asyncio.gather(*(worker(i, deadline, Recorder()) for i in range(concurrency)))
+
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(worker(i, deadline, recorder) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return recorder.summary(elapsed)
+
+
+def print_report(result: dict, baseline: dict = None):
+    def delta(label, key, current):
+        if not baseline:
+            return ""
+        previous = (baseline["endpoints"].get(label) if label else baseline["total"]) or {}
+        if not previous.get(key):
+            return ""
+        return f" ({(current - previous[key]) / previous[key] * 100:+.0f}%)"
+
+    header = f"{'endpoint':<45} {'req':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    print(header)
+    print("-" * len(header))
+    for label, stats in result["endpoints"].items():
+        print(
+            f"{label:<45} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>8} "
+            f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8}"
+            f"{delta(label, 'p95_ms', stats['p95_ms'])}"
+        )
+    total = result["total"]
+    print("-" * len(header))
+    print(
+        f"{'TOTAL':<45} {total['requests']:>7} {total['errors']:>5} {total['rps']:>8} "
+        f"{total['p50_ms']:>8} {total['p95_ms']:>8} {total['p99_ms']:>8}"
+        f"{delta(None, 'rps', total['rps'])}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="", help="URL БД (по умолчанию временный SQLite)")
+    parser.add_argument("--duration", type=float, default=20, help="Длительность замера, секунды")
+    parser.add_argument("--warmup", type=float, default=2, help="Прогрев перед замером, секунды")
+    parser.add_argument("--concurrency", type=int, default=20, help="Виртуальные пользователи")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Веса сценариев")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--courses", type=int, default=100)
+    parser.add_argument("--lessons-per-course", type=int, default=10)
+    parser.add_argument("--enrollments-per-student", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора данных и трафика")
+    parser.add_argument("--dataset", default="", help="Манифест benchmarks.datagen: данные уже загружены")
+    parser.add_argument("--output", default="", help="Файл результатов JSON")
+    parser.add_argument("--compare", default="", help="JSON предыдущего запуска для сравнения")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+
+    # Настройки читаются при импорте app, поэтому окружение задается до него
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'loadtest.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "loadtest")
+    os.environ["DEBUG"] = "false"
+
+    import app.models  # noqa: F401
+    from app.database import engine, async_engine, create_tables
+    from app.main import create_app
+    from benchmarks.datagen import Dataset, Scale, generate
+
+    if args.dataset:
+        with open(args.dataset) as file:
+            data = Dataset.from_manifest(json.load(file))
+    else:
+        scale = Scale(
+            students=args.students,
+            courses=args.courses,
+            lessons_per_course=args.lessons_per_course,
+            enrollments_per_student=args.enrollments_per_student,
+            seed=args.seed,
+        )
+        started = time.perf_counter()
+        create_tables()
+        data = generate(engine, scale)
+        print(f"Данные созданы за {time.perf_counter() - started:.1f}s: "
+              f"{len(data.student_ids)} студентов, {len(data.course_ids)} курсов")
+
+    async def run():
+        try:
+            return await run_load(
+                create_app(), data, mix, args.concurrency, args.duration, args.warmup, args.seed
+            )
+        finally:
+            # Соединения aiosqlite держат потоки, без dispose процесс не завершится
+            await async_engine.dispose()
+
+    result = asyncio.run(run())
+    result["meta"] = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "duration_s": args.duration,
+        "concurrency": args.concurrency,
+        "mix": mix,
+        "dataset": data.manifest(),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print_report(result, baseline)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"loadtest-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(result, file, indent=2, ensure_ascii=False)
+    print(f"Результаты: {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
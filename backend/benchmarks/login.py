@@ -0,0 +1,167 @@
+"""
+Бенчмарк: пропускная способность входа и влияние bcrypt на event loop
+
+Через ASGI приложение (без сети) N параллельных клиентов выполняют
+POST /api/auth/login, а отдельная задача с фиксированным интервалом
+запрашивает /health. Сравниваются два режима проверки пароля:
+- inline:   bcrypt.checkpw прямо в async def endpoint (как было раньше)
+- executor: verify_password_async в пуле bcrypt (текущий вариант)
+
+В режиме inline каждая проверка пароля останавливает весь event loop,
+поэтому задержка /health растет до времени bcrypt, а вход не использует
+больше одного ядра. Задержка /health считается от запланированного момента.
+
+Запуск:
+    python -m benchmarks.login --duration 10 --concurrency 8
+    python -m benchmarks.login --rounds 10 --workers 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+PASSWORD = "benchmark123"
+
+
+def percentile(values: list, pct: float) -> float:
+    """Перцентиль (nearest-rank) в миллисекундах"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index] * 1000
+
+
+def create_users(count: int, rounds: int) -> list:
+    """Пользователи с одинаковым паролем (хеш вычисляется один раз)"""
+    from app.database import SessionLocal
+    from app.models import User
+    from app.utils.security import get_password_hash
+
+    hashed_password = get_password_hash(PASSWORD, rounds=rounds)
+    emails = [f"login-{index}@example.com" for index in range(count)]
+    with SessionLocal() as db:
+        db.add_all([
+            User(email=email, hashed_password=hashed_password, first_name="Bench", last_name="User")
+            for email in emails
+        ])
+        db.commit()
+    return emails
+
+
+def use_mode(mode: str):
+    """Подменяет проверку пароля в роутере auth на выбранный режим"""
+    from app.api import auth
+    from app.utils import security
+
+    if mode == "inline":
+        async def verify(plain_password: str, hashed_password: str) -> bool:
+            return security.verify_password(plain_password, hashed_password)
+
+        auth.verify_password_async = verify
+    else:
+        auth.verify_password_async = security.verify_password_async
+
+
+async def run_mode(app, emails: list, mode: str, concurrency: int, duration: float,
+                   probe_interval_ms: float) -> dict:
+    import httpx
+
+    use_mode(mode)
+    transport = httpx.ASGITransport(app=app)
+    logins, probes, errors = [], [], 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        deadline = started + duration
+
+        async def login_worker(index: int):
+            nonlocal errors
+            counter = index
+            while time.perf_counter() < deadline:
+                email = emails[counter % len(emails)]
+                counter += concurrency
+                request_started = time.perf_counter()
+                response = await client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+                if response.status_code == 200:
+                    logins.append(time.perf_counter() - request_started)
+                else:
+                    errors += 1
+
+        async def probe():
+            index = 0
+            while True:
+                scheduled = started + index * probe_interval_ms / 1000
+                if scheduled >= deadline:
+                    return
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                await client.get("/health")
+                probes.append(time.perf_counter() - scheduled)
+                index += 1
+
+        await asyncio.gather(probe(), *(login_worker(index) for index in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "logins_per_s": round(len(logins) / elapsed, 1),
+        "login_p50_ms": round(percentile(logins, 50), 1),
+        "login_p99_ms": round(percentile(logins, 99), 1),
+        "health_p50_ms": round(percentile(probes, 50), 2),
+        "health_p99_ms": round(percentile(probes, 99), 2),
+        "health_mean_ms": round(statistics.mean(probes) * 1000, 2) if probes else 0.0,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="", help="URL БД (по умолчанию временный SQLite)")
+    parser.add_argument("--duration", type=float, default=5, help="Длительность замера каждого режима, секунды")
+    parser.add_argument("--concurrency", type=int, default=8, help="Параллельные клиенты входа")
+    parser.add_argument("--users", type=int, default=50, help="Количество пользователей")
+    parser.add_argument("--rounds", type=int, default=12, help="Cost factor bcrypt")
+    parser.add_argument("--workers", type=int, default=4, help="Потоки пула bcrypt (PASSWORD_HASH_WORKERS)")
+    parser.add_argument("--probe-interval-ms", type=float, default=10, help="Интервал между замерами /health")
+    args = parser.parse_args()
+
+    # Настройки читаются при импорте app, поэтому окружение задается до него
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'login.db')}"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ["DEBUG"] = "false"
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    # Все клиенты бенчмарка приходят с одного адреса
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    import app.models  # noqa: F401
+    from app.database import async_engine, create_tables
+    from app.main import create_app
+
+    create_tables()
+    emails = create_users(args.users, args.rounds)
+
+    async def run():
+        try:
+            app = create_app()
+            return [
+                await run_mode(app, emails, mode, args.concurrency, args.duration, args.probe_interval_ms)
+                for mode in ("inline", "executor")
+            ]
+        finally:
+            # Соединения aiosqlite держат потоки, без dispose процесс не завершится
+            await async_engine.dispose()
+
+    print(f"bcrypt rounds={args.rounds}, workers={args.workers}, concurrency={args.concurrency}")
+    for result in asyncio.run(run()):
+        print(
+            f"{result['mode']:>8}: {result['logins_per_s']} login/s "
+            f"(p50={result['login_p50_ms']}ms p99={result['login_p99_ms']}ms, errors={result['errors']}) "
+            f"health p50={result['health_p50_ms']}ms p99={result['health_p99_ms']}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
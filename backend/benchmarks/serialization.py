@@ -0,0 +1,206 @@
+"""
+Бенчмарк: сериализация страницы списка (100 элементов)
+
+Сравниваются два пути формирования тела ответа:
+- pydantic: обработчик строит pydantic объекты, FastAPI повторно валидирует
+  их через response_model и сериализует стандартным json (как было раньше)
+- orjson:   проекция строк в словари (app.utils.serialization.project)
+  и FastJSONResponse - тело формируется один раз
+
+Данные - несвязанные с БД ORM объекты, поэтому замеряется только
+сериализация. Страницы: GET /api/courses/ и GET /api/comments/lessons/{id}
+(100 корневых комментариев, у каждого --replies ответов).
+
+Запуск:
+    python -m benchmarks.serialization --items 100 --repeat 200
+"""
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime, timezone
+
+
+def build_courses(count: int) -> list:
+    from app.models import Category, Course, CourseLevel, User, UserRole
+
+    instructor = User(id=1, first_name="Ivan", last_name="Petrov", role=UserRole.INSTRUCTOR)
+    category = Category(id=1, name="Marketing", slug="marketing")
+    return [
+        Course(
+            id=index,
+            title=f"Course {index}",
+            slug=f"course-{index}",
+            description="Описание курса " * 20,
+            short_description="Краткое описание курса",
+            thumbnail_url=f"https://cdn.example.com/courses/{index}.jpg",
+            level=CourseLevel.BEGINNER,
+            price=49.0,
+            discount_price=None,
+            average_rating=4.5,
+            total_students=1200,
+            total_lessons=24,
+            duration_hours=12.5,
+            instructor=instructor,
+            category=category,
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def build_comments(count: int, replies: int) -> list:
+    from app.models import Comment, User, UserRole
+
+    now = datetime.now(timezone.utc)
+    author = User(id=1, first_name="Anna", last_name="Ivanova", avatar_url=None, role=UserRole.STUDENT)
+    tree = []
+    comment_id = 1
+    for _ in range(count):
+        root = Comment(
+            id=comment_id, content="Вопрос по уроку " * 5, user_id=1, lesson_id=1, parent_id=None,
+            is_edited=False, is_deleted=False, created_at=now, updated_at=now, user=author
+        )
+        children = []
+        for _ in range(replies):
+            comment_id += 1
+            children.append(Comment(
+                id=comment_id, content="Ответ на вопрос", user_id=1, lesson_id=1, parent_id=root.id,
+                is_edited=False, is_deleted=False, created_at=now, updated_at=now, user=author
+            ))
+        comment_id += 1
+        tree.append((root, children))
+    return tree
+
+
+def pydantic_body(response_model, content) -> bytes:
+    """Повторная валидация через response_model и стандартный JSONResponse"""
+    from fastapi.responses import JSONResponse
+    from fastapi.utils import create_response_field
+
+    field = create_response_field(name="response", type_=response_model)
+    value, errors = field.validate(content, {}, loc=("response",))
+    assert not errors, errors
+    return JSONResponse(field.serialize(value, mode="json")).body
+
+
+def courses_pydantic(courses) -> bytes:
+    from app.schemas.course import CourseList, CourseShort
+
+    page = CourseList(
+        courses=[
+            CourseShort(
+                id=course.id,
+                title=course.title,
+                short_description=course.short_description,
+                thumbnail_url=course.thumbnail_url,
+                level=course.level,
+                price=course.price,
+                discount_price=course.discount_price,
+                average_rating=course.average_rating,
+                total_students=course.total_students,
+                total_lessons=course.total_lessons,
+                duration_hours=course.duration_hours,
+                instructor_name=f"{course.instructor.first_name} {course.instructor.last_name}",
+                category_name=course.category.name if course.category else None,
+                is_free=course.is_free
+            )
+            for course in courses
+        ],
+        total=len(courses), page=1, page_size=len(courses), total_pages=1
+    )
+    return pydantic_body(CourseList, page)
+
+
+def courses_orjson(courses) -> bytes:
+    from app.api.course import build_course_short
+    from app.utils.serialization import FastJSONResponse
+
+    return FastJSONResponse({
+        "courses": [build_course_short(course) for course in courses],
+        "total": len(courses), "page": 1, "page_size": len(courses), "total_pages": 1
+    }).body
+
+
+def comments_pydantic(tree) -> bytes:
+    from app.schemas.comment import CommentResponse, CommentWithReplies, LessonCommentsResponse, UserBrief
+
+    def build(comment, model, **extra):
+        return model(
+            id=comment.id, content=comment.content, user_id=comment.user_id,
+            lesson_id=comment.lesson_id, parent_id=comment.parent_id,
+            is_edited=comment.is_edited, is_deleted=comment.is_deleted,
+            created_at=comment.created_at, updated_at=comment.updated_at,
+            user=UserBrief(
+                id=comment.user.id, first_name=comment.user.first_name, last_name=comment.user.last_name,
+                avatar_url=comment.user.avatar_url, role=comment.user.role.value
+            ),
+            **extra
+        )
+
+    page = LessonCommentsResponse(
+        lesson_id=1,
+        total_comments=sum(1 + len(children) for _, children in tree),
+        comments=[
+            build(root, CommentWithReplies, replies_count=len(children),
+                  replies=[build(reply, CommentResponse) for reply in children])
+            for root, children in tree
+        ]
+    )
+    return pydantic_body(LessonCommentsResponse, page)
+
+
+def comments_orjson(tree) -> bytes:
+    from app.api.comments import comment_row
+    from app.utils.serialization import FastJSONResponse
+
+    return FastJSONResponse({
+        "lesson_id": 1,
+        "total_comments": sum(1 + len(children) for _, children in tree),
+        "comments": [
+            comment_row(root, replies_count=len(children), replies=[comment_row(reply) for reply in children])
+            for root, children in tree
+        ]
+    }).body
+
+
+def measure(func, data, repeat: int) -> dict:
+    func(data)  # прогрев
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func(data)
+        timings.append(time.perf_counter() - started)
+    return {
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "p50_ms": round(statistics.median(timings) * 1000, 3),
+        "bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100, help="Элементов на странице")
+    parser.add_argument("--replies", type=int, default=2, help="Ответов на каждый комментарий")
+    parser.add_argument("--repeat", type=int, default=200, help="Повторов каждого замера")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("DEBUG", "false")
+    import app.models  # noqa: F401
+
+    pages = {
+        "GET /api/courses/": (build_courses(args.items), courses_pydantic, courses_orjson),
+        "GET /api/comments/lessons/{id}": (build_comments(args.items, args.replies), comments_pydantic, comments_orjson),
+    }
+
+    print(f"{'endpoint':<32} {'path':<9} {'mean ms':>9} {'p50 ms':>9} {'bytes':>8}")
+    for label, (data, baseline, fast) in pages.items():
+        results = {}
+        for name, func in (("pydantic", baseline), ("orjson", fast)):
+            results[name] = stats = measure(func, data, args.repeat)
+            print(f"{label:<32} {name:<9} {stats['mean_ms']:>9} {stats['p50_ms']:>9} {stats['bytes']:>8}")
+        print(f"{'':<32} {'speedup':<9} {results['pydantic']['mean_ms'] / results['orjson']['mean_ms']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Бенчмарк: время старта приложения
+
+Каждый замер выполняется в отдельном процессе (холодный импорт):
+- import_ms:        import app.main
+- create_app_ms:    create_app() с выбранными роутерами
+- create_all_ms:    Base.metadata.create_all (только с --create-all: так
+                    приложение стартовало раньше, при каждом импорте)
+- first_request_ms: первый GET /health
+- total_ms:         от начала импорта до ответа на первый запрос
+
+Запуск:
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --routers catalog --create-all
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MEASURES = ("import_ms", "create_app_ms", "create_all_ms", "first_request_ms", "total_ms")
+
+
+def measure(routers: list, create_all: bool) -> dict:
+    """Один замер в текущем (свежем) процессе"""
+    started = time.perf_counter()
+    from app.main import create_app
+    imported = time.perf_counter()
+
+    application = create_app(routers=routers)
+    created = time.perf_counter()
+
+    if create_all:
+        import app.models  # noqa: F401
+        from app.database import create_tables
+        create_tables()
+    schema_ready = time.perf_counter()
+
+    import httpx
+
+    async def first_request():
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/health")
+            response.raise_for_status()
+
+    asyncio.run(first_request())
+    finished = time.perf_counter()
+
+    return {
+        "import_ms": (imported - started) * 1000,
+        "create_app_ms": (created - imported) * 1000,
+        "create_all_ms": (schema_ready - created) * 1000,
+        "first_request_ms": (finished - schema_ready) * 1000,
+        "total_ms": (finished - started) * 1000,
+    }
+
+
+def run(routers: list, create_all: bool, runs: int, env: dict) -> dict:
+    """Медианы замеров по нескольким процессам"""
+    command = [sys.executable, "-m", "benchmarks.startup", "--child"]
+    if routers:
+        command += ["--routers", ",".join(routers)]
+    if create_all:
+        command.append("--create-all")
+
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(command, capture_output=True, text=True, check=True, env=env)
+        samples.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    return {key: round(statistics.median(s[key] for s in samples), 2) for key in MEASURES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routers", default="", help="Роутеры или группы через запятую (пусто = все)")
+    parser.add_argument("--create-all", action="store_true", help="Добавить create_all, как при старом старте")
+    parser.add_argument("--runs", type=int, default=5, help="Количество процессов для замера")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    routers = [name.strip() for name in args.routers.split(",") if name.strip()]
+
+    if args.child:
+        print(json.dumps(measure(routers, args.create_all)))
+        return
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    env.setdefault("SECRET_KEY", "benchmark")
+    env["DEBUG"] = "false"
+
+    scenarios = [("all", [], args.create_all)]
+    if routers:
+        scenarios.append((args.routers, routers, args.create_all))
+
+    for label, scenario_routers, create_all in scenarios:
+        result = run(scenario_routers, create_all, args.runs, env)
+        print(f"{label:>10}: " + " ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Бенчмарк: поиск пользователей в админке - ILIKE против индексов поиска
+
+Выполняются те же запросы, что в GET /api/admin/admin/users?search=...
+(подсчет и первая страница), в двух режимах:
+- ilike:   три ILIKE '%term%' по email, имени и фамилии (как было раньше),
+           каждый запрос дважды читает всю таблицу users
+- indexed: UserSearch - GIN pg_trgm в PostgreSQL, индексы lower() по
+           префиксу в остальных СУБД
+
+Запуск (по умолчанию временный SQLite):
+    python -m benchmarks.user_search --users 1000000
+    python -m benchmarks.user_search --database-url postgresql://... --repeat 20
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+FIRST_NAMES = ("Иван", "Анна", "Мария", "Алексей", "Дмитрий", "Ольга", "John", "Emma", "Oliver", "Sophia",
+               "Сергей", "Елена", "Michael", "Olivia", "Павел", "Наталья")
+LAST_NAMES = ("Иванов", "Петрова", "Смирнов", "Кузнецова", "Попов", "Соколова", "Smith", "Johnson",
+              "Williams", "Brown", "Лебедев", "Новикова", "Taylor", "Wilson", "Морозов", "Волкова")
+
+QUERIES = ("ivan", "anna.smi", "user-12345", "brown", "olivia.w", "sergey")
+
+
+def percentile(values: list, pct: float) -> float:
+    """Перцентиль (nearest-rank) в миллисекундах"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index] * 1000
+
+
+def user_rows(count: int, seed: int):
+    from app.models import UserRole
+
+    rng = random.Random(seed)
+    latin = ("ivan", "anna", "maria", "alexey", "dmitry", "olga", "john", "emma", "oliver", "sophia",
+             "sergey", "elena", "michael", "olivia", "pavel", "natalia")
+    surnames = ("ivanov", "petrova", "smirnov", "kuznetsova", "popov", "sokolova", "smith", "johnson",
+                "williams", "brown", "lebedev", "novikova", "taylor", "wilson", "morozov", "volkova")
+    for index in range(count):
+        first, last = rng.randrange(len(FIRST_NAMES)), rng.randrange(len(LAST_NAMES))
+        yield {
+            "email": f"{latin[first]}.{surnames[last]}.user-{index}@example.com",
+            "hashed_password": "-",
+            "first_name": FIRST_NAMES[first],
+            "last_name": LAST_NAMES[last],
+            "role": UserRole.STUDENT,
+        }
+
+
+def run_mode(engine, mode: str, repeat: int, page_size: int) -> dict:
+    from sqlalchemy import func, or_, select
+    from app.models import User
+    from app.services.user_search import UserSearch
+
+    timings, totals = [], {}
+
+    with engine.connect() as connection:
+        for query in QUERIES:
+            if mode == "ilike":
+                pattern = f"%{query}%"
+                condition = or_(User.email.ilike(pattern), User.first_name.ilike(pattern),
+                                User.last_name.ilike(pattern))
+                count_query = select(func.count(User.id)).where(condition)
+                page_query = select(User.id).where(condition)
+                order = []
+            else:
+                user_search = UserSearch.build(query, engine.dialect.name)
+                count_query = user_search.apply(select(func.count(User.id)).select_from(User))
+                page_query = user_search.apply(select(User.id))
+                order = [user_search.rank] if user_search.rank is not None else []
+            page_query = page_query.order_by(*order, User.created_at.desc()).limit(page_size)
+
+            for _ in range(repeat):
+                started = time.perf_counter()
+                totals[query] = connection.scalar(count_query)
+                connection.execute(page_query).all()
+                timings.append(time.perf_counter() - started)
+
+    return {
+        "mode": mode,
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "mean_ms": round(statistics.mean(timings) * 1000, 2),
+        "totals": totals,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="", help="URL БД (по умолчанию временный SQLite)")
+    parser.add_argument("--users", type=int, default=1_000_000, help="Количество пользователей")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторов каждого запроса")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # Настройки читаются при импорте app, поэтому окружение задается до него
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'users.db')}"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ["DEBUG"] = "false"
+
+    import app.models  # noqa: F401
+    from app.database import engine, create_tables
+    from app.models import User
+    from benchmarks.datagen import Loader
+
+    create_tables()
+    started = time.perf_counter()
+    Loader(engine).load(User, user_rows(args.users, args.seed))
+    print(f"users: {args.users:,} строк за {time.perf_counter() - started:.1f}s")
+
+    for mode in ("ilike", "indexed"):
+        result = run_mode(engine, mode, args.repeat, args.page_size)
+        print(
+            f"{result['mode']:>8}: p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+            f"mean={result['mean_ms']}ms"
+        )
+        print("          найдено: " + ", ".join(f"{query!r}={total}" for query, total in result["totals"].items()))
+
+
+if __name__ == "__main__":
+    main()